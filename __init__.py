@@ -4,5 +4,14 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 from cuda_helpers import cu_device_count
 from device import Device
+from device_pool import Device_Pool
 from dev_dblptr import Device_DblPtr
+from dev_ptr_array import (Device_LitePtr,
+                           Device_PtrArray)
+from dispatch import Dispatcher
+from event import (Event,
+                   Timer)
+from graph import Graph
+from peer import (Peer_Link,
+                  peer_matrix)
 from shared_utils import *
\ No newline at end of file
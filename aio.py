@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Stream_Executor",
+    "stream_done",
+    "stream_result",
+    "to_device",
+    "to_host",
+]
+
+import asyncio
+from collections import deque
+from functools import partial
+import itertools
+import threading
+
+# Local imports
+from kernel_helpers import (cu_launch_host_func,
+                            HOST_FUNC)
+
+# Futures waiting for a host callback, keyed by the callback's data
+# value: key -> (loop, future)
+_pending = {}
+_lock = threading.Lock()
+_keys = itertools.count(1)
+
+
+def _set_done(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def _on_complete(key):
+    """
+    Runs on a CUDA driver thread once the stream work before it has
+    completed, and hands the completion over to the event loop.
+    """
+    with _lock:
+        loop, future = _pending.pop(key)
+    try:
+        loop.call_soon_threadsafe(_set_done, future)
+    except RuntimeError:
+        pass        # The loop was closed meanwhile
+
+
+# One callback for every stream, so no ctypes thunk has to outlive
+# the futures that use it
+_host_fn = HOST_FUNC(_on_complete)
+
+
+def _get_loop(loop):
+    return loop or asyncio.get_event_loop()
+
+
+def stream_done(stream, loop=None):
+    """
+    Future that completes, without blocking or polling, once the work
+    queued so far on a stream has completed. A host callback queued on
+    the stream signals the event loop.
+
+    Parameters
+    ----------
+    stream : c_void_p
+        The CUDA stream.
+
+    loop : asyncio event loop, optional
+        Loop the future belongs to. If None, the current loop.
+
+    Returns
+    -------
+    future : asyncio.Future
+        Resolves to None.
+    """
+    loop = _get_loop(loop)
+    future = loop.create_future()
+    key = next(_keys)
+    with _lock:
+        _pending[key] = (loop, future)
+    cu_launch_host_func(stream, _host_fn, key)
+    return future
+
+
+def _chain(future, value, done):
+    """
+    Resolve future with value(), or done's exception, once done has
+    completed.
+    """
+    if future.cancelled():
+        return
+    if done.cancelled():
+        future.cancel()
+    elif done.exception() is not None:
+        future.set_exception(done.exception())
+    else:
+        future.set_result(value())
+
+
+def stream_result(stream, value, loop=None):
+    """
+    Future that resolves to value() once the work queued so far on a
+    stream has completed.
+
+    Parameters
+    ----------
+    stream : c_void_p
+        The CUDA stream.
+
+    value : func
+        Called on the event loop thread for the result.
+
+    loop : asyncio event loop, optional
+        Loop the future belongs to. If None, the current loop.
+
+    Returns
+    -------
+    future : asyncio.Future
+    """
+    future = _get_loop(loop).create_future()
+    stream_done(stream, loop).add_done_callback(partial(_chain, future, value))
+    return future
+
+
+def to_device(d_arr, arr, stream=None, loop=None):
+    """
+    Awaitable host to device copy, see Device_Ptr.to_device_async.
+
+    Returns
+    -------
+    future : asyncio.Future
+        Resolves to d_arr once the copy has completed.
+    """
+    stream = stream or d_arr.stream
+    d_arr.to_device_async(arr, stream)
+    return stream_result(stream, lambda: d_arr, loop)
+
+
+def to_host(d_arr, arr=None, stream=None, loop=None):
+    """
+    Awaitable device to host copy, see Device_Ptr.to_host_async.
+
+    Returns
+    -------
+    future : asyncio.Future
+        Resolves to the host array once the copy has completed.
+    """
+    return d_arr.to_host_async(arr, stream).as_future(loop)
+
+
+class Stream_Executor(object):
+
+    def __init__(self, streams, max_pending=2, loop=None):
+        """
+        Runs GPU work submitted by coroutines on a pool of streams,
+        with back-pressure. Each stream holds at most max_pending
+        jobs in flight, and further submissions wait for one of them
+        to complete.
+
+        Parameters
+        ----------
+        streams : list of Stream
+            The streams to run on.
+
+        max_pending : int, optional
+            Jobs in flight per stream.
+
+        loop : asyncio event loop, optional
+            Loop the futures belong to. If None, the current loop.
+
+        Attributes
+        ----------
+        n_pending : int
+            Jobs issued and not yet completed.
+
+        n_waiting : int
+            Submissions waiting for a free stream.
+
+        Notes
+        -----
+        Jobs are issued on the event loop thread, so they must only
+        queue work on their stream, never synchronize.
+        """
+        self.streams = list(streams)
+        self.max_pending = max_pending
+        self._loop = loop
+        self._slots = deque(s for i in range(max_pending) for s in self.streams)
+        self._waiters = deque()
+        self.n_pending = 0
+
+
+    @property
+    def n_waiting(self):
+        return len(self._waiters)
+
+
+    def submit(self, fn, *args):
+        """
+        Issue fn(stream, *args) once a stream is free.
+
+        Parameters
+        ----------
+        fn : func
+            Queues GPU work on the Stream it is given. Its return value
+            is handed out once that work has completed.
+
+        Returns
+        -------
+        admitted : asyncio.Future
+            Resolves once fn has been issued, to a second future that
+            resolves to fn's return value when its work has completed.
+            Awaiting admitted throttles a producer to the pool's
+            capacity, e.g.
+
+            >>> done = await executor.submit(fn, h_arr)
+            >>> ...
+            >>> result = await done
+        """
+        admitted = _get_loop(self._loop).create_future()
+        self._waiters.append((admitted, fn, args))
+        self._dispatch()
+        return admitted
+
+
+    def run(self, fn, *args):
+        """
+        Issue fn(stream, *args) once a stream is free, see submit.
+
+        Returns
+        -------
+        result : asyncio.Future
+            Resolves to fn's return value once its work has completed.
+        """
+        result = _get_loop(self._loop).create_future()
+        def on_admitted(admitted):
+            if admitted.cancelled() or admitted.exception() is not None:
+                _chain(result, None, admitted)
+            else:
+                done = admitted.result()
+                done.add_done_callback(partial(_chain, result, done.result))
+        self.submit(fn, *args).add_done_callback(on_admitted)
+        return result
+
+
+    def _dispatch(self):
+        while self._waiters and self._slots:
+            admitted, fn, args = self._waiters.popleft()
+            if admitted.cancelled():
+                continue
+            stream = self._slots.popleft()
+            try:
+                value = fn(stream, *args)
+                freed = stream.device.pool.mark_stream(stream.stream)
+                completion = stream_done(stream.stream, self._loop)
+            except Exception as e:
+                self._slots.append(stream)
+                admitted.set_exception(e)
+                continue
+            self.n_pending += 1
+            done = _get_loop(self._loop).create_future()
+            completion.add_done_callback(partial(self._complete, stream, done, value, freed))
+            admitted.set_result(done)
+
+
+    def _complete(self, stream, done, value, freed, completion):
+        self.n_pending -= 1
+        # Later jobs may have freed blocks their kernels still use
+        stream.device.pool.release_marked(freed)
+        self._slots.append(stream)
+        if not done.cancelled():
+            done.set_result(value)
+        self._dispatch()
+
+
+    def synchronize_async(self):
+        """
+        Future that resolves once every issued job has completed.
+        """
+        loop = _get_loop(self._loop)
+        return asyncio.gather(*[stream_done(s.stream, loop) for s in self.streams])
+
+
+    def __repr__(self):
+        return ("Stream_Executor(n_streams=%i, max_pending=%i, n_pending=%i, n_waiting=%i)"
+                %(len(self.streams), self.max_pending, self.n_pending, self.n_waiting))
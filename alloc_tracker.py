@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Alloc_Tracker",
+]
+
+import os
+import sys
+import weakref
+
+# Local imports
+from mem_pool import stream_key
+
+
+_pkg_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _call_site():
+    """
+    (file, line, function) of the innermost frame outside this 
+    package, i.e. the user code that requested the allocation.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        fname = os.path.abspath(frame.f_code.co_filename)
+        if os.path.dirname(fname) != _pkg_dir:
+            return (fname, frame.f_lineno, frame.f_code.co_name)
+        frame = frame.f_back
+    return None
+
+
+def _format_sites(allocs):
+    sites = {}
+    for obj, nbytes, key, site in allocs:
+        frame = "<untraced>" if site is None else "%s:%i in %s"%site
+        count, total = sites.get(frame, (0, 0))
+        sites[frame] = (count + 1, total + nbytes)
+    return ["  %12i bytes in %4i allocations at %s"%(total, count, frame)
+            for frame, (count, total) in sorted(sites.items(), key=lambda s: -s[1][1])]
+
+
+class _Alloc_Record(object):
+
+    __slots__ = ["addr", "nbytes", "stream", "ref", "site"]
+
+    def __init__(self, addr, nbytes, stream, ref, site):
+        self.addr = addr
+        self.nbytes = nbytes
+        self.stream = stream
+        self.ref = ref
+        self.site = site
+
+
+class Alloc_Tracker(object):
+
+    def __init__(self, pool, trace_every=0):
+        """
+        Registry of the live allocations of a Memory_Pool. Every
+        tracked Device_Ptr gets a weak reference finalizer that
+        returns its memory to the pool when it is garbage collected,
+        and bytes are accounted for per stream.
+
+        Parameters
+        ----------
+        pool : Memory_Pool
+            The pool whose allocations are tracked.
+
+        trace_every : int, optional
+            Capture the call site of every Nth allocation. 0 turns
+            call site capture off, 1 captures every allocation.
+
+        Attributes
+        ----------
+        live_bytes : int
+            Bytes held by live tracked allocations.
+
+        peak_bytes : int
+            Highest value reached by live_bytes.
+
+        stream_bytes : dict
+            Live bytes per stream key (None for the null stream).
+
+        stream_peak_bytes : dict
+            Peak live bytes per stream key.
+
+        n_collected : int
+            Number of allocations freed by garbage collection rather
+            than explicitly.
+        """
+        self.pool = pool
+        self.trace_every = trace_every
+        self._lock = pool._lock     # The pool calls untrack under it
+        self._records = {}          # address -> _Alloc_Record
+        self._n_allocs = 0
+        self.live_bytes = 0
+        self.peak_bytes = 0
+        self.stream_bytes = {}
+        self.stream_peak_bytes = {}
+        self.n_collected = 0
+
+
+    def track(self, obj, addr, nbytes, stream=None):
+        """
+        Start tracking an allocation.
+
+        Parameters
+        ----------
+        obj : Device_Ptr
+            The object owning the memory.
+
+        addr : int
+            Address of the allocation.
+
+        nbytes : int
+            Requested size in bytes.
+
+        stream : c_void_p, optional
+            CUDA stream the memory was allocated on.
+        """
+        with self._lock:
+            self._n_allocs += 1
+            site = None
+            if self.trace_every and self._n_allocs % self.trace_every == 0:
+                site = _call_site()
+
+            key = stream_key(stream)
+            ref = weakref.ref(obj, self._collect(addr))
+            self._records[addr] = _Alloc_Record(addr, nbytes, key, ref, site)
+
+            self.live_bytes += nbytes
+            self.peak_bytes = max(self.peak_bytes, self.live_bytes)
+            self.stream_bytes[key] = self.stream_bytes.get(key, 0) + nbytes
+            self.stream_peak_bytes[key] = max(self.stream_peak_bytes.get(key, 0),
+                                              self.stream_bytes[key])
+
+
+    def untrack(self, addr):
+        """
+        Stop tracking an allocation, once it has been freed.
+
+        Parameters
+        ----------
+        addr : int
+            Address of the allocation.
+        """
+        with self._lock:
+            record = self._records.pop(addr, None)
+            if record is None:
+                return
+            self.live_bytes -= record.nbytes
+            self.stream_bytes[record.stream] -= record.nbytes
+
+
+    def _collect(self, addr):
+        def callback(ref):
+            with self._lock:
+                record = self._records.get(addr)
+                if record is not None and record.ref is ref:
+                    self.n_collected += 1
+                    self.pool.free(addr, record.stream)
+        return callback
+
+
+    def live(self):
+        """
+        Return the live allocations.
+
+        Returns
+        -------
+        allocs : list of tuples
+            (obj, nbytes, stream key, call site) of every live
+            allocation, largest first. The call site is a tuple of
+            (file, line, function), or None if it was not captured.
+        """
+        with self._lock:
+            allocs = [(r.ref(), r.nbytes, r.stream, r.site)
+                      for r in self._records.values()]
+        return sorted(allocs, key=lambda a: -a[1])
+
+
+    def report(self):
+        """
+        Summarize live and peak bytes per stream, and the live
+        allocations grouped by call site.
+
+        Returns
+        -------
+        report : str
+            The formatted report.
+        """
+        lines = ["Live: %i bytes in %i allocations, peak: %i bytes"
+                 %(self.live_bytes, len(self._records), self.peak_bytes)]
+        for key in sorted(self.stream_bytes, key=str):
+            lines.append("  stream %-18s live: %12i  peak: %12i"
+                         %(key, self.stream_bytes[key], self.stream_peak_bytes[key]))
+        return "\n".join(lines + _format_sites(self.live()))
+
+
+    def leak_report(self, owned=()):
+        """
+        Describe the live allocations that are not owned by an 
+        expected holder.
+
+        Parameters
+        ----------
+        owned : iterable, optional
+            Objects that are expected to still be alive.
+
+        Returns
+        -------
+        report : str or None
+            The leaked allocations grouped by call site, or None 
+            if nothing leaked.
+        """
+        owned = set(id(obj) for obj in owned)
+        leaks = [a for a in self.live() if id(a[0]) not in owned]
+        if not leaks:
+            return None
+        lines = ["%i device allocations (%i bytes) were never freed:"
+                 %(len(leaks), sum(a[1] for a in leaks))]
+        return "\n".join(lines + _format_sites(leaks))
+
+
+    def close(self):
+        """
+        Drop every record without freeing, so finalizers no longer
+        call into the pool. Used once the context is being destroyed,
+        which releases all of its memory.
+        """
+        with self._lock:
+            self._records.clear()
+            self.live_bytes = 0
+            self.stream_bytes = {}
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Arena",
+]
+
+import numpy as np
+
+# Local imports
+from dev_ptr import Device_Ptr
+from strides import prod
+
+
+def _align(offset, alignment):
+    return -(-offset//alignment)*alignment
+
+
+class Arena(object):
+
+    def __init__(self, pool, nbytes=None, stream=None, alignment=256):
+        """
+        Bump sub-allocator for short-lived scratch buffers. One block
+        is reserved from the pool, and every malloc hands out the next
+        aligned slice of it, so all buffers are released at once by
+        reset or release.
+
+        Parameters
+        ----------
+        pool : Memory_Pool
+            Pool the block, and any overflow buffers, come from.
+
+        nbytes : int, optional
+            Size of the block in bytes. If None, the arena starts in
+            recording mode: buffers are allocated from the pool while
+            the bytes needed are measured, and the block is sized from
+            them at the first reset or release.
+
+        stream : c_void_p, optional
+            CUDA stream the block is used on.
+
+        alignment : int, optional
+            Byte alignment of every buffer.
+
+        Attributes
+        ----------
+        nbytes : int or None
+            Size of the block in bytes.
+
+        high_water : int
+            Most bytes used between two resets, including padding.
+
+        n_overflows : int
+            Number of buffers that did not fit and were allocated
+            from the pool instead.
+
+        Notes
+        -----
+        Buffers are non-owning views of the block. They must not be
+        used after reset or release, and work using them on streams
+        other than the arena stream must be synchronized first. If a
+        pass overflows, the block is grown at the next reset.
+        """
+        self.pool = pool
+        self.nbytes = nbytes
+        self.stream = stream
+        self.alignment = alignment
+        self.high_water = 0
+        self.n_overflows = 0
+        self._block = None
+        self._offset = 0
+        self._overflow = []
+        self._reserve()
+
+
+    def malloc(self, shape, dtype, fill=None, stream=None):
+        """
+        Allocates a buffer from the arena.
+
+        Parameters
+        ----------
+        shape : tuple
+            The shape of the array to allocate.
+
+        dtype : np.dtype
+            That data type of the array.
+
+        fill : scalar, np.ndarray, or Device_Ptr, optional
+            Default value to set allocated array to.
+
+        stream : c_void_p, optional
+            CUDA stream to associate the returned object with.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            The buffer, a view of the arena block.
+        """
+        stream = stream or self.stream
+        start = _align(self._offset, self.alignment)
+        end = start + prod(shape)*np.dtype(dtype).itemsize
+        self._offset = end
+        self.high_water = max(self.high_water, end)
+
+        if self._block is None or end > self.nbytes:
+            d_arr = Device_Ptr(shape, dtype, fill, stream, self.pool)
+            self._overflow.append(d_arr)
+            self.n_overflows += 1
+            return d_arr
+
+        d_arr = Device_Ptr.from_ptr(self._block.value + start, shape, dtype,
+                                    stream, offset=start, base=self)
+        if fill is not None:
+            d_arr._init_fill(fill)
+        return d_arr
+
+
+    def reset(self):
+        """
+        Release every buffer at once, keeping the block for the next
+        pass. The block is grown if the last pass overflowed it.
+        """
+        self._free_overflow()
+        if self.high_water > (self.nbytes or 0):
+            self._free_block()
+            self.nbytes = self.high_water
+            self._reserve()
+        self._offset = 0
+
+
+    def release(self):
+        """
+        Release every buffer, and return the block to the pool. The
+        arena can be used again, reserving a block of the size it
+        has measured.
+        """
+        self._free_overflow()
+        self._free_block()
+        self.nbytes = max(self.nbytes or 0, self.high_water) or None
+        self._offset = 0
+
+
+    @property
+    def used(self):
+        """
+        Bytes handed out since the last reset, including padding.
+        """
+        return self._offset
+
+
+    def _reserve(self):
+        if self._block is None and self.nbytes:
+            self._block = self.pool.malloc(self.nbytes, self.stream)
+
+
+    def _free_block(self):
+        if self._block is not None:
+            self.pool.free(self._block, self.stream)
+            self._block = None
+
+
+    def _free_overflow(self):
+        for d_arr in self._overflow:
+            d_arr.__exit__()
+        self._overflow = []
+
+
+    def __repr__(self):
+        return ("Arena(nbytes=%s, used=%i, high_water=%i, n_overflows=%i)"
+                %(self.nbytes, self.used, self.high_water, self.n_overflows))
+
+
+    def __enter__(self):
+        self._reserve()
+        return self
+
+
+    def __exit__(self, *args, **kwargs):
+        """
+        Release every buffer and return the block to the pool.
+        """
+        self.release()
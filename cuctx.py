@@ -1,14 +1,38 @@
 # -*- coding: utf-8 -*-
 __all__ = [
     "cuCtx",
+    "current_context",
 ]
 
+from contextlib import contextmanager
+import threading
+
 # Local imports
 from cuda_helpers import (cu_context_create,
                           cu_context_destroy,
                           cu_context_pop,
                           cu_context_push)
 
+# The cuCtx objects pushed on each thread's CUDA context stack, so the 
+# current context is known without asking the driver
+_local = threading.local()
+
+
+def _stack():
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def current_context():
+    """
+    The cuCtx last pushed on the calling thread, or None.
+    """
+    stack = _stack()
+    return stack[-1] if stack else None
+
 
 class cuCtx(object):
 
@@ -25,20 +49,53 @@ class cuCtx(object):
         ----------
         context : c_void_p (CUcontext*)
             Pointer to the CUDA device context.
+
+        bound : bool
+            True if the context is bound to the calling thread.
+
+        is_current : bool
+            True if the context is the current one of the calling 
+            thread.
+
+        n_pushes : int
+            Number of context pushes made to the driver, by every 
+            thread.
+
+        n_pops : int
+            Number of context pops made to the driver.
+
+        n_skipped : int
+            Number of push/pop pairs skipped as the context was 
+            already current.
             
         Notes
         -----
         General use of this framework will never require directly calling 
         or using object, and should only be explicitly called for 
         special and advanced use cases.
+
+        The context is created current on the calling thread, as 
+        cuCtxCreate pushes it. The CUDA context stack is per thread. A 
+        thread that drives the 
+        device binds the context once (see bind), after which calls 
+        made through this object skip the push and pop. Pushes and 
+        pops are recorded per thread, and only those made through 
+        cuCtx objects are known.
         """
         self._context = cu_context_create(device.id)
+        _stack().append(self)
+        self._local = threading.local()
+        self._lock = threading.Lock()    # Guards the counters
+        self.n_pushes = 0
+        self.n_pops = 0
+        self.n_skipped = 0
 
         
     def __call__(self, method, *args):
         """
         Push the current CUDA context to the stack, call a method, 
-        and then pop the context from the stack.
+        and then pop the context from the stack. The push and pop 
+        are skipped if the context is already current.
         
         Parameters
         ----------
@@ -51,17 +108,79 @@ class cuCtx(object):
         Returns
         -------
         """
+        with self.active():
+            return method(*args)
+
+
+    @contextmanager
+    def active(self):
+        """
+        Keep the context current on the calling thread for the scope 
+        of a with block, e.g.
+
+        >>> with d.context.active():
+        ...     for arr in arrs:
+        ...         d_arr.to_device(arr)
+
+        Nothing is pushed if the context is already current.
+        """
+        if self.make_current():
+            yield self
+        else:
+            try:
+                yield self
+            finally:
+                self.pop()
+
+
+    def make_current(self):
+        """
+        Push the context, unless it is already current on the calling 
+        thread.
+
+        Returns
+        -------
+        skipped : bool
+            True if the context was already current, and nothing was 
+            pushed.
+        """
+        if self.is_current:
+            self._count('n_skipped')
+            return True
         self.push()
-        tmp = method(*args)
-        self.pop()
-        return tmp
+        return False
+
+
+    def bind(self):
+        """
+        Make the context current on the calling thread until unbind 
+        is called, or the thread exits. Binding twice is a no-op.
+        """
+        if not self.bound:
+            self.push()
+            self._local.bound = True
+
+
+    def unbind(self):
+        """
+        Pop the context bound to the calling thread.
+        """
+        if self.bound:
+            self.pop()
+            self._local.bound = False
         
   
     def pop(self):
         """
-        Pop the current CUDA context from the stack.
+        Pop the current CUDA context from the stack. It must be the 
+        context on top of the calling thread's stack.
         """
+        if not self.is_current:
+            raise RuntimeError("Popping %r, but the current context is %r."
+                               %(self, current_context()))
         cu_context_pop(self.context)
+        _stack().pop()
+        self._count('n_pops')
         
         
     def push(self):
@@ -69,16 +188,42 @@ class cuCtx(object):
         Push the current CUDA context to the stack.
         """
         cu_context_push(self.context)
+        _stack().append(self)
+        self._count('n_pushes')
+
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
  
 
+    @property
+    def bound(self):
+        return getattr(self._local, 'bound', False)
+
+
+    @property
+    def is_current(self):
+        return current_context() is self
+
+
     @property
     def context(self):
         return self._context
 
+
+    def __repr__(self):
+        return ("cuCtx(n_pushes=%i, n_pops=%i, n_skipped=%i)"
+                %(self.n_pushes, self.n_pops, self.n_skipped))
+
         
     def __enter__(self):
         return self
 
 
     def __exit__(self, *args, **kwargs):
-        cu_context_destroy(self._context)
\ No newline at end of file
+        # A context current on the calling thread is popped as it is 
+        # destroyed
+        if self.is_current:
+            _stack().pop()
+        cu_context_destroy(self._context)
@@ -1,22 +1,74 @@
 # -*- coding: utf-8 -*-
 __all__ = [
+    "clear_dblptr_cache",
     "Device_DblPtr",
 ]
 
+from collections import OrderedDict
 from ctypes import cast, c_void_p
 import numpy as np
 
-from cuda_helpers import (cu_free, cu_malloc_dblptr)
+from cuda_helpers import (cu_free,
+                          cu_malloc,
+                          cu_malloc_dblptr,
+                          cu_memcpy_h2d)
+
+# Local imports
+from cuctx import current_context
 
 dtype_map={np.dtype('f4') :0,
            np.dtype('f8') :1,
            np.dtype('c8') :2,
            np.dtype('c16'):3}
 
+# Pointer arrays shared by Device_DblPtr.cached, per context, keyed by
+# (base address, stride, batch size, dtype), or for pointer arrays
+# built from a list, by (addresses, dtype). Least recently used first.
+_caches = {}
+
+# Pointer arrays kept per context
+max_cached_dblptrs = 256
+
+
+def _free(dblptr):
+    cu_free(dblptr.ptr)
+    dblptr.ptr = None
+
+
+def _evict(dblptr):
+    # Once the cache drops it, __del__ frees it when callers have too
+    dblptr._cached = False
+
+
+def clear_dblptr_cache(context):
+    """
+    Free every pointer array cached in a context. Only call once no 
+    cached Device_DblPtr is in use, as when the device exits.
+
+    Parameters
+    ----------
+    context : cuCtx
+        The context, current on the calling thread.
+    """
+    for dblptr in _caches.pop(context, {}).values():
+        _free(dblptr)
+
+
+def _packed(device_ptr, n, batch_size):
+    """
+    Stride and batch size of packed matrices. Without n, the leading 
+    axis of device_ptr (or batch_size) counts the matrices.
+    """
+    if n is None:
+        batch_size = batch_size or device_ptr.shape[0]
+        return device_ptr.size//batch_size, batch_size
+    m, n = (n, n) if np.ndim(n) == 0 else n
+    return m*n, batch_size
+
 
 class Device_DblPtr(object):
     
-    def __init__(self, device_ptr, n, batch_size):
+    def __init__(self, device_ptr, n, batch_size, stride=None):
         """
         Allocates space for a double pointer on the device.
 
@@ -24,15 +76,119 @@ class Device_DblPtr(object):
         ----------
         device_ptr : Device_Ptr
             Original Device_Ptr object to map to double pointer.
+
+        n : int, tuple or None
+            Size n of n x n matrices, or the shape (m, n) of
+            rectangular matrices. If None, with stride, the matrices 
+            are the leading axis of device_ptr.
+
+        batch_size : int or None
+            Number of matrices. If None, the leading axis of 
+            device_ptr.
+
+        stride : int, optional
+            Step between consecutive matrices in elements. If None, 
+            the matrices are packed, with a stride of m*n.
         """
+        if stride is None:
+            stride, batch_size = _packed(device_ptr, n, batch_size)
+        batch_size = batch_size or device_ptr.shape[0]
         dev_dblptr = cu_malloc_dblptr(device_ptr.ptr,
-                                      n*n, batch_size,
+                                      stride, batch_size,
                                       dtype_map[device_ptr.dtype])
         self.ptr = cast(dev_dblptr, c_void_p)
         self.batch_size = batch_size
         self.dtype = device_ptr.dtype
+        self._cached = False
+
+
+    @classmethod
+    def from_list(cls, device_ptrs):
+        """
+        Build a double pointer from a list of matrices anywhere in
+        device memory.
+
+        Parameters
+        ----------
+        device_ptrs : list of Device_Ptr
+            The matrices, all of the same data type.
+
+        Returns
+        -------
+        Device_DblPtr : Device_DblPtr
+            Pointer array with one entry per matrix.
+        """
+        addrs = np.array([p.ptr.value for p in device_ptrs], dtype=np.uintp)
+        self = cls.__new__(cls)
+        self.ptr = cast(cu_malloc(addrs.nbytes), c_void_p)
+        cu_memcpy_h2d(self.ptr, addrs, addrs.nbytes)
+        self.batch_size = len(addrs)
+        self.dtype = device_ptrs[0].dtype
+        self._cached = False
+        return self
+
+
+    @classmethod
+    def cached(cls, device_ptr, n=None, batch_size=None, stride=None):
+        """
+        Return a shared double pointer, building and uploading it
+        only the first time. Repeated batched calls on the same
+        buffers then reuse the device pointer array.
+
+        Parameters
+        ----------
+        device_ptr : Device_Ptr or list of Device_Ptr
+            Original Device_Ptr object, or list of matrices as in
+            from_list.
+
+        n : int or tuple, optional
+            Size or (m, n) shape of the matrices. Not used for lists.
+
+        batch_size : int, optional
+            Number of matrices. Not used for lists.
+
+        stride : int, optional
+            Step between consecutive matrices in elements.
+
+        Returns
+        -------
+        Device_DblPtr : Device_DblPtr
+            The cached object. Its __exit__ does nothing, cached
+            pointer arrays are freed by clear_dblptr_cache, or once 
+            evicted from the cache and no longer referenced.
+
+        Notes
+        -----
+        The key holds addresses rather than objects, so a pointer
+        array stays valid when the memory is freed and the same
+        addresses are handed out again. Pointer arrays are cached 
+        per context, and the least recently used one is evicted when 
+        more than max_cached_dblptrs are cached. An evicted pointer 
+        array stays valid for callers that still hold it, and is 
+        freed as the last of them drops it.
+        """
+        if isinstance(device_ptr, (list, tuple)):
+            key = (tuple(p.ptr.value for p in device_ptr), device_ptr[0].dtype)
+        else:
+            if stride is None:
+                stride, batch_size = _packed(device_ptr, n, batch_size)
+            batch_size = batch_size or device_ptr.shape[0]
+            key = (device_ptr.ptr.value, stride, batch_size, device_ptr.dtype)
+
+        cache = _caches.setdefault(current_context(), OrderedDict())
+        dblptr = cache.pop(key, None)
+        if dblptr is None:
+            if isinstance(device_ptr, (list, tuple)):
+                dblptr = cls.from_list(device_ptr)
+            else:
+                dblptr = cls(device_ptr, None, batch_size, stride)
+            dblptr._cached = True
+            while len(cache) >= max_cached_dblptrs:
+                _evict(cache.popitem(last=False)[1])
+        cache[key] = dblptr
+        return dblptr
+
 
-    
     def __call__(self):
         return self.ptr
     
@@ -52,7 +208,18 @@ class Device_DblPtr(object):
     def __exit__(self, *args, **kwargs):
         """
         Frees the memory used by the object, and then 
-        deletes the object.
+        deletes the object. Cached objects are left alone.
         """
+        if self._cached or self.ptr is None:
+            return
         cu_free(self.ptr)
-        del self
\ No newline at end of file
+        self.ptr = None
+
+
+    def __del__(self):
+        if getattr(self, '_cached', True) or getattr(self, 'ptr', None) is None:
+            return
+        try:
+            cu_free(self.ptr)
+        except Exception:
+            pass
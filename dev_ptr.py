@@ -4,8 +4,6 @@ __all__ = [
 ]
 
 from ctypes import cast, c_void_p
-from functools import reduce
-from operator import mul
 import numpy as np
 import warnings
 
@@ -30,22 +28,122 @@ from cuda_helpers import (cu_conj,
                           cu_memcpy_d2h_async,
                           cu_memcpy_h2d_async,
                           cu_memset_async,
+                          cu_sync_stream,
                           cu_transpose)
 
+# Local imports
+from kernel_helpers import (cu_astype,
+                            cu_fill,
+                            cu_memcpy_strided,
+                            cu_memcpy_strided_async,
+                            cu_reduce,
+                            cu_reduce_workspace,
+                            cu_transpose_batched,
+                            MEMCPY_D2D,
+                            MEMCPY_D2H,
+                            MEMCPY_H2D,
+                            REDUCE_ARGMAX,
+                            REDUCE_ARGMIN,
+                            REDUCE_MAX,
+                            REDUCE_MIN,
+                            REDUCE_SUM,
+                            REDUCE_SUMSQ)
+from interop import (dlpack_device,
+                     export_cuda_array,
+                     export_dlpack,
+                     import_cuda_array,
+                     import_dlpack,
+                     sync_streams)
+from event import Event
+from ipc import export_ipc
+from pinned_pool import (Host_Future,
+                         get_staging_pool)
+from strides import (as_shape,
+                     copy_layout,
+                     c_strides,
+                     is_c_contiguous,
+                     prod)
+
 dtype_map={np.dtype('f4') :0,
            np.dtype('f8') :1,
            np.dtype('c8') :2,
-           np.dtype('c16'):3}
+           np.dtype('c16'):3,
+           np.dtype('f2') :4,
+           np.dtype('i1') :5,
+           np.dtype('i2') :6,
+           np.dtype('i4') :7,
+           np.dtype('u1') :8,
+           np.dtype('u2') :9}
 
 c2f_map={np.dtype('f4') : 0,
          np.dtype('f8') : 1,
          np.dtype('c8') : 0,
          np.dtype('c16'): 1}
 
+real_map={np.dtype('c8') : np.dtype('f4'),
+          np.dtype('c16'): np.dtype('f8')}
+
+
+def is_strided(arr):
+    return not arr.flags['C_CONTIGUOUS'] and not arr.flags['F_CONTIGUOUS']
+
+
+def memcpy_strided(dst, dst_strides, src, src_strides, shape, itemsize,
+                   kind, stream=None, async_copy=False):
+    """
+    Copy between two arrays of the same shape and different strides 
+    with pitched 2D/3D memcpys, without any intermediate copies.
+
+    Parameters
+    ----------
+    dst : int
+        Destination address.
+
+    dst_strides : tuple
+        Byte strides of the destination.
+
+    src : int
+        Source address.
+
+    src_strides : tuple
+        Byte strides of the source.
+
+    shape : tuple
+        The shape of both arrays.
+
+    itemsize : int
+        Size of a single element in bytes.
 
-def check_contiguous(arr):
-    if not arr.flags['C_CONTIGUOUS'] and not arr.flags['F_CONTIGUOUS']:
-        warnings.warn("Non-contiguous host memory detected, unexpected behavior/results may occur.")
+    kind : int
+        Direction of the copy, one of MEMCPY_H2D, MEMCPY_D2H, 
+        or MEMCPY_D2D.
+
+    stream : c_void_p, optional
+        CUDA stream pointer, used if async_copy is True.
+
+    async_copy : bool, optional
+        Issue asynchronous copies on the stream.
+
+    Returns
+    -------
+    copied : bool
+        False if the strides cannot be expressed as pitched copies, 
+        in which case nothing was copied.
+    """
+    layout = copy_layout(shape, itemsize, dst_strides, src_strides)
+    if layout is None:
+        return False
+    width, height, depth, pitches, slices, offsets = layout
+    for dst_off, src_off in offsets:
+        if async_copy:
+            cu_memcpy_strided_async(dst + dst_off, pitches[0], slices[0],
+                                    src + src_off, pitches[1], slices[1],
+                                    width, height, depth, kind, stream)
+        else:
+            cu_memcpy_strided(dst + dst_off, pitches[0], slices[0],
+                              src + src_off, pitches[1], slices[1],
+                              width, height, depth, kind)
+    return True
 
 
 def check_input(a,b):
@@ -55,9 +153,20 @@ def check_input(a,b):
         warnings.warn("Attempting arithmetic on arrays with shapes that are not equal, unexpected behavior/results may occur.")
 
 
+def require_contiguous(*ptrs):
+    for ptr in ptrs:
+        if not ptr.contiguous:
+            raise ValueError("Operation requires a contiguous Device_Ptr, got a strided view.")
+
+
+def require_arithmetic(ptr):
+    if ptr.dtype not in c2f_map:
+        raise TypeError("Arithmetic is supported for f4, f8, c8, and c16 arrays, not %s."%ptr.dtype)
+
+
 class Device_Ptr(object):
     
-    def __init__(self, shape, dtype, fill=None, stream=None):
+    def __init__(self, shape, dtype, fill=None, stream=None, pool=None):
         """
         Allocates device memory, holds important information, 
         and provides useful operations.
@@ -72,45 +181,399 @@ class Device_Ptr(object):
 
         fill : scalar, np.ndarray, or Device_Ptr, optional
             Default value to fill in allocated memory space. If 
-            None, then the memory is allocated with zeros.
+            None, the memory is left uninitialized, and may hold 
+            stale data from a block reused by the pool. Use zero 
+            or fill=0 where zeroed memory is needed.
             
         stream : c_void_p
             CUDA stream to associate the returned object with.
+
+        pool : Memory_Pool, optional
+            Pool to allocate the memory from. If None, the memory 
+            is allocated and freed directly with cudaMalloc/cudaFree.
+            If the pool has a tracker, the memory is also returned 
+            to the pool when the object is garbage collected.
+
+        Attributes
+        ----------
+        strides : tuple
+            Byte step of each dimension.
+
+        offset : int
+            Byte offset of ptr into the underlying allocation.
+
+        base : object
+            The object that owns the memory if this is a view, 
+            otherwise None.
+
+        ready : Event or None
+            Event recorded by record_ready once the data has been 
+            produced, that consumers on other streams wait on.
         """
         
         self.shape = shape
         self.dtype = np.dtype(dtype)
         self.stream = stream
-        
-        try:
-            self.size = reduce(mul,shape)
-        except:
-            self.size = int(shape)
-        
+        self.pool = pool
+        self.size = prod(shape)
         self.nbytes = self.size*self.dtype.itemsize
-        dev_ptr = cu_malloc(self.nbytes)
-        self.ptr = cast(dev_ptr, c_void_p)
+        self.strides = c_strides(shape, self.dtype.itemsize)
+        self.offset = 0
+        self.base = None
+        self.ready = None
+        self._owns = True
+        if pool is not None:
+            self.ptr = pool.malloc(self.nbytes, stream)
+            if pool.tracker is not None:
+                pool.tracker.track(self, self.ptr.value, self.nbytes, stream)
+        else:
+            dev_ptr = cu_malloc(self.nbytes)
+            self.ptr = cast(dev_ptr, c_void_p)
         
         if fill is not None:
-            if isinstance(fill, (int, float, complex)):
-                tmp_arr = np.full(shape, fill, dtype=self.dtype)
-                self.to_device(tmp_arr)
-                del tmp_arr
-            elif type(fill) in [list,tuple]:
-                tmp_arr = np.array(fill, dtype=self.dtype)
-                self.to_device(tmp_arr, tmp_arr.nbytes)
-                del tmp_arr
-            elif type(fill) == type(self):
-                self.d2d(src=fill, dst=self)
-            elif type(fill) == np.ndarray:
-                fill = np.require(fill, dtype=self.dtype, requirements='C')
-                self.to_device(fill, fill.nbytes)
-            else:
-                raise TypeError('Unsupported fill value or type input')
+            self._init_fill(fill)
 
     
+    @classmethod
+    def from_ptr(cls, ptr, shape, dtype, stream=None, strides=None,
+                 offset=0, base=None):
+        """
+        Wrap existing device memory in a non-owning Device_Ptr. 
+        No memory is allocated or copied, and the memory is not 
+        freed when the returned object exits.
+
+        Parameters
+        ----------
+        ptr : c_void_p or int
+            Device address of the first element.
+
+        shape : tuple
+            The shape of the array.
+
+        dtype : np.dtype
+            That data type of the array.
+
+        stream : c_void_p, optional
+            CUDA stream to associate the returned object with.
+
+        strides : tuple, optional
+            Byte step of each dimension. If None, the memory is 
+            taken to be C-contiguous.
+
+        offset : int, optional
+            Byte offset of ptr into the underlying allocation.
+
+        base : object, optional
+            Object that owns the memory. A reference is held so 
+            the memory outlives the view.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            Non-owning view of the memory.
+        """
+        self = cls.__new__(cls)
+        self.shape = as_shape(shape)
+        self.dtype = np.dtype(dtype)
+        self.stream = stream
+        self.pool = None
+        self.size = prod(self.shape)
+        self.nbytes = self.size*self.dtype.itemsize
+        self.strides = (tuple(strides) if strides is not None 
+                        else c_strides(self.shape, self.dtype.itemsize))
+        self.offset = offset
+        self.base = base
+        self.ready = None
+        self._owns = False
+        self.ptr = c_void_p(ptr.value if isinstance(ptr, c_void_p) else ptr)
+        return self
+
+
+    @classmethod
+    def from_cuda_array(cls, obj, stream=None):
+        """
+        Wrap the memory of an object exporting 
+        __cuda_array_interface__ (CuPy, Numba, PyTorch, ...) in a 
+        non-owning Device_Ptr, without copying.
+
+        Parameters
+        ----------
+        obj : object
+            The producer object. A reference is held so the memory 
+            outlives the returned object.
+
+        stream : c_void_p, optional
+            CUDA stream the memory will be used on. If the producer 
+            exports a different stream, that stream is synchronized.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            Non-owning view of the producer's memory.
+        """
+        addr, shape, dtype, strides = import_cuda_array(obj, stream)
+        return cls.from_ptr(addr, shape, dtype, stream, strides, base=obj)
+
+
+    @classmethod
+    def from_dlpack(cls, obj, stream=None):
+        """
+        Wrap the memory of a DLPack producer in a non-owning 
+        Device_Ptr, without copying.
+
+        Parameters
+        ----------
+        obj : object
+            Object exporting __dlpack__, or a DLPack capsule.
+
+        stream : c_void_p, optional
+            CUDA stream the memory will be used on. It is passed to 
+            the producer, which makes it wait on pending work.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            Non-owning view of the producer's memory. The producer's 
+            deleter is called once it, and every view of it, is gone.
+        """
+        addr, shape, dtype, strides, owner = import_dlpack(obj, stream)
+        return cls.from_ptr(addr, shape, dtype, stream, strides, base=owner)
+
+
+    @property
+    def __cuda_array_interface__(self):
+        """
+        Version 3 CUDA Array Interface, exporting the memory to 
+        CuPy, Numba, PyTorch, and other consumers without copying.
+        The consumer synchronizes with this object's stream.
+        """
+        return export_cuda_array(self.ptr, self.shape, self.dtype,
+                                 self.strides, self.stream)
+
+
+    def __dlpack__(self, stream=None, **kwargs):
+        """
+        Export the memory as a DLPack capsule, without copying.
+
+        Parameters
+        ----------
+        stream : int, optional
+            Stream handle the consumer will use the memory on. If it 
+            differs from this object's stream, this object's stream 
+            is synchronized first. -1 skips synchronization.
+
+        **kwargs
+            Newer protocol arguments (max_version, dl_device, copy) 
+            are accepted, and an unversioned capsule is returned.
+
+        Returns
+        -------
+        capsule : PyCapsule
+            Capsule holding a DLManagedTensor. The memory is not 
+            freed while a consumer holds it, but must not be freed 
+            through __exit__ before the consumer is done with it.
+        """
+        sync_streams(self.stream, stream)
+        return export_dlpack(self.ptr, self.shape, self.dtype, self.strides,
+                             self.__dlpack_device__(), self.owner)
+
+
+    def __dlpack_device__(self):
+        return dlpack_device(self.ptr)
+
+
+    def record_ready(self, stream=None):
+        """
+        Mark the data as produced by the work queued so far on a
+        stream, so consumers on other streams can wait for it with
+        wait_ready instead of synchronizing the host.
+
+        Parameters
+        ----------
+        stream : c_void_p, optional
+            The producing stream. If None, self.stream is used.
+
+        Returns
+        -------
+        ready : Event
+            The ready event, reused by later calls.
+        """
+        if self.ready is None:
+            self.ready = Event(timing=False)
+        return self.ready.record(stream or self.stream)
+
+
+    def wait_ready(self, stream=None):
+        """
+        Make future work on a stream wait until the data is ready.
+        Does nothing if record_ready was never called.
+
+        Parameters
+        ----------
+        stream : c_void_p, optional
+            The consuming stream. If None, self.stream is used.
+        """
+        if self.ready is not None:
+            self.ready.wait(stream or self.stream)
+
+
+    def is_ready(self):
+        """
+        True, without blocking, if the work before the last
+        record_ready has completed.
+        """
+        return self.ready is None or self.ready.query()
+
+
+    def export_ipc(self, event=None, stream=None):
+        """
+        Export the memory to other processes on the same machine, 
+        without copying, through a CUDA IPC memory handle.
+
+        Parameters
+        ----------
+        event : Ipc_Event, optional
+            Interprocess event recorded on the stream and sent with 
+            the handle, so the importer waits for pending writes.
+
+        stream : c_void_p, optional
+            CUDA stream the memory was last written on.
+
+        Returns
+        -------
+        handle : Ipc_Handle
+            Picklable handle, passed to Device.import_ipc in the 
+            other process.
+
+        Notes
+        -----
+        The importer never frees the memory. It must stay allocated 
+        here until every importer is done with it.
+        """
+        if self.nbytes == 0:
+            raise ValueError("Cannot export an empty Device_Ptr.")
+        stream = stream or self.stream
+        return export_ipc(self.ptr, self.shape, self.dtype, self.strides,
+                          stream, event)
+
+
     def __call__(self):
         return self.ptr
+
+
+    def __getitem__(self, key):
+        """
+        Index or slice the array, numpy style, returning a 
+        non-owning view that shares this object's memory.
+
+        Parameters
+        ----------
+        key : int, slice, or tuple of ints and slices
+            Index along the leading dimension(s).
+
+        Returns
+        -------
+        view : Device_Ptr
+            View of the selected elements. Integer indexing of 
+            every dimension returns a 0-d view.
+        """
+        if not isinstance(key, tuple):
+            key = (key,)
+        shape = as_shape(self.shape)
+        if len(key) > len(shape):
+            raise IndexError("Too many indices for Device_Ptr of ndim=%i."%len(shape))
+
+        delta = 0
+        new_shape = []
+        new_strides = []
+        for i, k in enumerate(key):
+            n, stride = shape[i], self.strides[i]
+            if isinstance(k, slice):
+                start, stop, step = k.indices(n)
+                new_shape.append(len(range(start, stop, step)))
+                new_strides.append(stride*step)
+                delta += start*stride
+            else:
+                k = int(k)
+                if k < 0:
+                    k += n
+                if not 0 <= k < n:
+                    raise IndexError("Index %i out of bounds for axis %i with size %i."%(k, i, n))
+                delta += k*stride
+        new_shape.extend(shape[len(key):])
+        new_strides.extend(self.strides[len(key):])
+
+        return Device_Ptr.from_ptr(self.ptr.value + delta,
+                                   new_shape,
+                                   self.dtype,
+                                   stream=self.stream,
+                                   strides=new_strides,
+                                   offset=self.offset + delta,
+                                   base=self.owner)
+
+
+    def reshape(self, *shape):
+        """
+        Return a view of the array with a new shape. One dimension 
+        may be -1, in which case it is inferred.
+
+        Parameters
+        ----------
+        *shape : tuple or ints
+            The new shape.
+
+        Returns
+        -------
+        view : Device_Ptr
+            Non-owning view with the new shape.
+        """
+        require_contiguous(self)
+        if len(shape) == 1 and not isinstance(shape[0], int):
+            shape = shape[0]
+        shape = list(as_shape(shape))
+        if -1 in shape:
+            known = -prod(shape)
+            shape[shape.index(-1)] = self.size//known if known else 0
+        if prod(shape) != self.size:
+            raise ValueError("Cannot reshape array of size %i into shape %s."%(self.size, tuple(shape)))
+        return Device_Ptr.from_ptr(self.ptr,
+                                   shape,
+                                   self.dtype,
+                                   stream=self.stream,
+                                   offset=self.offset,
+                                   base=self.owner)
+
+
+    def view(self, dtype):
+        """
+        Return a view of the memory interpreted as another data 
+        type. The last dimension is scaled by the ratio of the 
+        item sizes, e.g. a c8 array of shape (m,n) viewed as 'f4' 
+        has shape (m,2*n) of interleaved real and imaginary parts.
+
+        Parameters
+        ----------
+        dtype : np.dtype
+            The data type to view the memory as.
+
+        Returns
+        -------
+        view : Device_Ptr
+            Non-owning view with the new data type.
+        """
+        require_contiguous(self)
+        dtype = np.dtype(dtype)
+        shape = list(as_shape(self.shape)) or [1]
+        row_bytes = shape[-1]*self.dtype.itemsize
+        if row_bytes % dtype.itemsize:
+            raise ValueError("Last dimension of %i bytes is not divisible by the itemsize of %s."%(row_bytes, dtype))
+        shape[-1] = row_bytes//dtype.itemsize
+        return Device_Ptr.from_ptr(self.ptr,
+                                   shape,
+                                   dtype,
+                                   stream=self.stream,
+                                   offset=self.offset,
+                                   base=self.owner)
     
     
     def __len__(self):
@@ -138,6 +601,7 @@ class Device_Ptr(object):
         self : Device_Ptr
             Returns self with updated values in self.ptr
         """
+        require_contiguous(self)
         cu_iabs(self.ptr,
                 self.size,
                 dtype_map[self.dtype],
@@ -162,7 +626,10 @@ class Device_Ptr(object):
         self : Device_Ptr
             Returns self with updated values in self.ptr
         """
+        require_contiguous(self)
+        require_arithmetic(self)
         if type(b) == type(self):
+            require_contiguous(b)
             check_input(self,b)
             cu_iadd_vec(self.ptr,
                         b.ptr,
@@ -198,7 +665,10 @@ class Device_Ptr(object):
         self : Device_Ptr
             Returns self with updated values in self.ptr
         """
+        require_contiguous(self)
+        require_arithmetic(self)
         if type(b) == type(self):
+            require_contiguous(b)
             check_input(self,b)
             cu_imul_vec(self.ptr,
                         b.ptr,
@@ -234,7 +704,10 @@ class Device_Ptr(object):
         self : Device_Ptr
             Returns self with updated values in self.ptr
         """
+        require_contiguous(self)
+        require_arithmetic(self)
         if type(b) == type(self):
+            require_contiguous(b)
             check_input(self,b)
             cu_isub_vec(self.ptr,
                         b.ptr,
@@ -270,7 +743,10 @@ class Device_Ptr(object):
         self : Device_Ptr
             Returns self with updated values in self.ptr
         """
+        require_contiguous(self)
+        require_arithmetic(self)
         if type(b) == type(self):
+            require_contiguous(b)
             check_input(self,b)
             cu_idiv_vec(self.ptr,
                         b.ptr,
@@ -291,6 +767,7 @@ class Device_Ptr(object):
 
     
     def __pow__(self, b):
+        require_contiguous(self)
         cu_ipow(self.ptr,
                 self.size,
                 np.array([b], dtype='f8'),
@@ -301,12 +778,12 @@ class Device_Ptr(object):
 
     def T(self, stream=None):
         """
-        Transpose the matrix on the device. This currently only works 
-        with square matrices. Rectangular will be implemented in a 
-        future update.
+        Transpose the matrix in place on the device. This only works 
+        with square matrices. For rectangular matrices and batched 
+        stacks, use the out-of-place transpose.
         """
+        require_contiguous(self)
         stream = stream or self.stream
-#        try:
         nrows, ncols = self.shape
         cu_transpose(self.ptr,
                      nrows,
@@ -314,8 +791,70 @@ class Device_Ptr(object):
                      dtype_map[self.dtype],
                      stream)
         self.shape = self.shape[::-1]
-#        except:
-#            warnings.warn("Transpose failed on array with ndim=%i."%len(self.shape))
+
+
+    def transpose(self, axes=None, out=None, stream=None):
+        """
+        Out-of-place transpose on the device using a tiled, shared 
+        memory kernel. Works with rectangular matrices and batched 
+        stacks, e.g. (batch, m, n) -> (batch, n, m).
+
+        Parameters
+        ----------
+        axes : tuple, optional
+            Permutation of the axes. Only permutations that swap two 
+            axes are supported. If None, the last two axes are swapped.
+
+        out : Device_Ptr, optional
+            Destination with room for the result. If None, it is 
+            allocated.
+
+        stream : c_void_p, optional
+            CUDA stream pointer.
+
+        Returns
+        -------
+        out : Device_Ptr
+            The transposed array.
+        """
+        require_contiguous(self)
+        stream = stream or self.stream
+        shape = as_shape(self.shape)
+        ndim = len(shape)
+        if ndim < 2:
+            raise ValueError("Transpose requires an array with ndim >= 2.")
+        if axes is None:
+            axes = tuple(range(ndim-2)) + (ndim-1, ndim-2)
+        axes = tuple(ax % ndim for ax in axes)
+        if sorted(axes) != list(range(ndim)):
+            raise ValueError("axes %s is not a permutation of %i axes."%(axes, ndim))
+        swapped = [i for i, ax in enumerate(axes) if ax != i]
+        if len(swapped) not in (0, 2):
+            raise ValueError("Only permutations that swap two axes are supported.")
+
+        out_shape = tuple(shape[ax] for ax in axes)
+        if out is None:
+            out = Device_Ptr(out_shape, self.dtype, stream=stream, pool=self.pool)
+        else:
+            require_contiguous(out)
+            if out.dtype != self.dtype or as_shape(out.shape) != out_shape:
+                raise ValueError("Transpose destination must have dtype %s and shape %s."%(self.dtype, out_shape))
+
+        if not swapped:
+            self.d2d_async(self, out, stream)
+            return out
+
+        i, j = swapped
+        cu_transpose_batched(self.ptr,
+                             out.ptr,
+                             prod(shape[:i]),
+                             shape[i],
+                             prod(shape[i+1:j]),
+                             shape[j],
+                             prod(shape[j+1:]),
+                             self.dtype.itemsize,
+                             stream)
+        return out
 
 
     def conj(self, inplace=True, stream=None):
@@ -323,6 +862,7 @@ class Device_Ptr(object):
         Take and return the complex conjugate.
         """
         if self.dtype in [np.dtype('c8'), np.dtype('c16')]:
+            require_contiguous(self)
             stream = stream or self.stream
             if inplace:
                 cu_conj(self.ptr, self.size, dtype_map[self.dtype], stream)
@@ -331,7 +871,8 @@ class Device_Ptr(object):
                 new_Device_Ptr = Device_Ptr(self.shape,
                                             self.dtype,
                                             stream=stream,
-                                            fill=self)
+                                            fill=self,
+                                            pool=self.pool)
                 new_Device_Ptr.conj()
                 return new_Device_Ptr
     
@@ -339,9 +880,9 @@ class Device_Ptr(object):
     @classmethod
     def d2d(self, src, dst, nbytes=None):
         """
-        Copy memory from 'device to device'. This works both 
-        for copying memory to a separate device, or for creating a 
-        copy of memory on the same device.
+        Copy memory from 'device to device', creating a copy of 
+        memory on the same device. For a copy to a separate device, 
+        see Device.to_peer_async.
         
         Parameters
         ----------
@@ -354,6 +895,9 @@ class Device_Ptr(object):
         nbytes : int
             Size to copy/transfer in bytes.
         """
+        if not (src.contiguous and dst.contiguous):
+            src._strided_d2d(dst)
+            return
         nbytes = min([src.nbytes, nbytes or src.nbytes])
         if nbytes > dst.nbytes:
             raise ValueError('Attempted to copy a src with size greater than dst.')
@@ -362,7 +906,7 @@ class Device_Ptr(object):
 
     def to_host(self, arr=None, nbytes=None):
         """
-        Copy contiguous memory from the device to the host.
+        Copy memory from the device to the host.
         'device to host'
 
         Parameters
@@ -385,14 +929,23 @@ class Device_Ptr(object):
         Having arr created and pinned long beforehand will improve 
         overall performance. Using arr=None should only be used for 
         development, testing, and debugging purposes.
+
+        If arr is a strided host view, e.g. a sub-array of a larger 
+        image, or self is a strided view, the copy is done with 
+        pitched 2D/3D memcpys directly into arr, and nbytes is ignored.
         """
         nbytes = min([self.nbytes, nbytes or self.nbytes])
         if arr is not None:
-            check_contiguous(arr)
-            cu_memcpy_d2h(self.ptr, arr, nbytes)
+            if not self.contiguous or is_strided(arr):
+                self._strided_copy(arr, MEMCPY_D2H)
+            else:
+                cu_memcpy_d2h(self.ptr, arr, nbytes)
         else:
             tmp_arr = np.empty(self.shape, self.dtype)
-            cu_memcpy_d2h(self.ptr, tmp_arr, nbytes)
+            if not self.contiguous:
+                self._strided_copy(tmp_arr, MEMCPY_D2H)
+            else:
+                cu_memcpy_d2h(self.ptr, tmp_arr, nbytes)
             return tmp_arr
             
     
@@ -408,21 +961,38 @@ class Device_Ptr(object):
 
         nbytes : int, optional
             Size to transfer in bytes.
+
+        Notes
+        -----
+        If arr is a strided host view, e.g. a sub-array of a larger 
+        image, or self is a strided view, the copy is done with 
+        pitched 2D/3D memcpys straight from arr, and nbytes is ignored.
+
+        If arr has a narrower data type, it is sent in its native 
+        type and widened on the device, so narrow host data (e.g. 
+        int16 samples into a c8 array) is not widened on the host. 
+        nbytes then counts bytes of the device data type. Wider host 
+        data is converted on the host, with a warning.
         """
         if arr.dtype != self.dtype:
+            if self._convertible(arr):
+                self._to_device_convert(arr, nbytes)
+                return
             warnings.warn("Dtype mismatch copying host array to device, forcing device type.")
             arr = arr.astype(self.dtype)
+        if not self.contiguous or is_strided(arr):
+            self._strided_copy(arr, MEMCPY_H2D)
+            return
         nbytes = min([self.nbytes, nbytes or self.nbytes, arr.nbytes])
-        check_contiguous(arr)
         cu_memcpy_h2d(self.ptr, arr, nbytes)
         
     
     @classmethod
     def d2d_async(self, src, dst, stream=None, nbytes=None):
         """
-        Copy memory from device to device. This works both 
-        for copying memory to a separate device, or creating a 
-        copy of memory on the same device.
+        Copy memory from device to device, creating a copy of 
+        memory on the same device. For a copy to a separate device, 
+        see Device.to_peer_async.
 
         Parameters
         ----------
@@ -438,8 +1008,11 @@ class Device_Ptr(object):
         nbytes : int
             Size to copy/transfer in bytes.
         """
-        nbytes = min([src.nbytes, nbytes or src.nbytes])
         stream = stream or src.stream
+        if not (src.contiguous and dst.contiguous):
+            src._strided_d2d(dst, stream, async_copy=True)
+            return
+        nbytes = min([src.nbytes, nbytes or src.nbytes])
         if nbytes > dst.nbytes:
             raise ValueError('Attempted to copy a src with size greater than dst.')
         cu_memcpy_d2d_async(src.ptr, dst.ptr, nbytes, stream)
@@ -447,7 +1020,7 @@ class Device_Ptr(object):
 
     def to_host_async(self, arr=None, stream=None, nbytes=None):
         """
-        Copy contiguous memory from the device to the host.
+        Copy memory from the device to the host.
 
         Parameters
         ----------
@@ -460,34 +1033,47 @@ class Device_Ptr(object):
         nbytes : int, optional
             Size to transfer in bytes.
             
-        Returns, optional
+        Returns
         -------
-        tmp_arr : np.ndarray
-            Returns the array from the device to newly allocated 
-            existing memory, if none was passed in. Otherwise 
-            the copy is done to arr.
+        future : Host_Future
+            Handle to the pending copy. future.result() waits on the 
+            stream and returns the host array: arr if one was passed 
+            in, otherwise a new array copied out of a pinned staging 
+            buffer that is then reused by later copies.
             
         Notes
         -----
         Having arr created and pinned long beforehand will improve 
-        overall performance. Using arr=None should only be used for 
-        development, testing, and debugging purposes.
+        overall performance. With arr=None the copy goes to a pinned 
+        buffer from a reusable pool, so it is truly asynchronous and 
+        many readbacks can be in flight while compute continues.
+
+        Strided host or device views are copied with pitched 
+        2D/3D memcpys, as in to_host.
         """
         nbytes = min([self.nbytes, nbytes or self.nbytes])
         stream = stream or self.stream
     
         if arr is not None:
-            check_contiguous(arr)
-            cu_memcpy_d2h_async(self.ptr, arr, nbytes, stream)
+            if not self.contiguous or is_strided(arr):
+                self._strided_copy(arr, MEMCPY_D2H, stream, async_copy=True)
+            else:
+                cu_memcpy_d2h_async(self.ptr, arr, nbytes, stream)
+            return Host_Future(stream, arr)
+
+        staging_pool = get_staging_pool()
+        block = staging_pool.acquire(self.nbytes)
+        tmp_arr = block[:self.nbytes].view(self.dtype).reshape(self.shape)
+        if not self.contiguous:
+            self._strided_copy(tmp_arr, MEMCPY_D2H, stream, async_copy=True)
         else:
-            tmp_arr = np.empty(self.shape, self.dtype)
-            cu_memcpy_d2h_async(self.ptr, arr, nbytes, stream)
-            return tmp_arr
+            cu_memcpy_d2h_async(self.ptr, tmp_arr, nbytes, stream)
+        return Host_Future(stream, tmp_arr, block, staging_pool)
 
                 
     def to_device_async(self, arr, stream=None, nbytes=None):
         """
-        Copy contiguous memory from the host to the device.
+        Copy memory from the host to the device.
 
         Parameters
         ----------
@@ -499,16 +1085,325 @@ class Device_Ptr(object):
                
         nbytes : int, optional
             Size to transfer in bytes.
+
+        Notes
+        -----
+        Strided host or device views are copied with pitched 
+        2D/3D memcpys, and narrower host data types are widened on 
+        the device, as in to_device.
         """
+        stream = stream or self.stream
         if arr.dtype != self.dtype:
+            if self._convertible(arr):
+                self._to_device_convert(arr, nbytes, stream, async_copy=True)
+                return
             warnings.warn("Dtype mismatch copying host array to device, forcing device type.")
             arr = arr.astype(self.dtype)
+        if not self.contiguous or is_strided(arr):
+            self._strided_copy(arr, MEMCPY_H2D, stream, async_copy=True)
+            return
         nbytes = min([self.nbytes, nbytes or self.nbytes, arr.nbytes])
-        stream = stream or self.stream
-        check_contiguous(arr)
         cu_memcpy_h2d_async(self.ptr, arr, nbytes, stream)
+
+
+    def astype(self, dtype, out=None, stream=None):
+        """
+        Convert the array to another data type on the device. Real to 
+        complex conversion sets the imaginary part to zero, complex 
+        to real keeps the real part, and float to integer truncates.
+
+        Parameters
+        ----------
+        dtype : np.dtype
+            The data type to convert to.
+
+        out : Device_Ptr, optional
+            Destination of the same size. If None, it is allocated.
+
+        stream : c_void_p, optional
+            CUDA stream pointer.
+
+        Returns
+        -------
+        out : Device_Ptr
+            The converted array.
+        """
+        require_contiguous(self)
+        dtype = np.dtype(dtype)
+        stream = stream or self.stream
+        if out is None:
+            out = Device_Ptr(self.shape, dtype, stream=stream, pool=self.pool)
+        elif out.dtype != dtype or out.size != self.size:
+            raise ValueError("astype destination must have dtype %s and size %i."%(dtype, self.size))
+        require_contiguous(out)
+        if dtype == self.dtype:
+            self.d2d_async(self, out, stream)
+        else:
+            cu_astype(self.ptr, dtype_map[self.dtype],
+                      out.ptr, dtype_map[dtype],
+                      self.size, stream)
+        return out
+
+
+    def _convertible(self, arr):
+        # Only widening is done on the device, narrowing on the host 
+        # sends fewer bytes
+        return (self.contiguous 
+                and arr.dtype in dtype_map 
+                and self.dtype in dtype_map
+                and arr.dtype.itemsize < self.dtype.itemsize)
+
+
+    def _to_device_convert(self, arr, nbytes=None, stream=None, async_copy=False):
+        """
+        Copy a host array in its native data type into a device 
+        staging buffer, and convert it into self on the device.
+        """
+        stream = stream or self.stream
+        count = min(arr.size, (nbytes or self.nbytes)//self.dtype.itemsize)
+        tmp = Device_Ptr(arr.shape, arr.dtype, stream=stream, pool=self.pool)
+        if async_copy:
+            tmp.to_device_async(arr, stream)
+        else:
+            tmp.to_device(arr)
+        cu_astype(tmp.ptr, dtype_map[arr.dtype],
+                  self.ptr, dtype_map[self.dtype],
+                  count, stream)
+        tmp.__exit__()
+        if not async_copy:
+            cu_sync_stream(stream)
+
+
+    def _strided_copy(self, arr, kind, stream=None, async_copy=False):
+        """
+        Copy between self and a host array when either side is 
+        strided. If self is contiguous it is treated as a flat 
+        buffer in the shape of arr.
+        """
+        itemsize = self.dtype.itemsize
+        if self.contiguous:
+            if arr.size*itemsize > self.nbytes:
+                raise ValueError("Host array of %i bytes does not fit in Device_Ptr of %i bytes."%(arr.size*itemsize, self.nbytes))
+            shape, strides = arr.shape, c_strides(arr.shape, itemsize)
+        elif as_shape(arr.shape) == as_shape(self.shape):
+            shape, strides = arr.shape, self.strides
+        else:
+            raise ValueError("Host array shape %s does not match Device_Ptr view shape %s."%(arr.shape, self.shape))
+
+        host = (arr.ctypes.data, arr.strides)
+        dev = (self.ptr.value, strides)
+        dst, src = (dev, host) if kind == MEMCPY_H2D else (host, dev)
+        if memcpy_strided(dst[0], dst[1], src[0], src[1], shape, itemsize,
+                          kind, stream, async_copy):
+            return
+
+        # Host strides that pitched copies cannot express (negative or 
+        # overlapping) are staged through a contiguous host copy.
+        if copy_layout(shape, itemsize, strides) is None:
+            raise ValueError("Device_Ptr strides %s cannot be copied with pitched memcpys."%(strides,))
+        warnings.warn("Unsupported host strides, staging the copy through contiguous host memory.")
+        tmp_arr = np.ascontiguousarray(arr)
+        tmp = (tmp_arr.ctypes.data, tmp_arr.strides)
+        dst, src = (dev, tmp) if kind == MEMCPY_H2D else (tmp, dev)
+        memcpy_strided(dst[0], dst[1], src[0], src[1], shape, itemsize, kind)
+        if kind == MEMCPY_D2H:
+            arr[...] = tmp_arr
+
+
+    def _strided_d2d(self, dst, stream=None, async_copy=False):
+        """
+        Copy self to dst when either is a strided view.
+        """
+        if as_shape(self.shape) != as_shape(dst.shape):
+            raise ValueError("Shape mismatch in strided device to device copy.")
+        if not memcpy_strided(dst.ptr.value, dst.strides,
+                              self.ptr.value, self.strides,
+                              self.shape, self.dtype.itemsize,
+                              MEMCPY_D2D, stream, async_copy):
+            raise ValueError("Device_Ptr strides cannot be copied with pitched memcpys.")
   
       
+    def _init_fill(self, fill):
+        """
+        Set the initial contents from a constructor fill argument.
+        """
+        if isinstance(fill, (int, float, complex, np.number)):
+            self.fill(fill)
+        elif type(fill) in [list,tuple]:
+            tmp_arr = np.array(fill, dtype=self.dtype)
+            self.to_device(tmp_arr, tmp_arr.nbytes)
+            del tmp_arr
+        elif type(fill) == type(self):
+            self.d2d(src=fill, dst=self)
+        elif type(fill) == np.ndarray:
+            fill = np.require(fill, dtype=self.dtype, requirements='C')
+            self.to_device(fill, fill.nbytes)
+        else:
+            raise TypeError('Unsupported fill value or type input')
+
+
+    def fill(self, value, stream=None):
+        """
+        Set every element to a scalar value on the device. No host 
+        memory is used, and the call is asynchronous on the stream.
+
+        Parameters
+        ----------
+        value : scalar
+            The value to set.
+
+        stream : c_void_p, optional
+            CUDA stream pointer.
+
+        Returns
+        -------
+        self : Device_Ptr
+            Returns self with updated values in self.ptr
+        """
+        stream = stream or self.stream
+        val = np.array([value], dtype=self.dtype)
+        shape = as_shape(self.shape)
+        if self.contiguous:
+            if not val.any():
+                cu_memset_async(self.ptr, 0, self.nbytes, stream)
+            else:
+                cu_fill(self.ptr, val, self.size, 1, dtype_map[self.dtype], stream)
+        elif len(shape) == 1 and self.strides[0] > 0:
+            cu_fill(self.ptr, val, self.size,
+                    self.strides[0]//self.dtype.itemsize,
+                    dtype_map[self.dtype], stream)
+        else:
+            for i in range(shape[0]):
+                self[i].fill(value, stream)
+        return self
+
+
+    def sum(self, axis=None, stream=None):
+        """
+        Sum of the elements, computed on the device.
+
+        Parameters
+        ----------
+        axis : int, optional
+            Axis to reduce over. Either None (all elements), the 
+            leading axis, or the trailing axis.
+
+        stream : c_void_p, optional
+            CUDA stream pointer.
+
+        Returns
+        -------
+        result : scalar or Device_Ptr
+            Host scalar if axis is None, otherwise a Device_Ptr 
+            holding the reduced array.
+        """
+        return self._reduce(REDUCE_SUM, axis, stream)
+
+
+    def mean(self, axis=None, stream=None):
+        """
+        Mean of the elements, computed on the device. See sum.
+        """
+        return self._reduce(REDUCE_SUM, axis, stream, mean=True)
+
+
+    def min(self, axis=None, stream=None):
+        """
+        Minimum of the elements, computed on the device. Complex 
+        values are compared by magnitude. See sum.
+        """
+        return self._reduce(REDUCE_MIN, axis, stream)
+
+
+    def max(self, axis=None, stream=None):
+        """
+        Maximum of the elements, computed on the device. Complex 
+        values are compared by magnitude. See sum.
+        """
+        return self._reduce(REDUCE_MAX, axis, stream)
+
+
+    def argmin(self, axis=None, stream=None):
+        """
+        Index of the minimum, computed on the device. The index is 
+        into the flattened array if axis is None, and along the 
+        axis otherwise. Complex values are compared by magnitude. 
+        See sum.
+        """
+        return self._reduce(REDUCE_ARGMIN, axis, stream)
+
+
+    def argmax(self, axis=None, stream=None):
+        """
+        Index of the maximum, computed on the device. The index is 
+        into the flattened array if axis is None, and along the 
+        axis otherwise. Complex values are compared by magnitude, 
+        e.g. for peak finding in a correlation surface. See sum.
+        """
+        return self._reduce(REDUCE_ARGMAX, axis, stream)
+
+
+    def norm(self, axis=None, stream=None):
+        """
+        2-norm of the elements, computed on the device. The result 
+        is real for complex arrays. See sum.
+        """
+        return self._reduce(REDUCE_SUMSQ, axis, stream)
+
+
+    def _reduce(self, op, axis=None, stream=None, mean=False):
+        """
+        Launch a reduction over all elements, or over the leading or 
+        trailing axis, on the stream. For axis=None only the scalar 
+        result is copied back to the host.
+        """
+        require_contiguous(self)
+        if self.dtype not in c2f_map:
+            raise TypeError("Reductions are supported for f4, f8, c8, and c16 arrays, not %s."%self.dtype)
+        stream = stream or self.stream
+        shape = as_shape(self.shape)
+        ndim = len(shape)
+        if axis is None:
+            outer, n, inner, out_shape = 1, self.size, 1, (1,)
+        elif axis in (0, -ndim):
+            outer, n, inner, out_shape = 1, shape[0], prod(shape[1:]), shape[1:]
+        elif axis in (ndim-1, -1):
+            outer, n, inner, out_shape = prod(shape[:-1]), shape[-1], 1, shape[:-1]
+        else:
+            raise ValueError("Reductions are supported over axis=None, the leading axis, or the trailing axis.")
+        if n == 0 and op != REDUCE_SUM:
+            raise ValueError("Attempted reduction of an empty axis.")
+
+        if op in (REDUCE_ARGMIN, REDUCE_ARGMAX):
+            out_dtype = np.dtype('i8')
+        elif op == REDUCE_SUMSQ:
+            out_dtype = real_map.get(self.dtype, self.dtype)
+        else:
+            out_dtype = self.dtype
+        scale = 1./n if mean and n else 1.
+
+        d_out = Device_Ptr(out_shape or (1,), out_dtype, stream=stream, pool=self.pool)
+        nbytes = cu_reduce_workspace(outer, n, inner, dtype_map[self.dtype])
+        d_work = Device_Ptr(nbytes, 'u1', stream=stream, pool=self.pool) if nbytes else None
+        cu_reduce(self.ptr,
+                  d_out.ptr,
+                  d_work.ptr if d_work is not None else None,
+                  outer, n, inner,
+                  op, scale,
+                  dtype_map[self.dtype],
+                  stream)
+        if d_work is not None:
+            d_work.__exit__()
+
+        if axis is not None:
+            return d_out
+        result = np.empty(1, out_dtype)
+        cu_memcpy_d2h_async(d_out.ptr, result, result.nbytes, stream)
+        cu_sync_stream(stream)
+        d_out.__exit__()
+        return result[0]
+
+
     def zero(self, nbytes=None):
         """
         Zero out the values in the array.
@@ -518,6 +1413,7 @@ class Device_Ptr(object):
         nbytes : int
             Size to set in bytes.
         """
+        require_contiguous(self)
         nbytes = min([self.nbytes, nbytes or self.nbytes])
         cu_memset(self.ptr, 0, nbytes)
         
@@ -534,14 +1430,28 @@ class Device_Ptr(object):
         nbytes : int
             Size to set in bytes.
         """
+        require_contiguous(self)
         nbytes = min([self.nbytes, nbytes or self.nbytes])
         stream = stream or self.stream
         cu_memset_async(self.ptr, 0, nbytes, stream)
 
 
+    @property
+    def contiguous(self):
+        return is_c_contiguous(self.shape, self.strides, self.dtype.itemsize)
+
+
+    @property
+    def owner(self):
+        """
+        The object that owns the memory: self, unless this is a view.
+        """
+        return self if self.base is None else self.base
+
+
     @property
     def dtype_depth(self):
-        if self.dtype in ['f4', 'f8']:
+        if self.dtype in ['f2', 'f4', 'f8', 'i1', 'i2', 'i4', 'u1', 'u2']:
             return 1
         if self.dtype in ['c8', 'c16']:
             return 2
@@ -554,7 +1464,14 @@ class Device_Ptr(object):
     def __exit__(self, *args, **kwargs):
         """
         Frees the memory used by the object, and then 
-        deletes the object.
+        deletes the object. Pooled memory is returned to its pool.
+        Views and wrapped memory (from_ptr, from_cuda_array, 
+        from_dlpack) are not owned, and nothing is freed.
         """
-        cu_free(self.ptr)
+        if not self._owns:
+            return
+        if self.pool is not None:
+            self.pool.free(self.ptr, self.stream)
+        else:
+            cu_free(self.ptr)
         del self
\ No newline at end of file
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Device_LitePtr",
+    "Device_PtrArray",
+]
+
+from ctypes import c_void_p
+import numpy as np
+
+from cuda_helpers import (cu_memcpy_d2d,
+                          cu_memcpy_d2h,
+                          cu_memcpy_d2h_async,
+                          cu_memcpy_h2d,
+                          cu_memcpy_h2d_async)
+
+# Local imports
+from dev_dblptr import Device_DblPtr
+from dev_ptr import Device_Ptr
+from pinned_pool import Host_Future
+from strides import (as_shape,
+                     c_strides,
+                     prod)
+
+
+# Byte alignment of each buffer in a Device_PtrArray
+_ALIGNMENT = 256
+
+
+class Device_LitePtr(object):
+
+    __slots__ = ["addr", "shape", "dtype", "nbytes", "stream", "base"]
+
+    def __init__(self, addr, shape, dtype, nbytes, stream=None, base=None):
+        """
+        Lightweight, non-owning handle to a C-contiguous device
+        buffer. It holds no __dict__ or ctypes object, so tens of
+        thousands of them stay cheap. Use device_ptr() for the full
+        Device_Ptr interface.
+
+        Parameters
+        ----------
+        addr : int
+            Device address of the first element.
+
+        shape : tuple
+            The shape of the array.
+
+        dtype : np.dtype
+            That data type of the array.
+
+        nbytes : int
+            Size of the array in bytes.
+
+        stream : c_void_p, optional
+            CUDA stream to associate the object with.
+
+        base : object, optional
+            Object that owns the memory.
+        """
+        self.addr = addr
+        self.shape = shape
+        self.dtype = dtype
+        self.nbytes = nbytes
+        self.stream = stream
+        self.base = base
+
+
+    def __call__(self):
+        return self.ptr
+
+
+    def __len__(self):
+        return self.shape[0] if self.shape else 1
+
+
+    def __repr__(self):
+        return ("Device_LitePtr(addr=%#x, shape=%s, dtype=%s)"
+                %(self.addr, self.shape, self.dtype))
+
+
+    @property
+    def ptr(self):
+        return c_void_p(self.addr)
+
+
+    @property
+    def size(self):
+        return self.nbytes//self.dtype.itemsize
+
+
+    def device_ptr(self):
+        """
+        Full featured Device_Ptr view of the buffer.
+        """
+        return Device_Ptr.from_ptr(self.addr, self.shape, self.dtype,
+                                   self.stream, base=self.base)
+
+
+    def to_host(self, arr=None):
+        """
+        Copy the buffer to a C-contiguous host array, newly allocated
+        if arr is None, and return it.
+        """
+        if arr is None:
+            arr = np.empty(self.shape, self.dtype)
+        cu_memcpy_d2h(self.ptr, arr, self.nbytes)
+        return arr
+
+
+    def to_device(self, arr):
+        """
+        Copy a host array, of the buffer's data type, to the buffer.
+        """
+        arr = np.require(arr, dtype=self.dtype, requirements='C')
+        cu_memcpy_h2d(self.ptr, arr, self.nbytes)
+
+
+    def to_host_async(self, arr=None, stream=None):
+        """
+        Asynchronously copy the buffer to a pinned, C-contiguous
+        host array, or to a pinned staging buffer if arr is None.
+
+        Returns
+        -------
+        future : Host_Future
+            Handle to the pending copy, see Device_Ptr.to_host_async.
+        """
+        if arr is None:
+            return self.device_ptr().to_host_async(None, stream)
+        stream = stream or self.stream
+        cu_memcpy_d2h_async(self.ptr, arr, self.nbytes, stream)
+        return Host_Future(stream, arr)
+
+
+    def to_device_async(self, arr, stream=None):
+        """
+        Asynchronously copy a pinned, C-contiguous host array of the
+        buffer's data type to the buffer.
+        """
+        cu_memcpy_h2d_async(self.ptr, arr, self.nbytes, stream or self.stream)
+
+
+class Device_PtrArray(object):
+
+    def __init__(self, n, shape, dtype, fill=None, stream=None, pool=None):
+        """
+        N equally shaped device buffers backed by one allocation.
+        Each buffer starts on a 256 byte boundary.
+
+        Parameters
+        ----------
+        n : int
+            Number of buffers.
+
+        shape : tuple
+            The shape of each buffer.
+
+        dtype : np.dtype
+            That data type of the buffers.
+
+        fill : scalar or np.ndarray, optional
+            Value to set every buffer to. An array of the buffer
+            shape is copied to every buffer, and an array of shape
+            (n,)+shape is scattered across them.
+
+        stream : c_void_p, optional
+            CUDA stream to associate the buffers with.
+
+        pool : Memory_Pool, optional
+            Pool to allocate the memory from.
+
+        Attributes
+        ----------
+        stride : int
+            Byte step between consecutive buffers.
+
+        base : Device_Ptr
+            1d array spanning the whole allocation.
+        """
+        self.n = n
+        self.shape = as_shape(shape)
+        self.dtype = np.dtype(dtype)
+        self.stream = stream
+        self.item_nbytes = prod(self.shape)*self.dtype.itemsize
+        self.stride = -(-self.item_nbytes//_ALIGNMENT)*_ALIGNMENT or _ALIGNMENT
+        self.base = Device_Ptr((n*self.stride//self.dtype.itemsize,), self.dtype,
+                               stream=stream, pool=pool)
+
+        if fill is not None:
+            if isinstance(fill, (int, float, complex, np.number)):
+                self.base.fill(fill)
+            else:
+                fill = np.asarray(fill, dtype=self.dtype)
+                if fill.shape == (n,) + self.shape:
+                    self.to_device(fill)
+                else:
+                    self._replicate(np.broadcast_to(fill, self.shape))
+
+
+    def _replicate(self, item):
+        """
+        Copy one host buffer to the first device buffer, and double 
+        the filled span with device to device copies until every 
+        buffer holds it.
+        """
+        self[0].to_device(item)
+        filled = 1
+        while filled < self.n:
+            count = min(filled, self.n - filled)
+            cu_memcpy_d2d(self.base.ptr,
+                          c_void_p(self.base.ptr.value + filled*self.stride),
+                          (count - 1)*self.stride + self.item_nbytes)
+            filled += count
+
+
+    def __getitem__(self, i):
+        """
+        Lightweight handle to the i-th buffer.
+        """
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError("Index %i out of bounds for Device_PtrArray of size %i."%(i, self.n))
+        return Device_LitePtr(self.base.ptr.value + i*self.stride, self.shape,
+                              self.dtype, self.item_nbytes, self.stream, self)
+
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield self[i]
+
+
+    def __len__(self):
+        return self.n
+
+
+    def __repr__(self):
+        return ("Device_PtrArray(n=%i, shape=%s, dtype=%s, stride=%i)"
+                %(self.n, self.shape, self.dtype, self.stride))
+
+
+    def stacked(self):
+        """
+        Strided Device_Ptr view of every buffer, with shape
+        (n,)+shape, skipping the alignment padding.
+        """
+        return Device_Ptr.from_ptr(self.base.ptr, (self.n,) + self.shape,
+                                   self.dtype, self.stream,
+                                   (self.stride,) + c_strides(self.shape, self.dtype.itemsize),
+                                   base=self)
+
+
+    def to_device(self, arr, stream=None, async_copy=False):
+        """
+        Copy a stacked host array of shape (n,)+shape to the buffers
+        with a single pitched memcpy.
+        """
+        if async_copy:
+            self.stacked().to_device_async(arr, stream)
+        else:
+            self.stacked().to_device(arr)
+
+
+    def to_host(self, arr=None, stream=None, async_copy=False):
+        """
+        Copy every buffer into a stacked host array of shape
+        (n,)+shape with a single pitched memcpy.
+
+        Returns
+        -------
+        arr : np.ndarray or Host_Future
+            The host array, or for async_copy a Host_Future of it.
+        """
+        if async_copy:
+            return self.stacked().to_host_async(arr, stream)
+        return self.stacked().to_host(arr)
+
+
+    def dblptr(self):
+        """
+        Device array of the buffer addresses, as taken by the batched
+        cuBLAS routines.
+
+        Returns
+        -------
+        Device_DblPtr : Device_DblPtr
+            Pointer array with one entry per buffer. It is built once 
+            and cached, so it must not be exited.
+        """
+        return Device_DblPtr.cached(self.base, batch_size=self.n,
+                                    stride=self.stride//self.dtype.itemsize)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args, **kwargs):
+        """
+        Frees the memory backing every buffer.
+        """
+        self.base.__exit__()
@@ -4,6 +4,7 @@ __all__ = [
 ]
 
 import numpy as np
+import warnings
 from ctypes import (cast,
                     c_void_p,
                     pointer,
@@ -11,11 +12,27 @@ from ctypes import (cast,
 
 
 # Local imports
+from alloc_tracker import Alloc_Tracker
+from arena import Arena                #Bump allocator for scratch buffers
 from cuctx import cuCtx                #Context specific calls
 from shared import (get_nbytes,
                     Shared)            #Shared calls between Device and Stream
 from stream import Stream              #Stream specific calls
+from thread_executor import Thread_Executor  #Worker threads driving streams
+from dev_dblptr import clear_dblptr_cache
 from dev_ptr import Device_Ptr
+from dev_ptr_array import Device_PtrArray
+from dispatch import Dispatcher        #Host or device choice for Unified_Ptr arithmetic
+from event import (clear_event_cache,
+                   Event)
+from ipc import (close_ipc_mappings,
+                 import_ipc)
+from mem_pool import Memory_Pool       #Caching device allocator
+from out_of_core import Out_Of_Core    #Chunked processing of arrays larger than device memory
+from peer import Peer_Link             #Copies to other devices
+from pipeline import Pipeline          #Chunked H2D/compute/D2H overlap across streams
+from pinned_pool import clear_staging_pool  #Pinned buffers for async readbacks
+from prefetch_proxy import Prefetch_Proxy  #Unified_Ptr prefetch before library calls
 from uni_ptr import Unified_Ptr
 
 from cublas_helpers import cublas
@@ -26,12 +43,15 @@ from cuda_helpers import (cu_device_reset,
                           cu_mempin,
                           cu_memunpin,
                           cu_sync_device)
+from kernel_helpers import (cu_device_can_access_peer,
+                            cu_device_enable_peer_access)
 
 
 class Device(Shared, object):
 
     def __init__(self, device_id=0, n_streams=0,
-                 default_dtype='f4'):
+                 default_dtype='f4', max_cached_bytes=None,
+                 alloc_trace_every=0):
         """
         CUDA device object. This object opens up, stores, and 
         controls a CUDA context. When the object is destroyed, 
@@ -49,6 +69,15 @@ class Device(Shared, object):
         default_dtype : np.dtype
             Default data type to use in mallocs.
 
+        max_cached_bytes : int, optional
+            High-water mark of freed device memory kept cached by the 
+            memory pool. If None, the cache is unbounded.
+
+        alloc_trace_every : int, optional
+            Record the call site of every Nth allocation, shown by 
+            memory_report and in leak warnings. 0 disables call 
+            site capture.
+
         Attributes
         ----------
         context : c_void_p (CUcontext*)
@@ -65,6 +94,15 @@ class Device(Shared, object):
             
         cufft : object
             The callable cuFFT object.
+
+        dispatcher : Dispatcher
+            Decides whether in-place arithmetic on this device's 
+            Unified_Ptrs runs on the host or on the device.
+
+        pool : Memory_Pool
+            The caching allocator that device mallocs are served from.
+            Its tracker frees Device_Ptrs that are garbage collected 
+            without being exited, and accounts for live bytes.
             
         props : deviceProps ctypes Structure
             The device properties structure defined by:
@@ -78,10 +116,15 @@ class Device(Shared, object):
         
         self._id = device_id
         self._context = cuCtx(self)
-        self._cublas = cublas()
-        self._cufft = cufft()
+        self._cublas = Prefetch_Proxy(cublas())
+        self._cufft = Prefetch_Proxy(cufft())
         self._default_dtype = np.dtype(default_dtype)
+        self._dispatcher = Dispatcher()
+        self._peer_links = {}       # (src id, dst id) -> Peer_Link, on both devices
+        self._peers = {}            # peer id -> peer access enabled
         self._pinned_arrs = []
+        self._pool = Memory_Pool(max_cached_bytes)
+        self._pool.tracker = Alloc_Tracker(self._pool, alloc_trace_every)
 #        self._props = cu_device_props(self._id) Titan V broken
         self._props = None
         self._streams = [Stream(self, i) for i in range(n_streams)]
@@ -111,10 +154,42 @@ class Device(Shared, object):
             The object that holds the pointer to the memory.
         """
         dtype = dtype or self._default_dtype
-        return Device_Ptr(shape, dtype, fill, stream)
+        return Device_Ptr(shape, dtype, fill, stream, self._pool)
 
 
-    def malloc_unified(self, shape, dtype=None, fill=None, stream=None):
+    def malloc_array(self, n, shape, dtype=None, fill=None, stream=None):
+        """
+        Allocates n equally shaped device buffers with a single 
+        allocation.
+
+        Parameters
+        ----------
+        n : int
+            Number of buffers.
+
+        shape : tuple
+            The shape of each buffer.
+            
+        dtype : np.dtype
+            That data type of the buffers.
+            
+        fill : scalar or np.ndarray, optional
+            Default value to set the buffers to.
+            
+        stream : c_void_p, optional
+            CUDA stream to associate the buffers with.
+            
+        Returns
+        -------
+        Device_PtrArray : Device_PtrArray
+            The buffers, indexable as lightweight Device_LitePtrs.
+        """
+        dtype = dtype or self._default_dtype
+        return Device_PtrArray(n, shape, dtype, fill, stream, self._pool)
+
+
+    def malloc_unified(self, shape, dtype=None, fill=None, stream=None,
+                       auto_prefetch=False):
         """
         Allocates unified memory.
 
@@ -131,6 +206,10 @@ class Device(Shared, object):
             
         stream : c_void_p, optional
             CUDA stream to associate the returned object with.
+
+        auto_prefetch : bool, optional
+            Prefetch the memory to the device before each cuBLAS or 
+            cuFFT call it is passed to.
             
         Returns
         -------
@@ -138,7 +217,377 @@ class Device(Shared, object):
             The object that holds the pointer to the unified memory.
         """
         dtype = dtype or self._default_dtype
-        return Unified_Ptr(shape, dtype, stream, fill)
+        return Unified_Ptr(shape, dtype, stream, fill, self._id, auto_prefetch,
+                           self._dispatcher)
+
+
+    def calibrate_dispatch(self, nbytes=1 << 26):
+        """
+        Measure the host, device and migration throughputs and the 
+        kernel launch cost used by the dispatcher.
+
+        Parameters
+        ----------
+        nbytes : int, optional
+            Size of the arrays timed, in bytes.
+
+        Returns
+        -------
+        dispatcher : Dispatcher
+            The calibrated dispatcher.
+        """
+        shape = (nbytes//4,)
+        with self.malloc_unified(shape, 'f4', fill=1.) as a, \
+             self.malloc_unified(shape, 'f4', fill=1.) as b, \
+             self.malloc_unified((1,), 'f4', fill=1.) as c:
+            self._dispatcher.calibrate(a, b, c, self.sync)
+        return self._dispatcher
+
+
+    def from_cuda_array(self, obj, stream=None):
+        """
+        Wrap device memory from another library, exported through 
+        __cuda_array_interface__, without copying.
+
+        Parameters
+        ----------
+        obj : object
+            The producer object (CuPy, Numba, PyTorch, ...).
+
+        stream : c_void_p, optional
+            CUDA stream to associate the returned object with.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            Non-owning object that holds the pointer to the memory.
+        """
+        return Device_Ptr.from_cuda_array(obj, stream)
+
+
+    def from_dlpack(self, obj, stream=None):
+        """
+        Wrap device memory from another library, exported through 
+        DLPack, without copying.
+
+        Parameters
+        ----------
+        obj : object
+            Object exporting __dlpack__, or a DLPack capsule.
+
+        stream : c_void_p, optional
+            CUDA stream to associate the returned object with.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            Non-owning object that holds the pointer to the memory.
+        """
+        return Device_Ptr.from_dlpack(obj, stream)
+
+
+    def import_ipc(self, handle, shape=None, dtype=None, stream=None):
+        """
+        Map device memory exported by another process with 
+        Device_Ptr.export_ipc, without copying.
+
+        Parameters
+        ----------
+        handle : Ipc_Handle
+            The handle received from the exporting process.
+
+        shape : tuple, optional
+            The shape of the array. Defaults to the exported shape.
+
+        dtype : np.dtype, optional
+            That data type of the array. Defaults to the exported 
+            dtype.
+
+        stream : c_void_p, optional
+            CUDA stream to associate the returned object with. If 
+            the handle carries an event, the stream waits on it.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            Non-owning object that holds the pointer to the memory. 
+            The memory is unmapped once it and its views are gone, 
+            or when the device exits, and is never freed here.
+        """
+        addr, shape, dtype, strides, mapping = import_ipc(handle, shape, dtype, stream, self._context)
+        return Device_Ptr.from_ptr(addr, shape, dtype, stream, strides, base=mapping)
+
+
+    def arena(self, nbytes=None, stream=None):
+        """
+        Create a bump sub-allocator for per-iteration scratch buffers. 
+        Buffers are carved out of one block with no per-buffer 
+        allocation cost, and released all at once.
+
+        Parameters
+        ----------
+        nbytes : int, optional
+            Size of the block in bytes. If None, the first pass is 
+            recorded and the block is sized from it.
+
+        stream : c_void_p, optional
+            CUDA stream to associate the buffers with.
+
+        Returns
+        -------
+        arena : Arena
+            The allocator. Used as a context manager, the block is 
+            kept across passes and returned to the pool on exit. 
+            reset releases every buffer at the end of a pass, e.g.
+
+            >>> with d.arena() as arena:
+            ...     for frame in frames:
+            ...         d_tmp = arena.malloc(shape, 'c8')
+            ...         arena.reset()
+        """
+        return Arena(self._pool, nbytes, stream)
+
+
+    def out_of_core(self, n_buffers=3, mem_fraction=0.5, read_ahead=True):
+        """
+        Create a chunked executor for arrays larger than device 
+        memory. File reads, copies and compute of consecutive chunks 
+        are overlapped across streams.
+
+        Parameters
+        ----------
+        n_buffers : int, optional
+            Number of chunks in flight.
+
+        mem_fraction : float, optional
+            Fraction of free device memory used for the chunks.
+
+        read_ahead : bool, optional
+            Read chunks on a background thread.
+
+        Returns
+        -------
+        executor : Out_Of_Core
+            The executor. Used as a context manager, its pinned 
+            staging buffers are released on exit, e.g.
+
+            >>> src = np.load('in.npy', mmap_mode='r')
+            >>> dst = np.lib.format.open_memmap('out.npy', 'w+', 'f8', src.shape)
+            >>> def fn(d_in, d_out, s):
+            ...     d_in.astype('f8', out=d_out, stream=s.stream)
+            >>> with d.out_of_core() as ooc:
+            ...     ooc.run(src, fn, dst)
+        """
+        return Out_Of_Core(self, n_buffers, mem_fraction, read_ahead)
+
+
+    def pipeline(self, inputs, outputs, fn, n_streams=2, chunk=None):
+        """
+        Process host arrays chunk by chunk, rotating the chunks 
+        across n_streams streams so that copies and compute overlap.
+        The host only blocks once every chunk has completed.
+
+        Parameters
+        ----------
+        inputs : np.ndarray or list of np.ndarray
+            Host arrays, split along their first axis.
+
+        outputs : np.ndarray, list of np.ndarray, or None
+            Host arrays the results are copied back to.
+
+        fn : func
+            Called as fn(d_in, d_out, stream) for every chunk, see 
+            Pipeline.run.
+
+        n_streams : int, optional
+            Number of streams, 2 for double and 3 for triple 
+            buffering.
+
+        chunk : int, optional
+            Rows per chunk.
+
+        Returns
+        -------
+        outputs : np.ndarray, list of np.ndarray, or None
+            The outputs, e.g.
+
+            >>> def fn(d_in, d_out, s):
+            ...     d_in.astype(d_out.dtype, out=d_out, stream=s.stream)
+            ...     s.cublas.scal(2., d_out)
+            >>> d.pipeline(a, out, fn, n_streams=3)
+        """
+        return Pipeline(self, n_streams).run(inputs, outputs, fn, chunk)
+
+
+    def add_stream(self):
+        """
+        Create a stream and append it to streams.
+
+        Returns
+        -------
+        stream : Stream
+            The new stream.
+        """
+        with self.active():
+            stream = Stream(self, len(self._streams))
+        self._streams.append(stream)
+        return stream
+
+
+    def executor(self, n_threads=2):
+        """
+        Create worker threads that each drive one stream, so host-side 
+        preparation and CUDA calls from several threads overlap.
+
+        Parameters
+        ----------
+        n_threads : int, optional
+            Number of worker threads, each with the stream of the same 
+            index in streams, which is grown if needed.
+
+        Returns
+        -------
+        executor : Thread_Executor
+            The workers, e.g.
+
+            >>> def job(s, h_in):
+            ...     d_arr = s.malloc(h_in.shape, h_in.dtype)
+            ...     d_arr.to_device_async(h_in)
+            ...     s.cublas.scal(2., d_arr)
+            ...     h_out = d_arr.to_host()
+            ...     d_arr.__exit__()
+            ...     return h_out
+            >>> with d.executor(4) as ex:
+            ...     outs = ex.map(job, batches)
+        """
+        while len(self._streams) < n_threads:
+            self.add_stream()
+        return Thread_Executor(self, self._streams[:n_threads])
+
+
+    def enable_peer_access(self, other):
+        """
+        Let this device access memory on another device directly, 
+        over NVLink or PCIe.
+
+        Parameters
+        ----------
+        other : Device
+            The peer device.
+
+        Returns
+        -------
+        enabled : bool
+            False if the pair does not support peer access.
+        """
+        if other.id not in self._peers:
+            self._peers[other.id] = (cu_device_can_access_peer(self._id, other.id) and
+                                     self.context(cu_device_enable_peer_access, other.id))
+        return self._peers[other.id]
+
+
+    def peer_link(self, other, chunk_bytes=1 << 22):
+        """
+        The link copies from this device to another go through, 
+        created on first use.
+
+        Parameters
+        ----------
+        other : Device
+            The device copied to.
+
+        chunk_bytes : int, optional
+            Size of each pinned staging buffer, when the pair does not 
+            support peer access.
+
+        Returns
+        -------
+        link : Peer_Link
+        """
+        key = (self._id, other.id)
+        link = self._peer_links.get(key)
+        if link is None or link.closed:
+            link = Peer_Link(self, other, chunk_bytes)
+            self._peer_links[key] = link
+            other._peer_links[key] = link
+        return link
+
+
+    def to_peer_async(self, other, d_dst, d_src, stream=None, nbytes=None):
+        """
+        Copy a Device_Ptr on this device to one on another device, 
+        without blocking the host. The copy is direct if the pair 
+        supports peer access, and double buffered through pinned host 
+        memory otherwise.
+
+        Parameters
+        ----------
+        other : Device
+            The device of d_dst.
+
+        d_dst : Device_Ptr
+            Destination, on other.
+
+        d_src : Device_Ptr
+            Source, on this device.
+
+        stream : c_void_p, optional
+            Stream of other the copy is ordered on. If None, 
+            d_dst.stream.
+
+        nbytes : int, optional
+            Size to copy in bytes.
+        """
+        self.peer_link(other).copy_async(d_dst, d_src, stream, nbytes)
+
+
+    def peer_bandwidth(self):
+        """
+        Measured bandwidth of the copies made through peer_link, see 
+        Peer_Link.copy and Peer_Link.measure.
+
+        Returns
+        -------
+        bandwidth : dict
+            (src id, dst id) -> bytes/s, for the links measured.
+        """
+        return dict((key, link.bandwidth) for key, link in self._peer_links.items()
+                    if link.bandwidth is not None)
+
+
+    def event(self, timing=True, blocking=False):
+        """
+        Create a CUDA event, to order work across streams or time it.
+
+        Parameters
+        ----------
+        timing : bool, optional
+            Record timestamps, needed by elapsed_time.
+
+        blocking : bool, optional
+            Yield the host thread, instead of spinning, in 
+            synchronize.
+
+        Returns
+        -------
+        event : Event
+            The unrecorded event, e.g.
+
+            >>> start, end = d.event(), d.event()
+            >>> start.record(stream)
+            >>> d_a.to_device_async(h_a, stream)
+            >>> end.record(stream)
+            >>> start.elapsed_time(end)
+        """
+        return Event(timing, blocking)
+
+
+    def empty_cache(self):
+        """
+        Release all cached, unused device memory held by the memory 
+        pool back to the device. Memory still in use is unaffected.
+        """
+        self._pool.empty_cache()
 
 
     def host_pin(self, arr, nbytes=None):
@@ -180,8 +629,8 @@ class Device(Shared, object):
                 cu_memunpin(arr)
                 self._pinned_arrs.pop(i)
                 break
-            else:
-                print("Exception: Array not found in pinned memory")
+        else:
+            print("Exception: Array not found in pinned memory")
 
    
     def host_unpin_all(self):
@@ -212,6 +661,52 @@ class Device(Shared, object):
         print("%s\n------------\n  Total Mem : %.2f (mb)\n  Free  Mem : %.2f (mb)"%(name,total_f,free_f))
         
     
+    def mem_info(self):
+        """
+        Free and total device memory.
+
+        Returns
+        -------
+        free : int
+            Free device memory in bytes, not counting the memory 
+            cached by pool.
+
+        total : int
+            Total device memory in bytes.
+        """
+        free = np.array([1], dtype=np.uintp)
+        total = np.array([1], dtype=np.uintp)
+        self.context(cu_get_mem_info, free, total)
+        return int(free[0]), int(total[0])
+
+
+    def memory_report(self):
+        """
+        Report the device memory used through this object: live and 
+        peak bytes per stream, pool statistics, and live allocations 
+        grouped by call site (see alloc_trace_every).
+
+        Returns
+        -------
+        report : str
+            The formatted report.
+        """
+        return "%r\n%s"%(self._pool, self._pool.tracker.report())
+
+
+    def _attached_ptrs(self):
+        """
+        Device_Ptrs stored as attributes of the device or its streams, 
+        which are expected to live until the device exits.
+        """
+        ptrs = []
+        for obj in [self] + list(self._streams):
+            for value in obj.values():
+                values = value if isinstance(value, (list, tuple)) else [value]
+                ptrs.extend(v for v in values if isinstance(v, Device_Ptr))
+        return ptrs
+
+
     def require_streamable(self, *args):
         """
         Set a space of memory to be streamable. The ensures that 
@@ -242,16 +737,97 @@ class Device(Shared, object):
     def set_context(self):
         """
         Sets the current active device to the one specified in this
-        object's context.
+        object's context. Nothing is pushed if it already is.
+        """
+        self.context.make_current()
+
+
+    def active(self):
         """
-        self.context.push()
+        Keep this device's context current on the calling thread for 
+        a batch of calls, e.g.
+
+        >>> with d.active():
+        ...     for arr in arrs:
+        ...         d_arr.to_device(arr)
+
+        Calls made through the context within the scope skip their 
+        push and pop, see context.n_skipped.
+        """
+        return self.context.active()
 
 
     def sync(self):
         """
         Block the host thread until the device has completed all tasks.
+        Memory freed on any stream becomes reusable by all streams.
         """
         cu_sync_device()
+        self._pool.release_all()
+
+
+    def synchronize_async(self, loop=None):
+        """
+        Wait for the device without blocking the asyncio event loop.
+
+        Parameters
+        ----------
+        loop : asyncio event loop, optional
+            Loop the future belongs to. If None, the current loop.
+
+        Returns
+        -------
+        future : asyncio.Future
+            Resolves once the work queued so far on the null stream 
+            and on every stream of the device has completed, e.g. 
+            ``await d.synchronize_async()``.
+        """
+        import asyncio
+        from aio import stream_done       # asyncio is only needed when awaiting
+        streams = [None] + [s.stream for s in self._streams]
+        freed = sum([self._pool.mark_stream(stream) for stream in streams], [])
+        done = asyncio.gather(*[stream_done(stream, loop) for stream in streams])
+        done.add_done_callback(lambda f: self._pool.release_marked(freed))
+        return done
+
+
+    def stream_executor(self, n_streams=2, max_pending=2, loop=None):
+        """
+        Create an asyncio adapter that runs GPU work submitted by 
+        coroutines on a pool of streams, with back-pressure.
+
+        Parameters
+        ----------
+        n_streams : int, optional
+            Number of streams in the pool, taken from streams, which 
+            is grown if needed.
+
+        max_pending : int, optional
+            Jobs in flight per stream before submissions wait.
+
+        loop : asyncio event loop, optional
+            Loop the futures belong to. If None, the current loop.
+
+        Returns
+        -------
+        executor : Stream_Executor
+            The adapter, e.g.
+
+            >>> ex = d.stream_executor(3)
+            >>> def job(s, h_in):
+            ...     d_arr = s.malloc(h_in.shape, h_in.dtype)
+            ...     d_arr.to_device_async(h_in)
+            ...     s.cublas.scal(2., d_arr)
+            ...     h_out = d_arr.to_host_async()
+            ...     d_arr.__exit__()
+            ...     return h_out
+            >>> h_out = await ex.run(job, h_in)
+            >>> arr = h_out.result()
+        """
+        from aio import Stream_Executor   # asyncio is only needed when awaiting
+        while len(self._streams) < n_streams:
+            self.add_stream()
+        return Stream_Executor(self._streams[:n_streams], max_pending, loop)
 
 
     @property
@@ -272,8 +848,18 @@ class Device(Shared, object):
     @property
     def cufft(self):
         return self._cufft
+
+
+    @property
+    def dispatcher(self):
+        return self._dispatcher
      
      
+    @property
+    def pool(self):
+        return self._pool
+
+
     @property
     def props(self):
         return self._props
@@ -291,10 +877,26 @@ class Device(Shared, object):
     def __exit__(self, *args, **kwargs):
         """
         Cleans up and frees the resources used by the object. 
-        The CUDA context is destroyed, and any arrays that were 
-        pinned are unpinned.
+        The CUDA context is destroyed, any arrays that were pinned 
+        are unpinned, cached pool memory, staging buffers and batched 
+        pointer arrays of this device are released, and memory 
+        imported from other processes is unmapped. A warning lists 
+        device buffers that are still allocated, other than those 
+        stored as attributes of the device or its streams.
         """
-        self.sync()
-        self.host_unpin_all()
+        with self.active():
+            self.sync()
+            leaks = self._pool.tracker.leak_report(self._attached_ptrs())
+            if leaks is not None:
+                warnings.warn(leaks)
+            for link in self._peer_links.values():
+                link.close()
+            self.host_unpin_all()
+            close_ipc_mappings(self._context)
+            clear_staging_pool(self._context)
+            clear_dblptr_cache(self._context)
+            clear_event_cache(self._context)
+            self.empty_cache()
+            self._pool.tracker.close()
         self.context.__exit__()
         self.clear()
\ No newline at end of file
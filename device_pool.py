@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Device_Pool",
+]
+
+import numpy as np
+
+from cuda_helpers import cu_device_count
+
+# Local imports
+from device import Device
+from event import Timer
+from peer import peer_matrix
+
+
+# Elementwise ops, as in-place Device_Ptr methods
+_elementwise_ops = {'add': '__iadd__',
+                    'sub': '__isub__',
+                    'mul': '__imul__',
+                    'div': '__itruediv__'}
+
+# Complex dtype -> cuFFT C2C transform type
+_fft_types = {np.dtype('c8') : 'cufft_c2c',
+              np.dtype('c16'): 'cufft_z2z'}
+
+
+def _fft_extent(shape):
+    """
+    cuFFT extent (nx, ny, nz) of one transform of a C-ordered shape.
+    """
+    extent = tuple(reversed(shape))
+    return extent + (1,)*(3 - len(extent))
+
+
+def _op_shape(shape, op):
+    return tuple(shape) if op == 'N' else tuple(reversed(shape))
+
+
+def _index(arr, arrs):
+    """
+    Position of arr in arrs, by identity, or None.
+    """
+    for i, other in enumerate(arrs):
+        if other is arr:
+            return i
+    return None
+
+
+class Device_Pool(object):
+
+    def __init__(self, device_ids=None, mem_fraction=0.8, smoothing=0.5,
+                 **device_kwargs):
+        """
+        Opens a Device per GPU, and shards batched work across them.
+        Host arrays are split along their first (batch) axis, each
+        device processes its shard on a worker thread bound to its
+        context, and the results are gathered into the host outputs.
+
+        Parameters
+        ----------
+        device_ids : list of ints, optional
+            The CUDA device IDs to open. If None, every device.
+
+        mem_fraction : float, optional
+            Fraction of each device's free memory a shard may use.
+            Batches larger than that are run in several rounds.
+
+        smoothing : float, optional
+            Weight of the latest measurement in the running throughput
+            of each device, between 0 and 1.
+
+        **device_kwargs
+            Passed to every Device, e.g. max_cached_bytes.
+
+        Attributes
+        ----------
+        devices : list of Device
+            The opened devices.
+
+        throughput : np.ndarray
+            Measured bytes/s processed by each device, 0 until a
+            device has run a shard.
+
+        n_rows : np.ndarray
+            Rows each device processed in the last run.
+
+        Notes
+        -----
+        Shards are sized by measured throughput, so faster GPUs receive
+        more of the batch. Devices not measured yet are weighted by
+        free memory, scaled to the measured devices' throughput per
+        free byte. Each shard is also capped by the device's free
+        memory.
+        """
+        if device_ids is None:
+            device_ids = range(cu_device_count())
+        self.mem_fraction = mem_fraction
+        self.smoothing = smoothing
+        self.devices = [Device(i, **device_kwargs) for i in device_ids]
+        if not self.devices:
+            raise ValueError("Device_Pool needs at least one device.")
+        self._executors = []
+        for d in self.devices:
+            with d.active():
+                self._executors.append(d.executor(1))
+        self._plans = {}                # (device id, extent, fft type) -> (batch, cufft, plan)
+        self.throughput = np.zeros(len(self.devices))
+        self.n_rows = np.zeros(len(self.devices), dtype=int)
+
+
+    def weights(self):
+        """
+        Share of a batch given to each device.
+
+        Returns
+        -------
+        weights : np.ndarray
+            Weights that sum to 1.
+        """
+        free = np.array([d.mem_info()[0] + d.pool.cached_bytes
+                         for d in self.devices], dtype=float)
+        measured = self.throughput > 0
+        if not measured.any():
+            w = free
+        else:
+            # Estimate the others from their free memory
+            per_byte = self.throughput[measured].sum()/max(free[measured].sum(), 1.)
+            w = np.where(measured, self.throughput, free*per_byte)
+        return w/w.sum()
+
+
+    def split(self, n_rows, row_nbytes):
+        """
+        Split rows across the devices, by weight, capped by the rows
+        that fit in each device's memory.
+
+        Parameters
+        ----------
+        n_rows : int
+            Number of rows to split.
+
+        row_nbytes : int
+            Device bytes needed per row, inputs and outputs.
+
+        Returns
+        -------
+        counts : list of ints
+            Rows per device. May sum to less than n_rows if the batch
+            does not fit at once.
+        """
+        caps = [int((d.mem_info()[0] + d.pool.cached_bytes)*self.mem_fraction)//max(1, row_nbytes)
+                for d in self.devices]
+        n = min(n_rows, sum(caps))
+        if n == 0:
+            raise MemoryError("Not enough device memory for a single row.")
+        share = self.weights()*n
+        counts = np.minimum(np.floor(share).astype(int), caps)
+        # Hand out the remaining rows by largest remainder, where they fit
+        for i in np.argsort(counts - share):
+            if counts.sum() == n:
+                break
+            extra = min(n - counts.sum(), caps[i] - counts[i])
+            counts[i] += extra
+        return [int(c) for c in counts]
+
+
+    def map(self, fn, inputs, outputs=None):
+        """
+        Run fn over shards of the inputs on every device.
+
+        Parameters
+        ----------
+        inputs : np.ndarray or list of np.ndarray
+            Host arrays with the same number of rows.
+
+        outputs : np.ndarray, list of np.ndarray, or None
+            Host arrays, with as many rows as the inputs, the shard
+            results are gathered into. An output that is also one of
+            the inputs shares its device buffer, so fn updates it in
+            place.
+
+        fn : func
+            Called as fn(stream, d_ins, d_outs) on each device's worker
+            thread, with lists of Device_Ptrs holding the shard's rows
+            of inputs and outputs. Work is queued on stream, a stream
+            of the device the shard is on.
+
+        Returns
+        -------
+        outputs : np.ndarray, list of np.ndarray, or None
+            The outputs, once every shard has completed.
+        """
+        ins = list(inputs) if isinstance(inputs, (list, tuple)) else [inputs]
+        outs = [] if outputs is None else (list(outputs) if isinstance(outputs, (list, tuple)) else [outputs])
+        if not ins:
+            raise ValueError("Device_Pool.map needs at least one input.")
+        n_rows = ins[0].shape[0]
+        for arr in ins + outs:
+            if arr.shape[0] != n_rows:
+                raise ValueError("Array with %i rows, expected %i."%(arr.shape[0], n_rows))
+            if not arr.flags['C_CONTIGUOUS']:
+                raise ValueError("Sharded host arrays must be C-contiguous.")
+        row_nbytes = sum(arr.nbytes//max(1, n_rows)
+                         for arr in ins + [arr for arr in outs if _index(arr, ins) is None])
+
+        self.n_rows[:] = 0
+        lo = 0
+        while lo < n_rows:
+            counts = self.split(n_rows - lo, row_nbytes)
+            jobs = []
+            for i, count in enumerate(counts):
+                if count:
+                    job = self._executors[i].submit(self._run_shard, fn, ins, outs, lo, lo + count)
+                    jobs.append((i, count, job))
+                    lo += count
+            for i, count, job in jobs:
+                seconds = job.get()
+                self.n_rows[i] += count
+                rate = count*row_nbytes/max(seconds, 1e-9)
+                if self.throughput[i] > 0:
+                    rate = self.smoothing*rate + (1 - self.smoothing)*self.throughput[i]
+                self.throughput[i] = rate
+        return outputs
+
+
+    def _run_shard(self, s, fn, ins, outs, lo, hi):
+        """
+        Copy rows lo:hi of the inputs to the stream's device, run fn,
+        and copy the results back, all queued on the stream before a 
+        single sync.
+
+        Returns
+        -------
+        seconds : float
+            Device time taken by the shard, measured with events.
+        """
+        d_ins = [s.malloc(arr[lo:hi].shape, arr.dtype) for arr in ins]
+        d_outs = [s.malloc(arr[lo:hi].shape, arr.dtype) if _index(arr, ins) is None
+                  else d_ins[_index(arr, ins)] for arr in outs]
+        try:
+            with Timer(s.stream) as t:
+                for d_arr, arr in zip(d_ins, ins):
+                    d_arr.to_device_async(arr[lo:hi], s.stream)
+                fn(s, d_ins, d_outs)
+                for d_arr, arr in zip(d_outs, outs):
+                    d_arr.to_host_async(arr[lo:hi], s.stream)
+            s.sync()
+        finally:
+            for d_arr in d_ins + [d for d in d_outs if _index(d, d_ins) is None]:
+                d_arr.__exit__()
+        return t.elapsed_time()/1e3
+
+
+    def gemm_strided_batched(self, a, b, c=None, OPA='N', OPB='N'):
+        """
+        Batched matrix multiply c[i] = op(a[i]) op(b[i]), sharded over
+        the batch axis.
+
+        Parameters
+        ----------
+        a, b : np.ndarray
+            Host arrays of shape (batch, ., .).
+
+        c : np.ndarray, optional
+            Host output of shape (batch, m, n). Allocated if None.
+
+        OPA, OPB : str, optional
+            'N', 'T' or 'C', as in cublas gemm_strided_batched.
+
+        Returns
+        -------
+        c : np.ndarray
+        """
+        if c is None:
+            m = _op_shape(a.shape[1:], OPA)[0]
+            n = _op_shape(b.shape[1:], OPB)[1]
+            c = np.empty((a.shape[0], m, n), dtype=np.result_type(a, b))
+        def fn(s, d_ins, d_outs):
+            s.cublas.gemm_strided_batched(d_ins[0], d_ins[1], d_outs[0], OPA=OPA, OPB=OPB)
+        return self.map(fn, [a, b], c)
+
+
+    def fft(self, a, out=None, direction='cufft_forward'):
+        """
+        Complex to complex FFT of every item along the batch axis,
+        sharded across the devices. Each device transforms its shard
+        with a single launch of a batched plan, cached until its shard
+        size changes.
+
+        Parameters
+        ----------
+        a : np.ndarray
+            Host array, 'c8' or 'c16', of shape (batch, ...) with 1 to 3
+            transform dimensions.
+
+        out : np.ndarray, optional
+            Host output of the same shape. Allocated if None.
+
+        direction : str, optional
+            'cufft_forward' or 'cufft_inverse'. Inverse transforms are
+            not scaled.
+
+        Returns
+        -------
+        out : np.ndarray
+        """
+        if a.dtype not in _fft_types:
+            raise TypeError("fft expects a c8 or c16 array, got %s."%a.dtype)
+        if out is None:
+            out = np.empty_like(a)
+        extent = _fft_extent(a.shape[1:])
+        fft_type = _fft_types[a.dtype]
+        def fn(s, d_ins, d_outs):
+            plan = self._plan(s, extent, d_ins[0].shape[0], fft_type)
+            s.cufft.c2c(plan, d_ins[0], d_outs[0], direction)
+        return self.map(fn, a, out)
+
+
+    def _plan(self, s, extent, batch, fft_type):
+        """
+        Plan of batch transforms on the stream's device. Shard sizes 
+        settle as throughput is measured, so one plan is kept per 
+        device and extent, and rebuilt when the batch changes.
+        """
+        key = (s.device.id, extent, fft_type)
+        if key in self._plans and self._plans[key][0] != batch:
+            s.cufft.destroy(self._plans.pop(key)[2])
+        if key not in self._plans:
+            self._plans[key] = (batch, s.cufft, s.cufft.plan(extent, fft_type, batch))
+        return self._plans[key][2]
+
+
+    def elementwise(self, op, a, b, out=None):
+        """
+        out = a op b, sharded over the leading axis.
+
+        Parameters
+        ----------
+        op : str
+            'add', 'sub', 'mul' or 'div'.
+
+        a : np.ndarray
+            Host array.
+
+        b : np.ndarray or scalar
+            Host array with the shape of a, or a scalar.
+
+        out : np.ndarray, optional
+            Host output with the shape and dtype of a. Allocated if
+            None.
+
+        Returns
+        -------
+        out : np.ndarray
+        """
+        if op not in _elementwise_ops:
+            raise ValueError("Unknown op '%s', expected one of %s."%(op, sorted(_elementwise_ops)))
+        if out is None:
+            out = np.empty_like(a)
+        if out is not a:
+            if out is b:
+                b = b.copy()
+            np.copyto(out, a)
+        method = _elementwise_ops[op]
+        scalar = np.ndim(b) == 0
+        # out is both the first input and the output, so each shard is
+        # computed in place in its device buffer
+        def fn(s, d_ins, d_outs):
+            getattr(d_outs[0], method)(np.asarray(b).item() if scalar else d_ins[1])
+        return self.map(fn, [out] if scalar else [out, b], out)
+
+
+    def peer_matrix(self):
+        """
+        Which of the devices can directly access each other's memory, 
+        see peer.peer_matrix.
+        """
+        return peer_matrix([d.id for d in self.devices])
+
+
+    def sync(self):
+        """
+        Block until every device has completed its work.
+        """
+        for d in self.devices:
+            d.context(d.sync)
+
+
+    def close(self):
+        """
+        Stop the worker threads, destroy the cached FFT plans, and close 
+        every device.
+        """
+        for ex in self._executors:
+            ex.close()
+        self._executors = []
+        devices = dict((d.id, d) for d in self.devices)
+        for key, (batch, cufft, plan) in self._plans.items():
+            with devices[key[0]].active():
+                cufft.destroy(plan)
+        self._plans = {}
+        # Device.__exit__ runs under the device's context. In reverse, 
+        # as each device's context was pushed when it was created.
+        for d in reversed(self.devices):
+            d.__exit__()
+        self.devices = []
+
+
+    def __repr__(self):
+        return ("Device_Pool(n_devices=%i, weights=%s, n_rows=%s)"
+                %(len(self.devices), np.round(self.weights(), 3).tolist(), self.n_rows.tolist()))
+
+
+    def __len__(self):
+        return len(self.devices)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "default_dispatcher",
+    "Dispatch_Decision",
+    "Dispatcher",
+]
+
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
+import time
+import numpy as np
+
+# Local imports
+from kernel_helpers import CPU_DEVICE_ID
+
+
+# Arrays below this size are never split across host threads
+_MIN_THREAD_BYTES = 1 << 20
+
+
+class Dispatch_Decision(object):
+
+    __slots__ = ["side", "host_cost", "device_cost", "reason"]
+
+    def __init__(self, side, host_cost, device_cost, reason):
+        """
+        Outcome of a dispatch, kept for inspection.
+
+        Parameters
+        ----------
+        side : str
+            'host' or 'device'.
+
+        host_cost : float or None
+            Modeled time on the host in seconds.
+
+        device_cost : float or None
+            Modeled time on the device in seconds.
+
+        reason : str
+            'model', 'forced', or why the device could not be used.
+        """
+        self.side = side
+        self.host_cost = host_cost
+        self.device_cost = device_cost
+        self.reason = reason
+
+
+    def __repr__(self):
+        return ("Dispatch_Decision(side=%s, host_cost=%s, device_cost=%s, reason=%s)"
+                %(self.side, self.host_cost, self.device_cost, self.reason))
+
+
+class Dispatcher(object):
+
+    def __init__(self, force=None, n_threads=1):
+        """
+        Chooses whether element-wise Unified_Ptr arithmetic runs on
+        the host with NumPy, or on the device, from where the operands
+        currently reside, their size, and a cost model.
+
+        Parameters
+        ----------
+        force : str, optional
+            'host' or 'device' to always run on that side (when the
+            operation is supported there). None uses the cost model.
+
+        n_threads : int, optional
+            Number of host threads NumPy operations are split across.
+
+        Attributes
+        ----------
+        host_bw : float
+            Host element-wise throughput per thread, in bytes/s.
+
+        device_bw : float
+            Device element-wise throughput, in bytes/s.
+
+        migrate_bw : float
+            Prefetched page migration throughput, in bytes/s.
+
+        launch_s : float
+            Fixed cost of a kernel launch and synchronization, in s.
+
+        last : Dispatch_Decision or None
+            The most recent decision.
+
+        n_host, n_device : int
+            Number of operations dispatched to each side.
+
+        Notes
+        -----
+        The defaults are rough figures for a PCIe discrete GPU. Use
+        Device.calibrate_dispatch to measure them on the machine.
+        """
+        self.force = force
+        self.n_threads = n_threads
+        self.host_bw = 5e9
+        self.device_bw = 2e11
+        self.migrate_bw = 1e10
+        self.launch_s = 2e-5
+        self.last = None
+        self.n_host = 0
+        self.n_device = 0
+        self._thread_pool = None
+
+
+    def choose(self, operands, device_id, device_ok=True):
+        """
+        Decide where an in-place element-wise operation runs.
+
+        Parameters
+        ----------
+        operands : list of tuples
+            (nbytes, location) of every array operand, the output
+            first. location is a device ordinal, CPU_DEVICE_ID, or
+            None if the memory was never touched.
+
+        device_id : int
+            The device the operation would run on.
+
+        device_ok : bool, optional
+            False if the operation has no device implementation.
+
+        Returns
+        -------
+        decision : Dispatch_Decision
+            The decision, also stored in last.
+        """
+        if not device_ok:
+            decision = Dispatch_Decision('host', None, None, 'unsupported on device')
+        elif self.force is not None:
+            decision = Dispatch_Decision(self.force, None, None, 'forced')
+        else:
+            host_cost = self.cost(operands, CPU_DEVICE_ID)
+            device_cost = self.cost(operands, device_id)
+            side = 'host' if host_cost <= device_cost else 'device'
+            decision = Dispatch_Decision(side, host_cost, device_cost, 'model')
+
+        if decision.side == 'host':
+            self.n_host += 1
+        else:
+            self.n_device += 1
+        self.last = decision
+        return decision
+
+
+    def cost(self, operands, location):
+        """
+        Modeled time, in seconds, to run an operation at location,
+        including migrating operands that reside elsewhere.
+        """
+        moved = sum(nbytes for nbytes, loc in operands
+                    if loc is not None and loc != location)
+        # The output is read and written, the other operands read
+        touched = sum(nbytes for nbytes, loc in operands) + operands[0][0]
+        if location == CPU_DEVICE_ID:
+            threads = self.n_threads if touched >= _MIN_THREAD_BYTES else 1
+            return moved/self.migrate_bw + touched/(self.host_bw*threads)
+        return moved/self.migrate_bw + self.launch_s + touched/self.device_bw
+
+
+    def host_apply(self, ufunc, out, b):
+        """
+        Apply ufunc(out, b, out=out) on the host, split across
+        n_threads threads for large arrays. NumPy releases the GIL
+        inside ufunc loops, so the threads run in parallel.
+        """
+        if self.n_threads <= 1 or out.nbytes < _MIN_THREAD_BYTES or np.ndim(b) not in (0, 1):
+            ufunc(out, b, out=out)
+            return
+        flat = out.reshape(-1)
+        if np.ndim(b) == 1 and b.size != flat.size:
+            ufunc(out, b, out=out)
+            return
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPool(self.n_threads)
+        bounds = np.linspace(0, flat.size, self.n_threads + 1).astype(int)
+        def run(i):
+            lo, hi = bounds[i], bounds[i+1]
+            ufunc(flat[lo:hi], b if np.ndim(b) == 0 else b[lo:hi], out=flat[lo:hi])
+        self._thread_pool.map(run, range(self.n_threads))
+
+
+    def calibrate(self, a, b, c, sync, n_iter=5):
+        """
+        Measure the cost model parameters.
+
+        Parameters
+        ----------
+        a, b : Unified_Ptr
+            Two f4 arrays of equal, large size (tens of MB) to
+            operate on. Their contents are overwritten.
+
+        c : Unified_Ptr
+            A one element f4 array, used to time kernel launches.
+
+        sync : func
+            Function that synchronizes the device.
+
+        n_iter : int, optional
+            Number of timed repetitions.
+        """
+        a.prefetch('host'); b.prefetch('host'); sync()
+        t0 = time.time()
+        for i in range(n_iter):
+            np.add(a._h, b._h, out=a._h)
+        self.host_bw = 3.*a.nbytes*n_iter/(time.time() - t0)
+
+        t0 = time.time()
+        a.prefetch(); b.prefetch(); sync()
+        self.migrate_bw = 2.*a.nbytes/(time.time() - t0)
+
+        a._device_op('add', b); sync()
+        t0 = time.time()
+        for i in range(n_iter):
+            a._device_op('add', b)
+        sync()
+        self.device_bw = 3.*a.nbytes*n_iter/(time.time() - t0)
+
+        c._device_op('add', 1); sync()
+        t0 = time.time()
+        for i in range(n_iter):
+            c._device_op('add', 1)
+            sync()
+        self.launch_s = (time.time() - t0)/n_iter
+
+
+    @contextmanager
+    def forced(self, side):
+        """
+        Context manager that forces every operation to 'host' or
+        'device' within its block.
+        """
+        force, self.force = self.force, side
+        try:
+            yield self
+        finally:
+            self.force = force
+
+
+    def __repr__(self):
+        return ("Dispatcher(force=%s, n_threads=%i, host_bw=%.3g, device_bw=%.3g, "
+                "migrate_bw=%.3g, launch_s=%.3g, n_host=%i, n_device=%i)"
+                %(self.force, self.n_threads, self.host_bw, self.device_bw,
+                  self.migrate_bw, self.launch_s, self.n_host, self.n_device))
+
+
+# Used by Unified_Ptrs created without a dispatcher
+default_dispatcher = Dispatcher()
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "clear_event_cache",
+    "Event",
+    "Timer",
+]
+
+# Local imports
+from cuctx import current_context
+from kernel_helpers import (cu_event_create,
+                            cu_event_destroy,
+                            cu_event_elapsed_time,
+                            cu_event_query,
+                            cu_event_record,
+                            cu_event_synchronize,
+                            cu_stream_wait_event,
+                            EVENT_BLOCKING_SYNC,
+                            EVENT_DEFAULT,
+                            EVENT_DISABLE_TIMING)
+
+# Released event handles kept for reuse, per context, keyed by creation
+# flags. Events of a context whose cache was cleared are not cached.
+_caches = {}
+
+
+def clear_event_cache(context):
+    """
+    Destroy every event handle cached in a context. Its events still 
+    alive are dropped rather than cached when released. Only call 
+    when the context is about to be destroyed, as when the device 
+    exits.
+
+    Parameters
+    ----------
+    context : cuCtx
+        The context, current on the calling thread.
+    """
+    for events in _caches.pop(context, {}).values():
+        for event in events:
+            cu_event_destroy(event)
+
+
+class Event(object):
+
+    def __init__(self, timing=True, blocking=False):
+        """
+        CUDA event, marking a point in a stream's work. Other
+        streams can wait on it without blocking the host, the host
+        can poll or wait for it, and two timing events measure the
+        device time between them.
+
+        Parameters
+        ----------
+        timing : bool, optional
+            Record timestamps, needed by elapsed_time. Events used
+            only for dependencies are cheaper with timing=False.
+
+        blocking : bool, optional
+            If True, synchronize yields the host thread instead of
+            spinning.
+
+        Attributes
+        ----------
+        event : c_void_p
+            The cudaEvent_t handle.
+
+        stream : c_void_p or None
+            Stream the event was last recorded on.
+
+        recorded : bool
+            True once the event has been recorded.
+
+        context : cuCtx or None
+            Context current when the event was created.
+
+        Notes
+        -----
+        Handles are returned to a cache of the context they were 
+        created in for reuse when the event is released or garbage 
+        collected, and destroyed by clear_event_cache when the device 
+        exits.
+        """
+        self.flags = ((EVENT_DEFAULT if timing else EVENT_DISABLE_TIMING) |
+                      (EVENT_BLOCKING_SYNC if blocking else EVENT_DEFAULT))
+        self.context = current_context()
+        self._cache = _caches.setdefault(self.context, {})
+        cached = self._cache.get(self.flags)
+        self.event = cached.pop() if cached else cu_event_create(self.flags)
+        self.stream = None
+        self.recorded = False
+
+
+    def record(self, stream=None):
+        """
+        Record the event on a stream. It completes once all work
+        queued on the stream before it has completed.
+
+        Returns
+        -------
+        self : Event
+        """
+        cu_event_record(self.event, stream)
+        self.stream = stream
+        self.recorded = True
+        return self
+
+
+    def wait(self, stream=None):
+        """
+        Make future work on a stream wait on the event, without
+        blocking the host thread.
+        """
+        cu_stream_wait_event(stream, self.event)
+
+
+    def query(self):
+        """
+        True if the event has completed. An event that was never
+        recorded counts as completed.
+        """
+        return cu_event_query(self.event)
+
+
+    def synchronize(self):
+        """
+        Block the host thread until the event has completed.
+        """
+        cu_event_synchronize(self.event)
+
+
+    def elapsed_time(self, end):
+        """
+        Device time from this event to a later one, in milliseconds.
+        Waits for end to complete.
+
+        Parameters
+        ----------
+        end : Event
+            Event recorded after this one.
+        """
+        if self.flags & EVENT_DISABLE_TIMING or end.flags & EVENT_DISABLE_TIMING:
+            raise ValueError("elapsed_time needs events created with timing=True.")
+        if not (self.recorded and end.recorded):
+            raise ValueError("Both events must be recorded before timing them.")
+        end.synchronize()
+        return cu_event_elapsed_time(self.event, end.event)
+
+
+    def release(self):
+        """
+        Return the handle to the cache. The event must not be used
+        afterwards.
+        """
+        if self.event is None:
+            return
+        if _caches.get(self.context) is self._cache:
+            self._cache.setdefault(self.flags, []).append(self.event)
+        self.event = None
+
+
+    def __repr__(self):
+        return ("Event(recorded=%s, timing=%s)"
+                %(self.recorded, not self.flags & EVENT_DISABLE_TIMING))
+
+
+    def __del__(self):
+        try:
+            self.release()
+        except Exception:
+            pass
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args, **kwargs):
+        self.release()
+
+
+class Timer(object):
+
+    def __init__(self, stream=None):
+        """
+        Measure the device time of the work queued on a stream within
+        a with block, e.g.
+
+        >>> with Timer(stream) as t:
+        ...     d_a.to_device_async(h_a, stream)
+        >>> t.elapsed_time()
+
+        Parameters
+        ----------
+        stream : c_void_p, optional
+            The CUDA stream to time.
+        """
+        self.stream = stream
+        self.start = Event()
+        self.end = Event()
+
+
+    def elapsed_time(self):
+        """
+        Device time of the block in milliseconds. Waits for the work
+        queued in the block to complete.
+        """
+        return self.start.elapsed_time(self.end)
+
+
+    def __enter__(self):
+        self.start.record(self.stream)
+        return self
+
+
+    def __exit__(self, *args, **kwargs):
+        self.end.record(self.stream)
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Graph",
+]
+
+from contextlib import contextmanager
+
+# Local imports
+from kernel_helpers import (CAPTURE_MODE_GLOBAL,
+                            CAPTURE_MODE_RELAXED,
+                            CAPTURE_MODE_THREAD_LOCAL,
+                            cu_graph_destroy,
+                            cu_graph_exec_destroy,
+                            cu_graph_exec_update,
+                            cu_graph_instantiate,
+                            cu_graph_launch,
+                            cu_graph_num_nodes,
+                            cu_stream_begin_capture,
+                            cu_stream_end_capture)
+
+capture_map={'global'       : CAPTURE_MODE_GLOBAL,
+             'thread_local' : CAPTURE_MODE_THREAD_LOCAL,
+             'relaxed'      : CAPTURE_MODE_RELAXED}
+
+
+class Graph(object):
+
+    def __init__(self, stream, mode='global'):
+        """
+        CUDA graph recorded from the work queued on a stream, and 
+        replayed with a single launch. Used as a context manager, the 
+        stream is captured within the with block, e.g.
+
+        >>> with s.capture() as g:
+        ...     d_a.to_device_async(h_a)
+        ...     s.cublas.axpy(2., d_a, d_b)
+        ...     d_b.to_host_async(h_b)
+        >>> for frame in frames:
+        ...     g.launch()
+
+        Capturing again updates the graph: the executable graph takes 
+        on the new pointers, scalars and copy sizes in place if the 
+        sequence of operations is the same, and is rebuilt otherwise.
+
+        Parameters
+        ----------
+        stream : c_void_p
+            The CUDA stream to capture. The legacy null stream cannot 
+            be captured.
+
+        mode : str, optional
+            'global', 'thread_local' or 'relaxed'. Sets whether unsafe 
+            calls made by other threads while capturing are errors.
+
+        Attributes
+        ----------
+        n_nodes : int
+            Number of operations in the graph.
+
+        n_captures : int
+            Number of times the stream was captured.
+
+        n_updates : int
+            Captures applied to the executable graph in place.
+
+        n_instantiations : int
+            Captures that built a new executable graph.
+
+        updated : bool
+            True if the last capture was applied to the executable 
+            graph in place, False if it built a new one.
+
+        Notes
+        -----
+        Work is recorded, not run, while capturing. Memory must be 
+        allocated, and host arrays pinned, before the capture, as 
+        cudaMalloc and cudaHostRegister cannot be captured. In 
+        particular, pass a pinned arr to to_host_async. Every launch 
+        reads and writes the same memory that was captured.
+        """
+        if mode not in capture_map:
+            raise ValueError("Unknown capture mode '%s', expected one of %s."%(mode, sorted(capture_map)))
+        self.stream = stream
+        self.mode = mode
+        self.n_nodes = 0
+        self.n_captures = 0
+        self.n_updates = 0
+        self.n_instantiations = 0
+        self.updated = False
+        self._graph = None
+        self._graph_exec = None
+
+
+    def launch(self, stream=None):
+        """
+        Queue the captured work.
+
+        Parameters
+        ----------
+        stream : c_void_p, optional
+            CUDA stream to launch on. If None, the captured stream.
+        """
+        if self._graph_exec is None:
+            raise RuntimeError("Graph has not been captured yet.")
+        cu_graph_launch(self._graph_exec, stream or self.stream)
+
+
+    @contextmanager
+    def update(self):
+        """
+        Capture the stream again, with the same sequence of operations 
+        on new pointers or scalars, and apply it to the executable 
+        graph with cudaGraphExecUpdate, e.g.
+
+        >>> with g.update():
+        ...     s.cublas.axpy(alpha, d_c, d_d)
+        >>> g.updated
+        True
+
+        Unlike capturing with ``with g:``, the graph must already have 
+        been captured. updated is False after the block if the new 
+        capture could not be applied in place, and the executable 
+        graph was rebuilt instead.
+        """
+        if self._graph_exec is None:
+            raise RuntimeError("Graph has not been captured yet, there is nothing to update.")
+        with self:
+            yield self
+
+
+    def _instantiate(self, graph):
+        if self._graph_exec is not None:
+            if cu_graph_exec_update(self._graph_exec, graph):
+                self.n_updates += 1
+                self.updated = True
+                return
+            cu_graph_exec_destroy(self._graph_exec)
+        self._graph_exec = cu_graph_instantiate(graph)
+        self.n_instantiations += 1
+        self.updated = False
+
+
+    def close(self):
+        """
+        Destroy the graph. Graphs are not destroyed by garbage 
+        collection, as the context may already be gone.
+        """
+        if self._graph_exec is not None:
+            cu_graph_exec_destroy(self._graph_exec)
+            self._graph_exec = None
+        if self._graph is not None:
+            cu_graph_destroy(self._graph)
+            self._graph = None
+
+
+    def __repr__(self):
+        return ("Graph(n_nodes=%i, n_captures=%i, n_updates=%i, n_instantiations=%i)"
+                %(self.n_nodes, self.n_captures, self.n_updates, self.n_instantiations))
+
+
+    def __enter__(self):
+        cu_stream_begin_capture(self.stream, capture_map[self.mode])
+        return self
+
+
+    def __exit__(self, exc_type, *args, **kwargs):
+        """
+        End the capture, and build or update the executable graph. 
+        If the block raised, the capture is discarded.
+        """
+        graph = cu_stream_end_capture(self.stream)
+        if exc_type is not None:
+            cu_graph_destroy(graph)
+            return
+        self._instantiate(graph)
+        if self._graph is not None:
+            cu_graph_destroy(self._graph)
+        self._graph = graph
+        self.n_nodes = cu_graph_num_nodes(graph)
+        self.n_captures += 1
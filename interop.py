@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "dlpack_device",
+    "export_cuda_array",
+    "export_dlpack",
+    "import_cuda_array",
+    "import_dlpack",
+    "stream_handle",
+    "sync_streams",
+]
+
+import ctypes
+from ctypes import (addressof,
+                    cast,
+                    CFUNCTYPE,
+                    c_char_p,
+                    c_int,
+                    c_int32,
+                    c_int64,
+                    c_uint8,
+                    c_uint16,
+                    c_uint64,
+                    c_void_p,
+                    POINTER,
+                    py_object,
+                    PYFUNCTYPE,
+                    Structure)
+import numpy as np
+
+# Local imports
+from cuda_helpers import cu_sync_stream
+from kernel_helpers import (cu_pointer_attributes,
+                            MEMORY_MANAGED)
+from mem_pool import stream_key
+from strides import (as_shape,
+                     c_strides,
+                     is_c_contiguous)
+
+
+# DLDeviceType values
+kDLCUDA = 2
+kDLCUDAManaged = 13
+
+# DLDataTypeCode values, keyed by numpy dtype kind
+_dl_codes = {'i': 0,
+             'u': 1,
+             'f': 2,
+             'c': 5,
+             'b': 6}
+_dl_kinds = dict((v, k) for k, v in _dl_codes.items())
+
+# Stream handle of the legacy default stream
+_LEGACY_STREAM = 1
+
+
+class DLDevice(Structure):
+    _fields_ = [("device_type", c_int32),
+                ("device_id", c_int32)]
+
+
+class DLDataType(Structure):
+    _fields_ = [("code", c_uint8),
+                ("bits", c_uint8),
+                ("lanes", c_uint16)]
+
+
+class DLTensor(Structure):
+    _fields_ = [("data", c_void_p),
+                ("device", DLDevice),
+                ("ndim", c_int32),
+                ("dtype", DLDataType),
+                ("shape", POINTER(c_int64)),
+                ("strides", POINTER(c_int64)),
+                ("byte_offset", c_uint64)]
+
+
+class DLManagedTensor(Structure):
+    pass
+
+_DLDeleter = CFUNCTYPE(None, POINTER(DLManagedTensor))
+DLManagedTensor._fields_ = [("dl_tensor", DLTensor),
+                            ("manager_ctx", c_void_p),
+                            ("deleter", _DLDeleter)]
+
+
+# Capsules are passed by address so the destructor never touches
+# the reference count of a capsule that is being deallocated.
+_PyCapsule_New = PYFUNCTYPE(py_object, c_void_p, c_char_p, c_void_p)(
+    ("PyCapsule_New", ctypes.pythonapi))
+_PyCapsule_IsValid = PYFUNCTYPE(c_int, c_void_p, c_char_p)(
+    ("PyCapsule_IsValid", ctypes.pythonapi))
+_PyCapsule_GetPointer = PYFUNCTYPE(c_void_p, c_void_p, c_char_p)(
+    ("PyCapsule_GetPointer", ctypes.pythonapi))
+_PyCapsule_SetName = PYFUNCTYPE(c_int, c_void_p, c_char_p)(
+    ("PyCapsule_SetName", ctypes.pythonapi))
+
+# Exported tensors, keyed by address, holding the DLManagedTensor,
+# its shape and stride arrays, and the owner of the memory.
+_exported = {}
+
+
+def _dlpack_deleter(managed):
+    _exported.pop(addressof(managed.contents), None)
+
+
+def _capsule_destructor(capsule):
+    # A consumer renames the capsule once it takes ownership,
+    # otherwise the tensor was never consumed and is freed here.
+    if _PyCapsule_IsValid(capsule, b"dltensor"):
+        managed = cast(_PyCapsule_GetPointer(capsule, b"dltensor"),
+                       POINTER(DLManagedTensor))
+        managed.contents.deleter(managed)
+
+_dl_deleter = _DLDeleter(_dlpack_deleter)
+_capsule_destructor_p = CFUNCTYPE(None, c_void_p)(_capsule_destructor)
+
+
+class _DLPack_Owner(object):
+
+    def __init__(self, managed):
+        """
+        Holds an imported DLManagedTensor, and calls its deleter
+        once every Device_Ptr wrapping the memory is gone.
+        """
+        self._managed = managed
+
+
+    def __del__(self):
+        deleter = self._managed.contents.deleter
+        if deleter:
+            deleter(self._managed)
+
+
+def stream_handle(stream):
+    """
+    Integer handle of a stream, as used by __cuda_array_interface__
+    and __dlpack__. The null stream maps to 1, the legacy default
+    stream.
+    """
+    key = stream_key(stream)
+    return _LEGACY_STREAM if key is None else key
+
+
+def sync_streams(producer, consumer):
+    """
+    Make work queued on the producer stream visible to the consumer
+    stream. Nothing is done if both are the same stream, or if the
+    consumer is -1, which requests no synchronization.
+
+    Parameters
+    ----------
+    producer : c_void_p or int
+        Stream the data was last written on.
+
+    consumer : c_void_p or int
+        Stream the data will be used on.
+    """
+    if consumer is not None and stream_key(consumer) == -1:
+        return
+    producer = stream_handle(producer)
+    if producer != stream_handle(consumer):
+        cu_sync_stream(c_void_p(producer))
+
+
+def dlpack_device(addr):
+    """
+    DLPack (device_type, device_id) of device memory.
+
+    Parameters
+    ----------
+    addr : c_void_p or int
+        Device address.
+
+    Returns
+    -------
+    device : tuple
+        (kDLCUDA, id) for device memory, or (kDLCUDAManaged, id)
+        for unified memory. Null pointers of empty arrays are
+        reported as device 0.
+    """
+    memory_type, device_id = cu_pointer_attributes(addr)
+    if memory_type == MEMORY_MANAGED:
+        return (kDLCUDAManaged, max(device_id, 0))
+    return (kDLCUDA, max(device_id, 0))
+
+
+def export_cuda_array(addr, shape, dtype, strides=None, stream=None):
+    """
+    Build a version 3 __cuda_array_interface__ dictionary.
+
+    Parameters
+    ----------
+    addr : c_void_p or int
+        Device address of the first element.
+
+    shape : tuple
+        The shape of the array.
+
+    dtype : np.dtype
+        That data type of the array.
+
+    strides : tuple, optional
+        Byte step of each dimension. None for C-contiguous memory.
+
+    stream : c_void_p, optional
+        Stream the data was last written on.
+
+    Returns
+    -------
+    iface : dict
+        The interface dictionary.
+    """
+    dtype = np.dtype(dtype)
+    shape = as_shape(shape)
+    if strides is not None and is_c_contiguous(shape, strides, dtype.itemsize):
+        strides = None
+    addr = addr.value if isinstance(addr, c_void_p) else addr
+    return {"shape": shape,
+            "typestr": dtype.str,
+            "descr": [("", dtype.str)],
+            "data": (addr or 0, False),
+            "strides": None if strides is None else tuple(strides),
+            "stream": stream_handle(stream),
+            "version": 3}
+
+
+def import_cuda_array(obj, stream=None):
+    """
+    Read the __cuda_array_interface__ of an object, and synchronize
+    its stream with the consumer stream.
+
+    Parameters
+    ----------
+    obj : object
+        Object exporting __cuda_array_interface__.
+
+    stream : c_void_p, optional
+        Stream the memory will be used on.
+
+    Returns
+    -------
+    addr : int
+        Device address of the first element.
+
+    shape : tuple
+        The shape of the array.
+
+    dtype : np.dtype
+        That data type of the array.
+
+    strides : tuple or None
+        Byte step of each dimension, None for C-contiguous memory.
+    """
+    iface = obj.__cuda_array_interface__
+    if iface.get("mask") is not None:
+        raise ValueError("Masked __cuda_array_interface__ arrays are not supported.")
+    producer = iface.get("stream")
+    if producer == 0:
+        raise ValueError("Stream 0 is disallowed by __cuda_array_interface__, "
+                         "use 1 for the legacy default stream.")
+    if producer is not None:
+        sync_streams(producer, stream)
+
+    strides = iface.get("strides")
+    return (iface["data"][0] or 0,
+            as_shape(iface["shape"]),
+            np.dtype(iface["typestr"]),
+            None if strides is None else tuple(strides))
+
+
+def export_dlpack(addr, shape, dtype, strides, device, owner):
+    """
+    Wrap device memory in a DLPack capsule.
+
+    Parameters
+    ----------
+    addr : c_void_p or int
+        Device address of the first element.
+
+    shape : tuple
+        The shape of the array.
+
+    dtype : np.dtype
+        That data type of the array.
+
+    strides : tuple
+        Byte step of each dimension.
+
+    device : tuple
+        DLPack (device_type, device_id) of the memory.
+
+    owner : object
+        Object that owns the memory. It is referenced until the
+        consumer calls the tensor's deleter.
+
+    Returns
+    -------
+    capsule : PyCapsule
+        Capsule named "dltensor", holding a DLManagedTensor.
+    """
+    dtype = np.dtype(dtype)
+    shape = as_shape(shape)
+    if dtype.kind not in _dl_codes:
+        raise TypeError("dtype %s cannot be exported with DLPack."%dtype)
+    if any(st % dtype.itemsize for st in strides):
+        raise ValueError("DLPack strides must be a multiple of the itemsize.")
+
+    ndim = len(shape)
+    dl_shape = (c_int64*ndim)(*shape)
+    dl_strides = (c_int64*ndim)(*[st//dtype.itemsize for st in strides])
+    managed = DLManagedTensor()
+    tensor = managed.dl_tensor
+    tensor.data = addr.value if isinstance(addr, c_void_p) else addr
+    tensor.device = DLDevice(*device)
+    tensor.ndim = ndim
+    tensor.dtype = DLDataType(_dl_codes[dtype.kind], 8*dtype.itemsize, 1)
+    tensor.shape = dl_shape
+    tensor.strides = dl_strides
+    tensor.byte_offset = 0
+    managed.deleter = _dl_deleter
+
+    _exported[addressof(managed)] = (managed, dl_shape, dl_strides, owner)
+    return _PyCapsule_New(addressof(managed), b"dltensor",
+                          cast(_capsule_destructor_p, c_void_p))
+
+
+def import_dlpack(obj, stream=None):
+    """
+    Consume a DLPack capsule, or an object exporting __dlpack__.
+
+    Parameters
+    ----------
+    obj : object
+        Object exporting __dlpack__ and __dlpack_device__, or a
+        "dltensor" PyCapsule.
+
+    stream : c_void_p, optional
+        Stream the memory will be used on. It is passed to the
+        producer, which makes it wait on pending work.
+
+    Returns
+    -------
+    addr : int
+        Device address of the first element.
+
+    shape : tuple
+        The shape of the array.
+
+    dtype : np.dtype
+        That data type of the array.
+
+    strides : tuple or None
+        Byte step of each dimension.
+
+    owner : object
+        Object that keeps the imported memory alive.
+    """
+    if hasattr(obj, "__dlpack__"):
+        if hasattr(obj, "__dlpack_device__"):
+            device_type = obj.__dlpack_device__()[0]
+            if device_type not in (kDLCUDA, kDLCUDAManaged):
+                raise ValueError("DLPack device type %i is not CUDA memory."%device_type)
+        capsule = obj.__dlpack__(stream=stream_handle(stream))
+    else:
+        capsule = obj
+
+    if not _PyCapsule_IsValid(id(capsule), b"dltensor"):
+        raise ValueError("Expected an unconsumed DLPack capsule.")
+    managed = cast(_PyCapsule_GetPointer(id(capsule), b"dltensor"),
+                   POINTER(DLManagedTensor))
+    tensor = managed.contents.dl_tensor
+
+    if tensor.device.device_type not in (kDLCUDA, kDLCUDAManaged):
+        raise ValueError("DLPack device type %i is not CUDA memory."%tensor.device.device_type)
+    code, bits, lanes = tensor.dtype.code, tensor.dtype.bits, tensor.dtype.lanes
+    if lanes != 1 or code not in _dl_kinds or bits % 8:
+        raise TypeError("Unsupported DLPack dtype (code=%i, bits=%i, lanes=%i)."%(code, bits, lanes))
+    dtype = np.dtype("%s%i"%(_dl_kinds[code], bits//8))
+
+    shape = tuple(tensor.shape[i] for i in range(tensor.ndim))
+    if tensor.strides:
+        strides = tuple(tensor.strides[i]*dtype.itemsize for i in range(tensor.ndim))
+    else:
+        strides = c_strides(shape, dtype.itemsize)
+    addr = (tensor.data or 0) + tensor.byte_offset
+
+    _PyCapsule_SetName(id(capsule), b"used_dltensor")
+    return addr, shape, dtype, strides, _DLPack_Owner(managed)
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "close_ipc_mappings",
+    "export_ipc",
+    "import_ipc",
+    "Ipc_Event",
+    "Ipc_Handle",
+]
+
+import os
+import numpy as np
+
+# Local imports
+from cuctx import current_context
+from kernel_helpers import (cu_event_create,
+                            cu_event_destroy,
+                            cu_event_query,
+                            cu_event_record,
+                            cu_event_synchronize,
+                            cu_ipc_close_mem_handle,
+                            cu_ipc_get_event_handle,
+                            cu_ipc_get_mem_handle,
+                            cu_ipc_open_event_handle,
+                            cu_ipc_open_mem_handle,
+                            cu_stream_wait_event,
+                            EVENT_DISABLE_TIMING,
+                            EVENT_INTERPROCESS)
+from strides import (as_shape,
+                     c_strides,
+                     is_c_contiguous,
+                     prod)
+
+
+# Allocations opened in this process: (context, handle) -> [address,
+# refcount]. cudaIpcOpenMemHandle may only map a handle once per
+# context, so every import of the same allocation shares one mapping.
+_mappings = {}
+
+# Events opened in this process, keyed by (context, handle). An event
+# sent with every export is opened once, rather than once per message.
+_events = {}
+
+
+class Ipc_Event(object):
+
+    def __init__(self, handle=None):
+        """
+        Interprocess CUDA event, used to order work on streams of
+        different processes. Pickling the event sends its handle,
+        and unpickling opens the event in the receiving process.
+
+        Parameters
+        ----------
+        handle : bytes, optional
+            Handle of an event exported by another process. If
+            None, a new event is created.
+
+        Attributes
+        ----------
+        event : c_void_p
+            The cudaEvent_t handle.
+
+        handle : bytes
+            The cudaIpcEventHandle_t of the event.
+
+        Notes
+        -----
+        The exporting process must keep its event alive while other
+        processes still use it. Events received by unpickling are 
+        cached per context, and destroyed by close_ipc_mappings 
+        when the device exits.
+        """
+        if handle is None:
+            self.event = cu_event_create(EVENT_DISABLE_TIMING | EVENT_INTERPROCESS)
+            self.handle = cu_ipc_get_event_handle(self.event)
+        else:
+            self.event = cu_ipc_open_event_handle(handle)
+            self.handle = handle
+
+
+    def record(self, stream=None):
+        """
+        Record the event on a stream.
+        """
+        cu_event_record(self.event, stream)
+
+
+    def wait(self, stream=None):
+        """
+        Make a stream wait on the event without blocking the host.
+        """
+        cu_stream_wait_event(stream, self.event)
+
+
+    def synchronize(self):
+        """
+        Block the host thread until the event has completed.
+        """
+        cu_event_synchronize(self.event)
+
+
+    def query(self):
+        """
+        True if the event has completed.
+        """
+        return cu_event_query(self.event)
+
+
+    def __reduce__(self):
+        return (_open_event, (self.handle,))
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args, **kwargs):
+        cu_event_destroy(self.event)
+
+
+def _open_event(handle):
+    key = (current_context(), handle)
+    if key not in _events:
+        _events[key] = Ipc_Event(handle)
+    return _events[key]
+
+
+class Ipc_Handle(object):
+
+    def __init__(self, handle, offset, shape, dtype, strides, event=None):
+        """
+        Picklable description of device memory exported to other
+        processes. It can be sent through multiprocessing queues
+        and pipes.
+
+        Parameters
+        ----------
+        handle : bytes
+            The cudaIpcMemHandle_t of the allocation.
+
+        offset : int
+            Byte offset of the array into the allocation.
+
+        shape : tuple
+            The shape of the array.
+
+        dtype : np.dtype
+            That data type of the array.
+
+        strides : tuple
+            Byte step of each dimension.
+
+        event : Ipc_Event, optional
+            Event recorded after the last write to the memory. The
+            importer waits on it before using the memory.
+        """
+        self.handle = handle
+        self.offset = offset
+        self.shape = as_shape(shape)
+        self.dtype = np.dtype(dtype)
+        self.strides = tuple(strides)
+        self.event = event
+        self.pid = os.getpid()
+
+
+    def __repr__(self):
+        return ("Ipc_Handle(shape=%s, dtype=%s, offset=%i, pid=%i)"
+                %(self.shape, self.dtype, self.offset, self.pid))
+
+
+class _Ipc_Mapping(object):
+
+    def __init__(self, key):
+        """
+        Reference to an opened allocation, held as the base of the
+        imported Device_Ptrs. The allocation is unmapped once the
+        last reference is gone.
+        """
+        self._key = key
+        self._entry = _mappings[key]
+        self._entry[1] += 1
+
+
+    def __del__(self):
+        entry = self._entry
+        entry[1] -= 1
+        if entry[1] == 0 and entry[0] is not None:
+            cu_ipc_close_mem_handle(entry[0])
+            entry[0] = None
+            if _mappings.get(self._key) is entry:
+                del _mappings[self._key]
+
+
+def export_ipc(dev_ptr, shape, dtype, strides, stream=None, event=None):
+    """
+    Export device memory to other processes.
+
+    Parameters
+    ----------
+    dev_ptr : c_void_p
+        Device address of the first element.
+
+    shape : tuple
+        The shape of the array.
+
+    dtype : np.dtype
+        That data type of the array.
+
+    strides : tuple
+        Byte step of each dimension.
+
+    stream : c_void_p, optional
+        Stream the memory was last written on.
+
+    event : Ipc_Event, optional
+        If given, recorded on stream and sent with the handle.
+
+    Returns
+    -------
+    handle : Ipc_Handle
+        Picklable handle to the memory.
+    """
+    if event is not None:
+        event.record(stream)
+    handle, offset = cu_ipc_get_mem_handle(dev_ptr)
+    return Ipc_Handle(handle, offset, shape, dtype, strides, event)
+
+
+def import_ipc(handle, shape=None, dtype=None, stream=None, context=None):
+    """
+    Map device memory exported by another process.
+
+    Parameters
+    ----------
+    handle : Ipc_Handle
+        Handle received from the exporting process.
+
+    shape : tuple, optional
+        Shape to view the memory with. Defaults to the exported
+        shape.
+
+    dtype : np.dtype, optional
+        Data type to view the memory with. Defaults to the exported
+        dtype.
+
+    stream : c_void_p, optional
+        Stream the memory will be used on. If the handle carries an
+        event, the stream waits on it.
+
+    context : cuCtx, optional
+        Context the memory is mapped in. If None, the current one.
+
+    Returns
+    -------
+    addr : int
+        Device address of the first element.
+
+    shape : tuple
+        The shape of the array.
+
+    dtype : np.dtype
+        That data type of the array.
+
+    strides : tuple
+        Byte step of each dimension.
+
+    mapping : object
+        Reference that keeps the allocation mapped.
+    """
+    shape = handle.shape if shape is None else as_shape(shape)
+    dtype = handle.dtype if dtype is None else np.dtype(dtype)
+    strides = handle.strides
+    if shape != handle.shape or dtype != handle.dtype:
+        if not is_c_contiguous(handle.shape, handle.strides, handle.dtype.itemsize):
+            raise ValueError("Only contiguous exports can be viewed with a new shape or dtype.")
+        if prod(shape)*dtype.itemsize > prod(handle.shape)*handle.dtype.itemsize:
+            raise ValueError("Requested shape and dtype exceed the exported memory.")
+        strides = c_strides(shape, dtype.itemsize)
+
+    key = (context or current_context(), handle.handle)
+    if key not in _mappings:
+        _mappings[key] = [cu_ipc_open_mem_handle(handle.handle).value, 0]
+    mapping = _Ipc_Mapping(key)
+    if handle.event is not None:
+        handle.event.wait(stream)
+    return _mappings[key][0] + handle.offset, shape, dtype, strides, mapping
+
+
+def close_ipc_mappings(context):
+    """
+    Unmap every allocation and destroy every event opened in a 
+    context. Only call once its imported memory is no longer used, 
+    as when the device exits.
+
+    Parameters
+    ----------
+    context : cuCtx
+        The context, current on the calling thread.
+    """
+    for key in [key for key in _mappings if key[0] is context]:
+        entry = _mappings.pop(key)
+        cu_ipc_close_mem_handle(entry[0])
+        entry[0] = None
+    for key in [key for key in _events if key[0] is context]:
+        cu_event_destroy(_events.pop(key).event)
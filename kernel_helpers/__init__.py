@@ -0,0 +1,15 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from convert_ops import *
+from copy_ops import *
+from event_ops import *
+from fill_ops import *
+from graph_ops import *
+from ipc_ops import *
+from managed_ops import *
+from peer_ops import *
+from pointer_ops import *
+from reduce_ops import *
+from transpose_ops import *
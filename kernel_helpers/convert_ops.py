@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "cu_astype",
+]
+
+from ctypes import c_int, c_size_t, c_void_p
+
+# Local imports
+from kernel_lib import kernel_lib
+
+
+_cu_astype = kernel_lib.cu_astype
+_cu_astype.argtypes = [c_void_p,
+                       c_int,
+                       c_void_p,
+                       c_int,
+                       c_size_t,
+                       c_void_p]
+_cu_astype.restype = None
+
+
+def cu_astype(d_src, src_dtype, d_dst, dst_dtype, size, stream=None):
+    """
+    Convert a device array to another data type on the device. 
+    Real to complex conversion sets the imaginary part to zero, 
+    and complex to real conversion keeps the real part. Float to 
+    integer conversion truncates, as numpy astype does.
+
+    Parameters
+    ----------
+    d_src : c_void_p
+        Pointer to the source device memory.
+
+    src_dtype : int
+        dtype identifier of the source.
+
+    d_dst : c_void_p
+        Pointer to the destination device memory.
+
+    dst_dtype : int
+        dtype identifier of the destination.
+
+    size : int
+        Number of elements to convert.
+
+    stream : c_void_p, optional
+        CUDA stream to launch the kernel on.
+    """
+    _cu_astype(d_src, src_dtype, d_dst, dst_dtype, size, stream)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "cu_memcpy_strided",
+    "cu_memcpy_strided_async",
+    "MEMCPY_D2D",
+    "MEMCPY_D2H",
+    "MEMCPY_H2D",
+]
+
+from ctypes import c_int, c_size_t, c_void_p
+
+# Local imports
+from kernel_lib import kernel_lib
+
+
+# cudaMemcpyKind values
+MEMCPY_H2D = 1
+MEMCPY_D2H = 2
+MEMCPY_D2D = 3
+
+_argtypes = [c_void_p, c_size_t, c_size_t,
+             c_void_p, c_size_t, c_size_t,
+             c_size_t, c_size_t, c_size_t,
+             c_int]
+
+_cu_memcpy_strided = kernel_lib.cu_memcpy_strided
+_cu_memcpy_strided.argtypes = _argtypes
+_cu_memcpy_strided.restype = None
+
+_cu_memcpy_strided_async = kernel_lib.cu_memcpy_strided_async
+_cu_memcpy_strided_async.argtypes = _argtypes + [c_void_p]
+_cu_memcpy_strided_async.restype = None
+
+
+def cu_memcpy_strided(dst, dpitch, dslice, src, spitch, sslice,
+                      width, height, depth, kind):
+    """
+    Copy a pitched 3D region of memory.
+
+    Parameters
+    ----------
+    dst : c_void_p or int
+        Destination address.
+
+    dpitch : int
+        Destination row pitch in bytes.
+
+    dslice : int
+        Destination slice pitch in bytes.
+
+    src : c_void_p or int
+        Source address.
+
+    spitch : int
+        Source row pitch in bytes.
+
+    sslice : int
+        Source slice pitch in bytes.
+
+    width : int
+        Contiguous bytes per row.
+
+    height : int
+        Number of rows per slice.
+
+    depth : int
+        Number of slices.
+
+    kind : int
+        Direction of the copy, one of MEMCPY_H2D, MEMCPY_D2H, 
+        or MEMCPY_D2D.
+    """
+    _cu_memcpy_strided(dst, dpitch, dslice, src, spitch, sslice,
+                       width, height, depth, kind)
+
+
+def cu_memcpy_strided_async(dst, dpitch, dslice, src, spitch, sslice,
+                            width, height, depth, kind, stream=None):
+    """
+    Asynchronously copy a pitched 3D region of memory. See 
+    cu_memcpy_strided for the parameters.
+
+    Parameters
+    ----------
+    stream : c_void_p, optional
+        CUDA stream to issue the copy on.
+    """
+    _cu_memcpy_strided_async(dst, dpitch, dslice, src, spitch, sslice,
+                             width, height, depth, kind, stream)
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "cu_event_create",
+    "cu_event_destroy",
+    "cu_event_elapsed_time",
+    "cu_event_query",
+    "cu_event_record",
+    "cu_event_synchronize",
+    "cu_launch_host_func",
+    "cu_stream_wait_event",
+    "EVENT_BLOCKING_SYNC",
+    "EVENT_DEFAULT",
+    "EVENT_DISABLE_TIMING",
+    "EVENT_INTERPROCESS",
+    "HOST_FUNC",
+]
+
+from ctypes import CFUNCTYPE, c_float, c_int, c_uint, c_void_p
+
+# Local imports
+from kernel_lib import kernel_lib
+
+
+# cudaEventCreateWithFlags flags
+EVENT_DEFAULT = 0
+EVENT_BLOCKING_SYNC = 1
+EVENT_DISABLE_TIMING = 2
+EVENT_INTERPROCESS = 4
+
+# cudaHostFn_t, void (*)(void *userData)
+HOST_FUNC = CFUNCTYPE(None, c_void_p)
+
+_cu_event_create = kernel_lib.cu_event_create
+_cu_event_create.argtypes = [c_uint]
+_cu_event_create.restype = c_void_p
+
+_cu_event_destroy = kernel_lib.cu_event_destroy
+_cu_event_destroy.argtypes = [c_void_p]
+_cu_event_destroy.restype = None
+
+_cu_event_record = kernel_lib.cu_event_record
+_cu_event_record.argtypes = [c_void_p,
+                             c_void_p]
+_cu_event_record.restype = None
+
+_cu_event_query = kernel_lib.cu_event_query
+_cu_event_query.argtypes = [c_void_p]
+_cu_event_query.restype = c_int
+
+_cu_event_synchronize = kernel_lib.cu_event_synchronize
+_cu_event_synchronize.argtypes = [c_void_p]
+_cu_event_synchronize.restype = None
+
+_cu_event_elapsed_time = kernel_lib.cu_event_elapsed_time
+_cu_event_elapsed_time.argtypes = [c_void_p,
+                                   c_void_p]
+_cu_event_elapsed_time.restype = c_float
+
+_cu_stream_wait_event = kernel_lib.cu_stream_wait_event
+_cu_stream_wait_event.argtypes = [c_void_p,
+                                  c_void_p]
+_cu_stream_wait_event.restype = None
+
+_cu_launch_host_func = kernel_lib.cu_launch_host_func
+_cu_launch_host_func.argtypes = [c_void_p,
+                                 HOST_FUNC,
+                                 c_void_p]
+_cu_launch_host_func.restype = None
+
+
+def cu_event_create(flags=EVENT_DEFAULT):
+    """
+    Create a CUDA event.
+
+    Parameters
+    ----------
+    flags : int, optional
+        Bitwise or of the EVENT_* flags.
+
+    Returns
+    -------
+    event : c_void_p
+        The cudaEvent_t handle.
+    """
+    return c_void_p(_cu_event_create(flags))
+
+
+def cu_event_destroy(event):
+    """
+    Destroy a CUDA event.
+    """
+    _cu_event_destroy(event)
+
+
+def cu_event_record(event, stream=None):
+    """
+    Record an event on a stream. The event completes once all work 
+    queued on the stream before it has completed.
+
+    Parameters
+    ----------
+    event : c_void_p
+        The event to record.
+
+    stream : c_void_p, optional
+        CUDA stream to record the event on.
+    """
+    _cu_event_record(event, stream)
+
+
+def cu_event_query(event):
+    """
+    Check, without blocking, whether an event has completed.
+
+    Returns
+    -------
+    done : bool
+        True if all work captured by the event has completed.
+    """
+    return bool(_cu_event_query(event))
+
+
+def cu_event_synchronize(event):
+    """
+    Block the host thread until an event has completed.
+    """
+    _cu_event_synchronize(event)
+
+
+def cu_event_elapsed_time(start, end):
+    """
+    Elapsed time between two completed events, in milliseconds. 
+    Neither event may have been created with EVENT_DISABLE_TIMING.
+    """
+    return _cu_event_elapsed_time(start, end)
+
+
+def cu_stream_wait_event(stream, event):
+    """
+    Make future work queued on a stream wait on an event, without 
+    blocking the host thread.
+
+    Parameters
+    ----------
+    stream : c_void_p
+        The CUDA stream that waits.
+
+    event : c_void_p
+        The event to wait on.
+    """
+    _cu_stream_wait_event(stream, event)
+
+
+def cu_launch_host_func(stream, fn, data=None):
+    """
+    Queue a host function on a stream. It runs on a CUDA driver 
+    thread once all work queued on the stream before it has 
+    completed, and must not make CUDA calls.
+
+    Parameters
+    ----------
+    stream : c_void_p
+        The CUDA stream.
+
+    fn : HOST_FUNC
+        The callback. It must be kept alive until it has run.
+
+    data : int, optional
+        Value passed to fn.
+    """
+    _cu_launch_host_func(stream, fn, data)
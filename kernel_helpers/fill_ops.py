@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "cu_arange",
+    "cu_fill",
+]
+
+from ctypes import c_int, c_size_t, c_void_p
+import numpy as np
+from numpy.ctypeslib import ndpointer
+
+# Local imports
+from kernel_lib import kernel_lib
+
+
+_cu_fill = kernel_lib.cu_fill
+_cu_fill.argtypes = [c_void_p,
+                     ndpointer(flags="C"),
+                     c_size_t,
+                     c_size_t,
+                     c_int,
+                     c_void_p]
+_cu_fill.restype = None
+
+_cu_arange = kernel_lib.cu_arange
+_cu_arange.argtypes = [c_void_p,
+                       ndpointer('f8', flags="C"),
+                       ndpointer('f8', flags="C"),
+                       c_size_t,
+                       c_int,
+                       c_void_p]
+_cu_arange.restype = None
+
+
+def cu_fill(d_arr, val, size, incx, dtype, stream=None):
+    """
+    Set elements of a device array to a scalar value.
+
+    Parameters
+    ----------
+    d_arr : c_void_p
+        Pointer to device memory.
+
+    val : np.ndarray
+        Single element array holding the value, in the same 
+        data type as d_arr.
+
+    size : int
+        Number of elements to set.
+
+    incx : int
+        Step between set elements.
+
+    dtype : int
+        dtype identifier.
+
+    stream : c_void_p, optional
+        CUDA stream to launch the kernel on.
+    """
+    _cu_fill(d_arr, val, size, incx, dtype, stream)
+
+
+def cu_arange(d_arr, start, step, size, dtype, stream=None):
+    """
+    Fill a device array with evenly spaced values, 
+    d_arr[i] = start + i*step. Values are computed in double 
+    precision and then cast to the array type.
+
+    Parameters
+    ----------
+    d_arr : c_void_p
+        Pointer to device memory.
+
+    start : scalar
+        Value of the first element.
+
+    step : scalar
+        Spacing between consecutive elements.
+
+    size : int
+        Number of elements to set.
+
+    dtype : int
+        dtype identifier.
+
+    stream : c_void_p, optional
+        CUDA stream to launch the kernel on.
+    """
+    start = np.array([complex(start).real, complex(start).imag], dtype='f8')
+    step = np.array([complex(step).real, complex(step).imag], dtype='f8')
+    _cu_arange(d_arr, start, step, size, dtype, stream)
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "CAPTURE_MODE_GLOBAL",
+    "CAPTURE_MODE_RELAXED",
+    "CAPTURE_MODE_THREAD_LOCAL",
+    "cu_graph_destroy",
+    "cu_graph_exec_destroy",
+    "cu_graph_exec_update",
+    "cu_graph_instantiate",
+    "cu_graph_launch",
+    "cu_graph_num_nodes",
+    "cu_stream_begin_capture",
+    "cu_stream_end_capture",
+    "cu_stream_is_capturing",
+]
+
+from ctypes import c_int, c_size_t, c_void_p
+
+# Local imports
+from kernel_lib import kernel_lib
+
+
+# cudaStreamCaptureMode values
+CAPTURE_MODE_GLOBAL = 0
+CAPTURE_MODE_THREAD_LOCAL = 1
+CAPTURE_MODE_RELAXED = 2
+
+_cu_stream_begin_capture = kernel_lib.cu_stream_begin_capture
+_cu_stream_begin_capture.argtypes = [c_void_p,
+                                     c_int]
+_cu_stream_begin_capture.restype = None
+
+_cu_stream_end_capture = kernel_lib.cu_stream_end_capture
+_cu_stream_end_capture.argtypes = [c_void_p]
+_cu_stream_end_capture.restype = c_void_p
+
+_cu_stream_is_capturing = kernel_lib.cu_stream_is_capturing
+_cu_stream_is_capturing.argtypes = [c_void_p]
+_cu_stream_is_capturing.restype = c_int
+
+_cu_graph_instantiate = kernel_lib.cu_graph_instantiate
+_cu_graph_instantiate.argtypes = [c_void_p]
+_cu_graph_instantiate.restype = c_void_p
+
+_cu_graph_exec_update = kernel_lib.cu_graph_exec_update
+_cu_graph_exec_update.argtypes = [c_void_p,
+                                  c_void_p]
+_cu_graph_exec_update.restype = c_int
+
+_cu_graph_launch = kernel_lib.cu_graph_launch
+_cu_graph_launch.argtypes = [c_void_p,
+                             c_void_p]
+_cu_graph_launch.restype = None
+
+_cu_graph_num_nodes = kernel_lib.cu_graph_num_nodes
+_cu_graph_num_nodes.argtypes = [c_void_p]
+_cu_graph_num_nodes.restype = c_size_t
+
+_cu_graph_destroy = kernel_lib.cu_graph_destroy
+_cu_graph_destroy.argtypes = [c_void_p]
+_cu_graph_destroy.restype = None
+
+_cu_graph_exec_destroy = kernel_lib.cu_graph_exec_destroy
+_cu_graph_exec_destroy.argtypes = [c_void_p]
+_cu_graph_exec_destroy.restype = None
+
+
+def cu_stream_begin_capture(stream, mode=CAPTURE_MODE_GLOBAL):
+    """
+    Start recording the work queued on a stream into a graph,
+    instead of running it.
+
+    Parameters
+    ----------
+    stream : c_void_p
+        The CUDA stream. The legacy null stream cannot be captured.
+
+    mode : int, optional
+        One of the CAPTURE_MODE_* values, controlling which unsafe
+        calls (e.g. cudaMalloc) made by other threads are errors
+        while capturing.
+    """
+    _cu_stream_begin_capture(stream, mode)
+
+
+def cu_stream_end_capture(stream):
+    """
+    Stop capturing a stream.
+
+    Returns
+    -------
+    graph : c_void_p
+        The cudaGraph_t of the captured work.
+    """
+    return c_void_p(_cu_stream_end_capture(stream))
+
+
+def cu_stream_is_capturing(stream):
+    """
+    True if the stream is being captured.
+    """
+    return _cu_stream_is_capturing(stream) == 1
+
+
+def cu_graph_instantiate(graph):
+    """
+    Create an executable graph from a graph.
+
+    Returns
+    -------
+    graph_exec : c_void_p
+        The cudaGraphExec_t handle.
+    """
+    return c_void_p(_cu_graph_instantiate(graph))
+
+
+def cu_graph_exec_update(graph_exec, graph):
+    """
+    Update the node parameters (pointers, scalars, copy sizes) of an
+    executable graph from a graph of the same topology.
+
+    Returns
+    -------
+    updated : bool
+        False if the topologies differ, and graph has to be
+        instantiated instead.
+    """
+    return _cu_graph_exec_update(graph_exec, graph) == 0
+
+
+def cu_graph_launch(graph_exec, stream=None):
+    """
+    Queue an executable graph on a stream.
+    """
+    _cu_graph_launch(graph_exec, stream)
+
+
+def cu_graph_num_nodes(graph):
+    """
+    Number of nodes in a graph.
+    """
+    return _cu_graph_num_nodes(graph)
+
+
+def cu_graph_destroy(graph):
+    """
+    Destroy a graph.
+    """
+    _cu_graph_destroy(graph)
+
+
+def cu_graph_exec_destroy(graph_exec):
+    """
+    Destroy an executable graph.
+    """
+    _cu_graph_exec_destroy(graph_exec)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "cu_ipc_close_mem_handle",
+    "cu_ipc_get_event_handle",
+    "cu_ipc_get_mem_handle",
+    "cu_ipc_open_event_handle",
+    "cu_ipc_open_mem_handle",
+    "IPC_HANDLE_SIZE",
+]
+
+from ctypes import (byref,
+                    c_char_p,
+                    c_int,
+                    c_size_t,
+                    c_void_p,
+                    create_string_buffer)
+
+# Local imports
+from kernel_lib import kernel_lib
+
+
+# CUDA_IPC_HANDLE_SIZE
+IPC_HANDLE_SIZE = 64
+
+_cu_ipc_get_mem_handle = kernel_lib.cu_ipc_get_mem_handle
+_cu_ipc_get_mem_handle.argtypes = [c_void_p,
+                                   c_char_p,
+                                   c_void_p]
+_cu_ipc_get_mem_handle.restype = None
+
+_cu_ipc_open_mem_handle = kernel_lib.cu_ipc_open_mem_handle
+_cu_ipc_open_mem_handle.argtypes = [c_char_p]
+_cu_ipc_open_mem_handle.restype = c_void_p
+
+_cu_ipc_close_mem_handle = kernel_lib.cu_ipc_close_mem_handle
+_cu_ipc_close_mem_handle.argtypes = [c_void_p]
+_cu_ipc_close_mem_handle.restype = c_int
+
+_cu_ipc_get_event_handle = kernel_lib.cu_ipc_get_event_handle
+_cu_ipc_get_event_handle.argtypes = [c_void_p,
+                                     c_char_p]
+_cu_ipc_get_event_handle.restype = None
+
+_cu_ipc_open_event_handle = kernel_lib.cu_ipc_open_event_handle
+_cu_ipc_open_event_handle.argtypes = [c_char_p]
+_cu_ipc_open_event_handle.restype = c_void_p
+
+
+def cu_ipc_get_mem_handle(dev_ptr):
+    """
+    Get an interprocess handle for the allocation holding a device 
+    pointer.
+
+    Parameters
+    ----------
+    dev_ptr : c_void_p
+        Pointer into device memory allocated with cudaMalloc.
+
+    Returns
+    -------
+    handle : bytes
+        The cudaIpcMemHandle_t of the allocation.
+
+    offset : int
+        Byte offset of dev_ptr from the start of the allocation.
+    """
+    handle = create_string_buffer(IPC_HANDLE_SIZE)
+    offset = c_size_t()
+    _cu_ipc_get_mem_handle(dev_ptr, handle, byref(offset))
+    return handle.raw, offset.value
+
+
+def cu_ipc_open_mem_handle(handle):
+    """
+    Map an allocation exported by another process.
+
+    Parameters
+    ----------
+    handle : bytes
+        The cudaIpcMemHandle_t from cu_ipc_get_mem_handle.
+
+    Returns
+    -------
+    dev_ptr : c_void_p
+        Pointer to the start of the mapped allocation.
+    """
+    return c_void_p(_cu_ipc_open_mem_handle(handle))
+
+
+def cu_ipc_close_mem_handle(dev_ptr):
+    """
+    Unmap an allocation opened with cu_ipc_open_mem_handle. The 
+    memory itself is only freed by the exporting process.
+
+    Returns
+    -------
+    error : int
+        The cudaError_t code, 0 on success.
+    """
+    return _cu_ipc_close_mem_handle(dev_ptr)
+
+
+def cu_ipc_get_event_handle(event):
+    """
+    Get an interprocess handle for an event created with 
+    EVENT_INTERPROCESS and EVENT_DISABLE_TIMING.
+
+    Returns
+    -------
+    handle : bytes
+        The cudaIpcEventHandle_t of the event.
+    """
+    handle = create_string_buffer(IPC_HANDLE_SIZE)
+    _cu_ipc_get_event_handle(event, handle)
+    return handle.raw
+
+
+def cu_ipc_open_event_handle(handle):
+    """
+    Open an event exported by another process.
+
+    Returns
+    -------
+    event : c_void_p
+        The cudaEvent_t handle, to be destroyed with 
+        cu_event_destroy when no longer needed.
+    """
+    return c_void_p(_cu_ipc_open_event_handle(handle))
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "kernel_lib",
+]
+
+import os
+
+# Local imports
+from shared_utils import load_lib
+
+
+lib_path = os.path.join(os.path.abspath(os.path.dirname(__file__)), "lib")
+kernel_lib = load_lib(lib_path, "kernels")
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "ADVISE_SET_ACCESSED_BY",
+    "ADVISE_SET_PREFERRED_LOCATION",
+    "ADVISE_SET_READ_MOSTLY",
+    "ADVISE_UNSET_ACCESSED_BY",
+    "ADVISE_UNSET_PREFERRED_LOCATION",
+    "ADVISE_UNSET_READ_MOSTLY",
+    "CPU_DEVICE_ID",
+    "cu_mem_advise",
+    "cu_mem_prefetch_async",
+]
+
+from ctypes import c_int, c_size_t, c_void_p
+
+# Local imports
+from kernel_lib import kernel_lib
+
+
+# cudaCpuDeviceId
+CPU_DEVICE_ID = -1
+
+# cudaMemoryAdvise values
+ADVISE_SET_READ_MOSTLY = 1
+ADVISE_UNSET_READ_MOSTLY = 2
+ADVISE_SET_PREFERRED_LOCATION = 3
+ADVISE_UNSET_PREFERRED_LOCATION = 4
+ADVISE_SET_ACCESSED_BY = 5
+ADVISE_UNSET_ACCESSED_BY = 6
+
+_cu_mem_prefetch_async = kernel_lib.cu_mem_prefetch_async
+_cu_mem_prefetch_async.argtypes = [c_void_p,
+                                   c_size_t,
+                                   c_int,
+                                   c_void_p]
+_cu_mem_prefetch_async.restype = None
+
+_cu_mem_advise = kernel_lib.cu_mem_advise
+_cu_mem_advise.argtypes = [c_void_p,
+                           c_size_t,
+                           c_int,
+                           c_int]
+_cu_mem_advise.restype = None
+
+
+def cu_mem_prefetch_async(ptr, nbytes, device, stream=None):
+    """
+    Migrate managed memory to a device, or to the host, ahead of 
+    its use.
+
+    Parameters
+    ----------
+    ptr : c_void_p
+        Pointer to managed memory.
+
+    nbytes : int
+        Size to migrate in bytes.
+
+    device : int
+        Destination device ordinal, or CPU_DEVICE_ID for the host.
+
+    stream : c_void_p, optional
+        CUDA stream to order the migration on.
+    """
+    _cu_mem_prefetch_async(ptr, nbytes, device, stream)
+
+
+def cu_mem_advise(ptr, nbytes, advice, device):
+    """
+    Give the driver a usage hint for a range of managed memory.
+
+    Parameters
+    ----------
+    ptr : c_void_p
+        Pointer to managed memory.
+
+    nbytes : int
+        Size of the range in bytes.
+
+    advice : int
+        One of the ADVISE_* values.
+
+    device : int
+        Device ordinal the advice refers to, or CPU_DEVICE_ID.
+    """
+    _cu_mem_advise(ptr, nbytes, advice, device)
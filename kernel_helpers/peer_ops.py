@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "cu_device_can_access_peer",
+    "cu_device_disable_peer_access",
+    "cu_device_enable_peer_access",
+    "cu_host_alloc_portable",
+    "cu_host_free",
+    "cu_memcpy_default_async",
+    "cu_memcpy_peer_async",
+]
+
+from ctypes import c_int, c_size_t, c_void_p
+
+# Local imports
+from kernel_lib import kernel_lib
+
+
+_cu_device_can_access_peer = kernel_lib.cu_device_can_access_peer
+_cu_device_can_access_peer.argtypes = [c_int,
+                                       c_int]
+_cu_device_can_access_peer.restype = c_int
+
+_cu_device_enable_peer_access = kernel_lib.cu_device_enable_peer_access
+_cu_device_enable_peer_access.argtypes = [c_int]
+_cu_device_enable_peer_access.restype = c_int
+
+_cu_device_disable_peer_access = kernel_lib.cu_device_disable_peer_access
+_cu_device_disable_peer_access.argtypes = [c_int]
+_cu_device_disable_peer_access.restype = None
+
+_cu_memcpy_peer_async = kernel_lib.cu_memcpy_peer_async
+_cu_memcpy_peer_async.argtypes = [c_void_p,
+                                  c_int,
+                                  c_void_p,
+                                  c_int,
+                                  c_size_t,
+                                  c_void_p]
+_cu_memcpy_peer_async.restype = None
+
+_cu_memcpy_default_async = kernel_lib.cu_memcpy_default_async
+_cu_memcpy_default_async.argtypes = [c_void_p,
+                                     c_void_p,
+                                     c_size_t,
+                                     c_void_p]
+_cu_memcpy_default_async.restype = None
+
+_cu_host_alloc_portable = kernel_lib.cu_host_alloc_portable
+_cu_host_alloc_portable.argtypes = [c_size_t]
+_cu_host_alloc_portable.restype = c_void_p
+
+_cu_host_free = kernel_lib.cu_host_free
+_cu_host_free.argtypes = [c_void_p]
+_cu_host_free.restype = None
+
+
+def cu_device_can_access_peer(device, peer):
+    """
+    True if device can directly access memory on peer.
+
+    Parameters
+    ----------
+    device, peer : int
+        CUDA device IDs.
+    """
+    return _cu_device_can_access_peer(device, peer) == 1
+
+
+def cu_device_enable_peer_access(peer):
+    """
+    Let the current context access memory on peer.
+
+    Returns
+    -------
+    enabled : bool
+        True if access is enabled, or already was. False if the
+        device pair does not support it.
+    """
+    return _cu_device_enable_peer_access(peer) == 1
+
+
+def cu_device_disable_peer_access(peer):
+    """
+    Revoke the current context's access to memory on peer. A no-op 
+    if access was not enabled.
+    """
+    _cu_device_disable_peer_access(peer)
+
+
+def cu_memcpy_peer_async(dst, dst_device, src, src_device, nbytes, stream=None):
+    """
+    Asynchronously copy memory between two devices.
+
+    Parameters
+    ----------
+    dst : c_void_p
+        Destination device pointer.
+
+    dst_device : int
+        CUDA device ID of dst.
+
+    src : c_void_p
+        Source device pointer.
+
+    src_device : int
+        CUDA device ID of src.
+
+    nbytes : int
+        Size to copy in bytes.
+
+    stream : c_void_p, optional
+        CUDA stream to queue the copy on.
+    """
+    _cu_memcpy_peer_async(dst, dst_device, src, src_device, nbytes, stream)
+
+
+def cu_memcpy_default_async(dst, src, nbytes, stream=None):
+    """
+    Asynchronously copy between any two addresses, host or device,
+    the direction inferred by unified addressing.
+    """
+    _cu_memcpy_default_async(dst, src, nbytes, stream)
+
+
+def cu_host_alloc_portable(nbytes):
+    """
+    Allocate pinned host memory, usable by every CUDA context.
+
+    Returns
+    -------
+    ptr : c_void_p
+        Pointer to the host memory.
+    """
+    return c_void_p(_cu_host_alloc_portable(nbytes))
+
+
+def cu_host_free(ptr):
+    """
+    Free memory allocated by cu_host_alloc_portable.
+    """
+    _cu_host_free(ptr)
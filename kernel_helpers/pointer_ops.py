@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "cu_pointer_attributes",
+    "MEMORY_DEVICE",
+    "MEMORY_HOST",
+    "MEMORY_MANAGED",
+    "MEMORY_UNREGISTERED",
+]
+
+from ctypes import byref, c_int, c_void_p
+
+# Local imports
+from kernel_lib import kernel_lib
+
+
+# cudaMemoryType values
+MEMORY_UNREGISTERED = 0
+MEMORY_HOST = 1
+MEMORY_DEVICE = 2
+MEMORY_MANAGED = 3
+
+_cu_pointer_attributes = kernel_lib.cu_pointer_attributes
+_cu_pointer_attributes.argtypes = [c_void_p,
+                                   c_void_p,
+                                   c_void_p]
+_cu_pointer_attributes.restype = None
+
+
+def cu_pointer_attributes(ptr):
+    """
+    Query the memory type and device of a pointer.
+
+    Parameters
+    ----------
+    ptr : c_void_p or int
+        Host or device address.
+
+    Returns
+    -------
+    memory_type : int
+        One of MEMORY_UNREGISTERED, MEMORY_HOST, MEMORY_DEVICE, 
+        or MEMORY_MANAGED.
+
+    device : int
+        Ordinal of the device the memory belongs to, or -1 for 
+        unregistered host memory.
+    """
+    memory_type = c_int()
+    device = c_int()
+    _cu_pointer_attributes(ptr, byref(memory_type), byref(device))
+    return memory_type.value, device.value
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "cu_reduce",
+    "cu_reduce_workspace",
+    "REDUCE_ARGMAX",
+    "REDUCE_ARGMIN",
+    "REDUCE_MAX",
+    "REDUCE_MIN",
+    "REDUCE_SUM",
+    "REDUCE_SUMSQ",
+]
+
+from ctypes import c_double, c_int, c_size_t, c_void_p
+
+# Local imports
+from kernel_lib import kernel_lib
+
+
+# Reduction identifiers
+REDUCE_SUM    = 0
+REDUCE_MIN    = 1
+REDUCE_MAX    = 2
+REDUCE_ARGMIN = 3
+REDUCE_ARGMAX = 4
+REDUCE_SUMSQ  = 5
+
+_cu_reduce_workspace = kernel_lib.cu_reduce_workspace
+_cu_reduce_workspace.argtypes = [c_size_t, c_size_t, c_size_t, c_int]
+_cu_reduce_workspace.restype = c_size_t
+
+_cu_reduce = kernel_lib.cu_reduce
+_cu_reduce.argtypes = [c_void_p,
+                       c_void_p,
+                       c_void_p,
+                       c_size_t,
+                       c_size_t,
+                       c_size_t,
+                       c_int,
+                       c_double,
+                       c_int,
+                       c_void_p]
+_cu_reduce.restype = None
+
+
+def cu_reduce_workspace(outer, n, inner, dtype):
+    """
+    Size of the device workspace needed by cu_reduce.
+
+    Parameters
+    ----------
+    outer : int
+        Number of leading elements, outside the reduced axis.
+
+    n : int
+        Length of the reduced axis.
+
+    inner : int
+        Number of trailing elements, inside the reduced axis.
+
+    dtype : int
+        dtype identifier.
+
+    Returns
+    -------
+    nbytes : int
+        Workspace size in bytes. May be zero.
+    """
+    return _cu_reduce_workspace(outer, n, inner, dtype)
+
+
+def cu_reduce(d_arr, d_out, d_work, outer, n, inner, op, scale, dtype, stream=None):
+    """
+    Reduce a device array, viewed with shape (outer, n, inner), 
+    over its middle axis. Complex values are compared by magnitude 
+    for the min, max, and arg reductions.
+
+    Parameters
+    ----------
+    d_arr : c_void_p
+        Pointer to device memory to reduce.
+
+    d_out : c_void_p
+        Pointer to outer*inner output elements. These are of the 
+        array type for sum/min/max, int64 for the arg reductions, 
+        and the real type for REDUCE_SUMSQ.
+
+    d_work : c_void_p
+        Device workspace of cu_reduce_workspace bytes.
+
+    outer : int
+        Number of leading elements, outside the reduced axis.
+
+    n : int
+        Length of the reduced axis.
+
+    inner : int
+        Number of trailing elements, inside the reduced axis.
+
+    op : int
+        Reduction identifier. REDUCE_SUMSQ returns the square root 
+        of the sum of squared magnitudes, i.e. the 2-norm.
+
+    scale : float
+        Factor applied to the result of REDUCE_SUM.
+
+    dtype : int
+        dtype identifier.
+
+    stream : c_void_p, optional
+        CUDA stream to launch the kernels on.
+    """
+    _cu_reduce(d_arr, d_out, d_work, outer, n, inner, op, scale, dtype, stream)
@@ -0,0 +1,41 @@
+#include "helpers.h"
+
+
+template <typename S, typename D, typename W>
+__global__ void astype_kernel(const S* __restrict__ d_src,
+                              D* __restrict__ d_dst,
+                              const size_t n)
+{
+    for (size_t i = blockIdx.x*blockDim.x + threadIdx.x; i < n; i += (size_t)blockDim.x*gridDim.x) {
+        d_dst[i] = narrow<D>::from(widen<W>(d_src[i]));
+    }
+}
+
+
+template <typename S, typename D>
+void astype(const void *d_src, void *d_dst, size_t n, bool wide, cudaStream_t stream)
+{
+    if (wide) {
+        astype_kernel<S, D, double2><<<grid_size(n), BLOCKSIZE, 0, stream>>>(static_cast<const S*>(d_src),
+                                                                             static_cast<D*>(d_dst), n);
+    }
+    else {
+        astype_kernel<S, D, float2><<<grid_size(n), BLOCKSIZE, 0, stream>>>(static_cast<const S*>(d_src),
+                                                                            static_cast<D*>(d_dst), n);
+    }
+    gpuErrchk(cudaPeekAtLastError());
+}
+
+
+extern "C" {
+
+DLL_EXPORT void cu_astype(const void *d_src, int src_dtype,
+                          void *d_dst, int dst_dtype,
+                          size_t n, cudaStream_t stream=NULL)
+{
+    bool wide = is_wide(src_dtype) || is_wide(dst_dtype);
+    DTYPE_SWITCH(src_dtype, S,
+        DTYPE_SWITCH(dst_dtype, D, astype<S, D>(d_src, d_dst, n, wide, stream)));
+}
+
+}
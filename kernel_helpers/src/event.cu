@@ -0,0 +1,63 @@
+#include "helpers.h"
+
+
+extern "C" {
+
+DLL_EXPORT cudaEvent_t cu_event_create(unsigned int flags)
+{
+    cudaEvent_t event;
+    gpuErrchk(cudaEventCreateWithFlags(&event, flags));
+    return event;
+}
+
+
+DLL_EXPORT void cu_event_destroy(cudaEvent_t event)
+{
+    gpuErrchk(cudaEventDestroy(event));
+}
+
+
+DLL_EXPORT void cu_event_record(cudaEvent_t event, cudaStream_t stream=NULL)
+{
+    gpuErrchk(cudaEventRecord(event, stream));
+}
+
+
+DLL_EXPORT int cu_event_query(cudaEvent_t event)
+{
+    cudaError_t code = cudaEventQuery(event);
+    if (code == cudaErrorNotReady) {
+        cudaGetLastError();
+        return 0;
+    }
+    gpuErrchk(code);
+    return 1;
+}
+
+
+DLL_EXPORT void cu_event_synchronize(cudaEvent_t event)
+{
+    gpuErrchk(cudaEventSynchronize(event));
+}
+
+
+DLL_EXPORT float cu_event_elapsed_time(cudaEvent_t start, cudaEvent_t end)
+{
+    float ms;
+    gpuErrchk(cudaEventElapsedTime(&ms, start, end));
+    return ms;
+}
+
+
+DLL_EXPORT void cu_stream_wait_event(cudaStream_t stream, cudaEvent_t event)
+{
+    gpuErrchk(cudaStreamWaitEvent(stream, event, 0));
+}
+
+
+DLL_EXPORT void cu_launch_host_func(cudaStream_t stream, cudaHostFn_t fn, void *data)
+{
+    gpuErrchk(cudaLaunchHostFunc(stream, fn, data));
+}
+
+}
@@ -0,0 +1,68 @@
+#include <cstring>
+#include "helpers.h"
+
+
+template <typename T>
+__global__ void fill_kernel(T* __restrict__ d_arr,
+                            const T val,
+                            const size_t n,
+                            const size_t incx)
+{
+    for (size_t i = blockIdx.x*blockDim.x + threadIdx.x; i < n; i += (size_t)blockDim.x*gridDim.x) {
+        d_arr[i*incx] = val;
+    }
+}
+
+
+template <typename T>
+__global__ void arange_kernel(T* __restrict__ d_arr,
+                              const double2 start,
+                              const double2 step,
+                              const size_t n)
+{
+    for (size_t i = blockIdx.x*blockDim.x + threadIdx.x; i < n; i += (size_t)blockDim.x*gridDim.x) {
+        double2 w = make_double2(start.x + (double)i*step.x,
+                                 start.y + (double)i*step.y);
+        d_arr[i] = narrow<T>::from(w);
+    }
+}
+
+
+template <typename T>
+void fill(void *d_arr, const void *val, size_t n, size_t incx, cudaStream_t stream)
+{
+    T h_val;
+    memcpy(&h_val, val, sizeof(T));
+    fill_kernel<<<grid_size(n), BLOCKSIZE, 0, stream>>>(static_cast<T*>(d_arr), h_val, n, incx);
+    gpuErrchk(cudaPeekAtLastError());
+}
+
+
+template <typename T>
+void arange(void *d_arr, const double *start, const double *step,
+            size_t n, cudaStream_t stream)
+{
+    arange_kernel<<<grid_size(n), BLOCKSIZE, 0, stream>>>(static_cast<T*>(d_arr),
+                                                          make_double2(start[0], start[1]),
+                                                          make_double2(step[0], step[1]),
+                                                          n);
+    gpuErrchk(cudaPeekAtLastError());
+}
+
+
+extern "C" {
+
+DLL_EXPORT void cu_fill(void *d_arr, const void *val, size_t n, size_t incx,
+                        int dtype, cudaStream_t stream=NULL)
+{
+    DTYPE_SWITCH(dtype, T, fill<T>(d_arr, val, n, incx, stream));
+}
+
+
+DLL_EXPORT void cu_arange(void *d_arr, const double *start, const double *step,
+                          size_t n, int dtype, cudaStream_t stream=NULL)
+{
+    DTYPE_SWITCH(dtype, T, arange<T>(d_arr, start, step, n, stream));
+}
+
+}
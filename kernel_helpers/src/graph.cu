@@ -0,0 +1,84 @@
+#include "helpers.h"
+
+
+extern "C" {
+
+DLL_EXPORT void cu_stream_begin_capture(cudaStream_t stream, int mode)
+{
+    gpuErrchk(cudaStreamBeginCapture(stream, static_cast<cudaStreamCaptureMode>(mode)));
+}
+
+
+DLL_EXPORT cudaGraph_t cu_stream_end_capture(cudaStream_t stream)
+{
+    cudaGraph_t graph;
+    gpuErrchk(cudaStreamEndCapture(stream, &graph));
+    return graph;
+}
+
+
+DLL_EXPORT int cu_stream_is_capturing(cudaStream_t stream)
+{
+    cudaStreamCaptureStatus status;
+    gpuErrchk(cudaStreamIsCapturing(stream, &status));
+    return status;
+}
+
+
+DLL_EXPORT cudaGraphExec_t cu_graph_instantiate(cudaGraph_t graph)
+{
+    cudaGraphExec_t graph_exec;
+#if CUDART_VERSION >= 12000
+    gpuErrchk(cudaGraphInstantiate(&graph_exec, graph, 0));
+#else
+    gpuErrchk(cudaGraphInstantiate(&graph_exec, graph, NULL, NULL, 0));
+#endif
+    return graph_exec;
+}
+
+
+/* Returns 0 if the executable graph took on the parameters of graph,
+   otherwise the topology differs, and graph must be instantiated. */
+DLL_EXPORT int cu_graph_exec_update(cudaGraphExec_t graph_exec, cudaGraph_t graph)
+{
+#if CUDART_VERSION >= 12000
+    cudaGraphExecUpdateResultInfo info;
+    cudaError_t code = cudaGraphExecUpdate(graph_exec, graph, &info);
+#else
+    cudaGraphNode_t error_node;
+    cudaGraphExecUpdateResult result;
+    cudaError_t code = cudaGraphExecUpdate(graph_exec, graph, &error_node, &result);
+#endif
+    if (code != cudaSuccess) {
+        cudaGetLastError();
+    }
+    return code;
+}
+
+
+DLL_EXPORT void cu_graph_launch(cudaGraphExec_t graph_exec, cudaStream_t stream=NULL)
+{
+    gpuErrchk(cudaGraphLaunch(graph_exec, stream));
+}
+
+
+DLL_EXPORT size_t cu_graph_num_nodes(cudaGraph_t graph)
+{
+    size_t n;
+    gpuErrchk(cudaGraphGetNodes(graph, NULL, &n));
+    return n;
+}
+
+
+DLL_EXPORT void cu_graph_destroy(cudaGraph_t graph)
+{
+    gpuErrchk(cudaGraphDestroy(graph));
+}
+
+
+DLL_EXPORT void cu_graph_exec_destroy(cudaGraphExec_t graph_exec)
+{
+    gpuErrchk(cudaGraphExecDestroy(graph_exec));
+}
+
+}
@@ -0,0 +1,131 @@
+#ifndef HELPERS_H
+#define HELPERS_H
+
+#include <cstdio>
+#include <cstdlib>
+#include <stdint.h>
+#include <cuda_runtime.h>
+#include <cuda_fp16.h>
+#include <cuComplex.h>
+
+#if defined(_WIN32)
+    #define DLL_EXPORT __declspec(dllexport)
+#else
+    #define DLL_EXPORT
+#endif
+
+#define gpuErrchk(ans) { gpuAssert((ans), __FILE__, __LINE__); }
+inline void gpuAssert(cudaError_t code, const char *file, int line, bool abort=true)
+{
+    if (code != cudaSuccess) {
+        fprintf(stderr, "GPUassert: %s %s %d\n", cudaGetErrorString(code), file, line);
+        if (abort) exit(code);
+    }
+}
+
+/* Data type identifiers, matching dtype_map in dev_ptr.py */
+enum dtype_id {
+    F4  = 0,
+    F8  = 1,
+    C8  = 2,
+    C16 = 3,
+    F2  = 4,
+    I1  = 5,
+    I2  = 6,
+    I4  = 7,
+    U1  = 8,
+    U2  = 9,
+};
+
+/* Run the statements with T typedef'd to the C type of a dtype identifier */
+#define DTYPE_SWITCH(dtype, T, ...)                                    \
+    switch (dtype) {                                                   \
+        case F4:  { typedef float T;           __VA_ARGS__; } break;   \
+        case F8:  { typedef double T;          __VA_ARGS__; } break;   \
+        case C8:  { typedef cuFloatComplex T;  __VA_ARGS__; } break;   \
+        case C16: { typedef cuDoubleComplex T; __VA_ARGS__; } break;   \
+        case F2:  { typedef __half T;          __VA_ARGS__; } break;   \
+        case I1:  { typedef int8_t T;          __VA_ARGS__; } break;   \
+        case I2:  { typedef int16_t T;         __VA_ARGS__; } break;   \
+        case I4:  { typedef int32_t T;         __VA_ARGS__; } break;   \
+        case U1:  { typedef uint8_t T;         __VA_ARGS__; } break;   \
+        case U2:  { typedef uint16_t T;        __VA_ARGS__; } break;   \
+    }
+
+/* Types that need a double precision intermediate when converting */
+inline bool is_wide(int dtype)
+{
+    return dtype == F8 || dtype == C16 || dtype == I4;
+}
+
+/* Widen any element type to a (real, imag) pair W, float2 or double2 */
+template <typename W, typename S>
+__device__ inline W widen(const S x)
+{
+    W w;
+    w.x = x;
+    w.y = 0;
+    return w;
+}
+
+template <typename W>
+__device__ inline W widen(const __half x)
+{
+    W w;
+    w.x = __half2float(x);
+    w.y = 0;
+    return w;
+}
+
+template <typename W>
+__device__ inline W widen(const float2 x)
+{
+    W w;
+    w.x = x.x;
+    w.y = x.y;
+    return w;
+}
+
+template <typename W>
+__device__ inline W widen(const double2 x)
+{
+    W w;
+    w.x = x.x;
+    w.y = x.y;
+    return w;
+}
+
+/* Narrow a (real, imag) pair to an element type, dropping the imaginary part for real types */
+template <typename D>
+struct narrow {
+    template <typename W>
+    __device__ static inline D from(const W w) { return (D)w.x; }
+};
+
+template <>
+struct narrow<__half> {
+    template <typename W>
+    __device__ static inline __half from(const W w) { return __float2half((float)w.x); }
+};
+
+template <>
+struct narrow<float2> {
+    template <typename W>
+    __device__ static inline float2 from(const W w) { return make_float2((float)w.x, (float)w.y); }
+};
+
+template <>
+struct narrow<double2> {
+    template <typename W>
+    __device__ static inline double2 from(const W w) { return make_double2((double)w.x, (double)w.y); }
+};
+
+const int BLOCKSIZE = 256;
+
+inline unsigned int grid_size(size_t n, int blocksize=BLOCKSIZE)
+{
+    size_t blocks = (n + blocksize - 1)/blocksize;
+    return (unsigned int)(blocks < 65535 ? (blocks > 0 ? blocks : 1) : 65535);
+}
+
+#endif
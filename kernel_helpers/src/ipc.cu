@@ -0,0 +1,63 @@
+#include <cstring>
+#include <cuda.h>
+#include "helpers.h"
+
+
+extern "C" {
+
+/*
+ * IPC handles refer to a whole allocation, so the handle is taken for
+ * the base of the allocation holding ptr, and the offset of ptr into
+ * it is returned alongside.
+ */
+DLL_EXPORT void cu_ipc_get_mem_handle(void *ptr, char *handle, size_t *offset)
+{
+    CUdeviceptr base;
+    size_t size;
+    if (cuMemGetAddressRange(&base, &size, (CUdeviceptr)ptr) != CUDA_SUCCESS) {
+        fprintf(stderr, "GPUassert: pointer is not device memory %s %d\n", __FILE__, __LINE__);
+        exit(EXIT_FAILURE);
+    }
+    gpuErrchk(cudaIpcGetMemHandle(reinterpret_cast<cudaIpcMemHandle_t*>(handle), (void*)base));
+    *offset = (size_t)ptr - (size_t)base;
+}
+
+
+DLL_EXPORT void* cu_ipc_open_mem_handle(const char *handle)
+{
+    cudaIpcMemHandle_t mem_handle;
+    memcpy(&mem_handle, handle, sizeof(mem_handle));
+    void *ptr;
+    gpuErrchk(cudaIpcOpenMemHandle(&ptr, mem_handle, cudaIpcMemLazyEnablePeerAccess));
+    return ptr;
+}
+
+
+/* Errors are returned rather than aborting, as mappings may be closed
+   during interpreter shutdown after the context is gone. */
+DLL_EXPORT int cu_ipc_close_mem_handle(void *ptr)
+{
+    cudaError_t code = cudaIpcCloseMemHandle(ptr);
+    if (code != cudaSuccess) {
+        cudaGetLastError();
+    }
+    return code;
+}
+
+
+DLL_EXPORT void cu_ipc_get_event_handle(cudaEvent_t event, char *handle)
+{
+    gpuErrchk(cudaIpcGetEventHandle(reinterpret_cast<cudaIpcEventHandle_t*>(handle), event));
+}
+
+
+DLL_EXPORT cudaEvent_t cu_ipc_open_event_handle(const char *handle)
+{
+    cudaIpcEventHandle_t event_handle;
+    memcpy(&event_handle, handle, sizeof(event_handle));
+    cudaEvent_t event;
+    gpuErrchk(cudaIpcOpenEventHandle(&event, event_handle));
+    return event;
+}
+
+}
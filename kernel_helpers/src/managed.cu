@@ -0,0 +1,18 @@
+#include "helpers.h"
+
+
+extern "C" {
+
+DLL_EXPORT void cu_mem_prefetch_async(const void *ptr, size_t nbytes, int device,
+                                      cudaStream_t stream=NULL)
+{
+    gpuErrchk(cudaMemPrefetchAsync(ptr, nbytes, device, stream));
+}
+
+
+DLL_EXPORT void cu_mem_advise(const void *ptr, size_t nbytes, int advice, int device)
+{
+    gpuErrchk(cudaMemAdvise(ptr, nbytes, static_cast<cudaMemoryAdvise>(advice), device));
+}
+
+}
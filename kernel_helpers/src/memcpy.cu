@@ -0,0 +1,70 @@
+#include "helpers.h"
+
+
+/*
+ * Copy depth slices of height rows of width bytes between two pitched
+ * layouts. When both slice pitches are whole multiples of the row pitch
+ * a single 3D copy is issued, otherwise one 2D copy per slice.
+ */
+void memcpy_strided(void *dst, size_t dpitch, size_t dslice,
+                    const void *src, size_t spitch, size_t sslice,
+                    size_t width, size_t height, size_t depth,
+                    cudaMemcpyKind kind, cudaStream_t stream, bool async)
+{
+    if (height == 1) {
+        dpitch = width;
+        spitch = width;
+    }
+
+    if (depth > 1 && dslice % dpitch == 0 && sslice % spitch == 0) {
+        cudaMemcpy3DParms params = {0};
+        params.srcPtr = make_cudaPitchedPtr(const_cast<void*>(src), spitch, width, sslice/spitch);
+        params.dstPtr = make_cudaPitchedPtr(dst, dpitch, width, dslice/dpitch);
+        params.extent = make_cudaExtent(width, height, depth);
+        params.kind = kind;
+        if (async) {
+            gpuErrchk(cudaMemcpy3DAsync(&params, stream));
+        }
+        else {
+            gpuErrchk(cudaMemcpy3D(&params));
+        }
+        return;
+    }
+
+    for (size_t z = 0; z < depth; ++z) {
+        void *d = static_cast<char*>(dst) + z*dslice;
+        const void *s = static_cast<const char*>(src) + z*sslice;
+        if (async) {
+            gpuErrchk(cudaMemcpy2DAsync(d, dpitch, s, spitch, width, height, kind, stream));
+        }
+        else {
+            gpuErrchk(cudaMemcpy2D(d, dpitch, s, spitch, width, height, kind));
+        }
+    }
+}
+
+
+extern "C" {
+
+DLL_EXPORT void cu_memcpy_strided(void *dst, size_t dpitch, size_t dslice,
+                                  const void *src, size_t spitch, size_t sslice,
+                                  size_t width, size_t height, size_t depth,
+                                  int kind)
+{
+    memcpy_strided(dst, dpitch, dslice, src, spitch, sslice,
+                   width, height, depth,
+                   static_cast<cudaMemcpyKind>(kind), NULL, false);
+}
+
+
+DLL_EXPORT void cu_memcpy_strided_async(void *dst, size_t dpitch, size_t dslice,
+                                        const void *src, size_t spitch, size_t sslice,
+                                        size_t width, size_t height, size_t depth,
+                                        int kind, cudaStream_t stream=NULL)
+{
+    memcpy_strided(dst, dpitch, dslice, src, spitch, sslice,
+                   width, height, depth,
+                   static_cast<cudaMemcpyKind>(kind), stream, true);
+}
+
+}
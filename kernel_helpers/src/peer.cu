@@ -0,0 +1,72 @@
+#include "helpers.h"
+
+
+extern "C" {
+
+DLL_EXPORT int cu_device_can_access_peer(int device, int peer)
+{
+    int can_access;
+    gpuErrchk(cudaDeviceCanAccessPeer(&can_access, device, peer));
+    return can_access;
+}
+
+
+/* Returns 1 if the current context can access the peer's memory */
+DLL_EXPORT int cu_device_enable_peer_access(int peer)
+{
+    cudaError_t code = cudaDeviceEnablePeerAccess(peer, 0);
+    if (code == cudaErrorPeerAccessAlreadyEnabled) {
+        cudaGetLastError();
+        return 1;
+    }
+    if (code == cudaErrorPeerAccessUnsupported || code == cudaErrorInvalidDevice) {
+        cudaGetLastError();
+        return 0;
+    }
+    gpuErrchk(code);
+    return 1;
+}
+
+
+DLL_EXPORT void cu_device_disable_peer_access(int peer)
+{
+    cudaError_t code = cudaDeviceDisablePeerAccess(peer);
+    if (code == cudaErrorPeerAccessNotEnabled) {
+        cudaGetLastError();
+        return;
+    }
+    gpuErrchk(code);
+}
+
+
+DLL_EXPORT void cu_memcpy_peer_async(void *dst, int dst_device,
+                                     const void *src, int src_device,
+                                     size_t nbytes, cudaStream_t stream=NULL)
+{
+    gpuErrchk(cudaMemcpyPeerAsync(dst, dst_device, src, src_device, nbytes, stream));
+}
+
+
+/* Copy between any two addresses, the direction inferred from unified addressing */
+DLL_EXPORT void cu_memcpy_default_async(void *dst, const void *src, size_t nbytes,
+                                        cudaStream_t stream=NULL)
+{
+    gpuErrchk(cudaMemcpyAsync(dst, src, nbytes, cudaMemcpyDefault, stream));
+}
+
+
+/* Pinned host memory usable from every context */
+DLL_EXPORT void *cu_host_alloc_portable(size_t nbytes)
+{
+    void *ptr;
+    gpuErrchk(cudaHostAlloc(&ptr, nbytes, cudaHostAllocPortable));
+    return ptr;
+}
+
+
+DLL_EXPORT void cu_host_free(void *ptr)
+{
+    gpuErrchk(cudaFreeHost(ptr));
+}
+
+}
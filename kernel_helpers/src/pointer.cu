@@ -0,0 +1,21 @@
+#include "helpers.h"
+
+
+extern "C" {
+
+DLL_EXPORT void cu_pointer_attributes(const void *ptr, int *type, int *device)
+{
+    cudaPointerAttributes attr;
+    cudaError_t code = cudaPointerGetAttributes(&attr, ptr);
+    if (code != cudaSuccess) {
+        /* Pre CUDA 11 runtimes report plain host memory as an error */
+        cudaGetLastError();
+        *type = cudaMemoryTypeUnregistered;
+        *device = -1;
+        return;
+    }
+    *type = attr.type;
+    *device = attr.device;
+}
+
+}
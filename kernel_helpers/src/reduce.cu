@@ -0,0 +1,272 @@
+#include "helpers.h"
+
+
+/* Reduction identifiers, matching REDUCE_* in reduce_ops.py */
+enum reduce_op {
+    R_SUM    = 0,
+    R_MIN    = 1,
+    R_MAX    = 2,
+    R_ARGMIN = 3,
+    R_ARGMAX = 4,
+    R_SUMSQ  = 5,
+};
+
+
+template <typename T> struct real_of                  { typedef T type; };
+template <>           struct real_of<cuFloatComplex>  { typedef float type; };
+template <>           struct real_of<cuDoubleComplex> { typedef double type; };
+
+/* Comparison key: the value for real types, |z|^2 for complex types */
+__device__ inline float  rkey(float x)           { return x; }
+__device__ inline double rkey(double x)          { return x; }
+__device__ inline float  rkey(cuFloatComplex x)  { return x.x*x.x + x.y*x.y; }
+__device__ inline double rkey(cuDoubleComplex x) { return x.x*x.x + x.y*x.y; }
+
+__device__ inline float  rsq(float x)           { return x*x; }
+__device__ inline double rsq(double x)          { return x*x; }
+__device__ inline float  rsq(cuFloatComplex x)  { return rkey(x); }
+__device__ inline double rsq(cuDoubleComplex x) { return rkey(x); }
+
+__device__ inline float           radd(float a, float b)                     { return a + b; }
+__device__ inline double          radd(double a, double b)                   { return a + b; }
+__device__ inline cuFloatComplex  radd(cuFloatComplex a, cuFloatComplex b)   { return cuCaddf(a, b); }
+__device__ inline cuDoubleComplex radd(cuDoubleComplex a, cuDoubleComplex b) { return cuCadd(a, b); }
+
+__device__ inline float           rscale(float x, double s)           { return x*(float)s; }
+__device__ inline double          rscale(double x, double s)          { return x*s; }
+__device__ inline cuFloatComplex  rscale(cuFloatComplex x, double s)  { return make_cuFloatComplex(x.x*(float)s, x.y*(float)s); }
+__device__ inline cuDoubleComplex rscale(cuDoubleComplex x, double s) { return make_cuDoubleComplex(x.x*s, x.y*s); }
+
+template <typename T> __device__ inline T rzero()                 { return (T)0; }
+template <>           __device__ inline cuFloatComplex rzero()    { return make_cuFloatComplex(0.f, 0.f); }
+template <>           __device__ inline cuDoubleComplex rzero()   { return make_cuDoubleComplex(0., 0.); }
+
+
+/* Running reduction state. idx < 0 marks an empty accumulator. */
+template <typename T>
+struct acc_t {
+    T val;
+    typename real_of<T>::type key;
+    long long idx;
+};
+
+
+template <typename T>
+__device__ inline acc_t<T> acc_init()
+{
+    acc_t<T> a;
+    a.val = rzero<T>();
+    a.key = 0;
+    a.idx = -1;
+    return a;
+}
+
+
+template <typename T>
+__device__ inline acc_t<T> acc_load(const T x, const long long i, const int op)
+{
+    acc_t<T> a;
+    a.val = x;
+    a.key = (op == R_SUMSQ) ? rsq(x) : rkey(x);
+    a.idx = i;
+    return a;
+}
+
+
+template <typename T>
+__device__ inline acc_t<T> acc_combine(const acc_t<T> a, const acc_t<T> b, const int op)
+{
+    if (a.idx < 0) return b;
+    if (b.idx < 0) return a;
+
+    acc_t<T> r = a;
+    switch (op) {
+        case R_SUM:
+            r.val = radd(a.val, b.val);
+            break;
+        case R_SUMSQ:
+            r.key = a.key + b.key;
+            break;
+        case R_MIN:
+        case R_ARGMIN:
+            if (b.key < a.key || (b.key == a.key && b.idx < a.idx)) r = b;
+            break;
+        case R_MAX:
+        case R_ARGMAX:
+            if (b.key > a.key || (b.key == a.key && b.idx < a.idx)) r = b;
+            break;
+    }
+    return r;
+}
+
+
+template <typename T>
+__device__ inline void acc_write(const acc_t<T> a, void *d_out, const size_t o,
+                                 const int op, const double scale)
+{
+    switch (op) {
+        case R_ARGMIN:
+        case R_ARGMAX:
+            static_cast<long long*>(d_out)[o] = a.idx;
+            break;
+        case R_SUMSQ:
+            static_cast<typename real_of<T>::type*>(d_out)[o] = sqrt(a.key);
+            break;
+        case R_SUM:
+            static_cast<T*>(d_out)[o] = rscale(a.val, scale);
+            break;
+        default:
+            static_cast<T*>(d_out)[o] = a.val;
+    }
+}
+
+
+template <typename T>
+__device__ acc_t<T> block_reduce(acc_t<T> a, const int op)
+{
+    __shared__ acc_t<T> sdata[BLOCKSIZE];
+    sdata[threadIdx.x] = a;
+    __syncthreads();
+    for (unsigned int s = blockDim.x/2; s > 0; s >>= 1) {
+        if (threadIdx.x < s) {
+            sdata[threadIdx.x] = acc_combine(sdata[threadIdx.x], sdata[threadIdx.x+s], op);
+        }
+        __syncthreads();
+    }
+    acc_t<T> r = sdata[0];
+    __syncthreads();
+    return r;
+}
+
+
+/* First pass over contiguous segments: one partial result per block */
+template <typename T>
+__global__ void reduce_partial(const T* __restrict__ d_arr,
+                               acc_t<T>* __restrict__ d_part,
+                               const size_t n,
+                               const size_t n_out,
+                               const int op)
+{
+    for (size_t o = blockIdx.y; o < n_out; o += gridDim.y) {
+        const T *seg = d_arr + o*n;
+        acc_t<T> a = acc_init<T>();
+        for (size_t k = blockIdx.x*blockDim.x + threadIdx.x; k < n; k += (size_t)gridDim.x*blockDim.x) {
+            a = acc_combine(a, acc_load(seg[k], (long long)k, op), op);
+        }
+        a = block_reduce(a, op);
+        if (threadIdx.x == 0) {
+            d_part[o*gridDim.x + blockIdx.x] = a;
+        }
+    }
+}
+
+
+/* Second pass: combine the partial results of each segment */
+template <typename T>
+__global__ void reduce_final(const acc_t<T>* __restrict__ d_part,
+                             void *d_out,
+                             const size_t n_part,
+                             const size_t n_out,
+                             const int op,
+                             const double scale)
+{
+    for (size_t o = blockIdx.x; o < n_out; o += gridDim.x) {
+        acc_t<T> a = acc_init<T>();
+        for (size_t k = threadIdx.x; k < n_part; k += blockDim.x) {
+            a = acc_combine(a, d_part[o*n_part + k], op);
+        }
+        a = block_reduce(a, op);
+        if (threadIdx.x == 0) {
+            acc_write(a, d_out, o, op, scale);
+        }
+    }
+}
+
+
+/* Strided segments (inner > 1): one thread per output, coalesced over inner */
+template <typename T>
+__global__ void reduce_columns(const T* __restrict__ d_arr,
+                               void *d_out,
+                               const size_t outer,
+                               const size_t n,
+                               const size_t inner,
+                               const int op,
+                               const double scale)
+{
+    const size_t n_out = outer*inner;
+    for (size_t o = blockIdx.x*blockDim.x + threadIdx.x; o < n_out; o += (size_t)gridDim.x*blockDim.x) {
+        const T *col = d_arr + (o/inner)*n*inner + o%inner;
+        acc_t<T> a = acc_init<T>();
+        for (size_t k = 0; k < n; ++k) {
+            a = acc_combine(a, acc_load(col[k*inner], (long long)k, op), op);
+        }
+        acc_write(a, d_out, o, op, scale);
+    }
+}
+
+
+inline unsigned int partial_blocks(size_t n)
+{
+    size_t blocks = (n + 4*BLOCKSIZE - 1)/(4*BLOCKSIZE);
+    return (unsigned int)(blocks < BLOCKSIZE ? (blocks > 0 ? blocks : 1) : BLOCKSIZE);
+}
+
+
+template <typename T>
+size_t workspace(size_t outer, size_t n, size_t inner)
+{
+    return inner > 1 ? 0 : outer*partial_blocks(n)*sizeof(acc_t<T>);
+}
+
+
+template <typename T>
+void reduce(const void *d_arr, void *d_out, void *d_work,
+            size_t outer, size_t n, size_t inner,
+            int op, double scale, cudaStream_t stream)
+{
+    if (inner > 1) {
+        reduce_columns<T><<<grid_size(outer*inner), BLOCKSIZE, 0, stream>>>(static_cast<const T*>(d_arr),
+                                                                            d_out, outer, n, inner,
+                                                                            op, scale);
+    }
+    else {
+        unsigned int n_part = partial_blocks(n);
+        unsigned int n_seg = (unsigned int)(outer < 65535 ? outer : 65535);
+        reduce_partial<T><<<dim3(n_part, n_seg), BLOCKSIZE, 0, stream>>>(static_cast<const T*>(d_arr),
+                                                                        static_cast<acc_t<T>*>(d_work),
+                                                                        n, outer, op);
+        reduce_final<T><<<n_seg, BLOCKSIZE, 0, stream>>>(static_cast<acc_t<T>*>(d_work),
+                                                         d_out, n_part, outer, op, scale);
+    }
+    gpuErrchk(cudaPeekAtLastError());
+}
+
+
+extern "C" {
+
+DLL_EXPORT size_t cu_reduce_workspace(size_t outer, size_t n, size_t inner, int dtype)
+{
+    switch (dtype) {
+        case F4:  return workspace<float>(outer, n, inner);
+        case F8:  return workspace<double>(outer, n, inner);
+        case C8:  return workspace<cuFloatComplex>(outer, n, inner);
+        case C16: return workspace<cuDoubleComplex>(outer, n, inner);
+    }
+    return 0;
+}
+
+
+DLL_EXPORT void cu_reduce(const void *d_arr, void *d_out, void *d_work,
+                          size_t outer, size_t n, size_t inner,
+                          int op, double scale, int dtype,
+                          cudaStream_t stream=NULL)
+{
+    switch (dtype) {
+        case F4:  reduce<float>(d_arr, d_out, d_work, outer, n, inner, op, scale, stream); break;
+        case F8:  reduce<double>(d_arr, d_out, d_work, outer, n, inner, op, scale, stream); break;
+        case C8:  reduce<cuFloatComplex>(d_arr, d_out, d_work, outer, n, inner, op, scale, stream); break;
+        case C16: reduce<cuDoubleComplex>(d_arr, d_out, d_work, outer, n, inner, op, scale, stream); break;
+    }
+}
+
+}
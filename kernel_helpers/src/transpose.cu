@@ -0,0 +1,117 @@
+#include <stdint.h>
+#include "helpers.h"
+
+
+const int TILE_DIM = 32;
+const int BLOCK_ROWS = 8;
+
+
+/*
+ * Swap axes a and b of an array viewed as (outer, A, mid, B), writing
+ * (outer, B, mid, A). Each block transposes a TILE_DIM x TILE_DIM tile
+ * through shared memory, padded to avoid bank conflicts, so both the
+ * reads and the writes are coalesced.
+ */
+template <typename T>
+__global__ void transpose_tiled(const T* __restrict__ d_in,
+                                T* __restrict__ d_out,
+                                const size_t A,
+                                const size_t mid,
+                                const size_t B,
+                                const size_t n_batch)
+{
+    __shared__ T tile[TILE_DIM][TILE_DIM+1];
+
+    for (size_t z = blockIdx.z; z < n_batch; z += gridDim.z) {
+        const size_t o = z/mid;
+        const size_t m = z%mid;
+        const size_t a0 = blockIdx.y*TILE_DIM;
+        const size_t b0 = blockIdx.x*TILE_DIM;
+
+        size_t b = b0 + threadIdx.x;
+        for (int j = threadIdx.y; j < TILE_DIM; j += BLOCK_ROWS) {
+            size_t a = a0 + j;
+            if (a < A && b < B) {
+                tile[j][threadIdx.x] = d_in[((o*A + a)*mid + m)*B + b];
+            }
+        }
+        __syncthreads();
+
+        size_t a = a0 + threadIdx.x;
+        for (int j = threadIdx.y; j < TILE_DIM; j += BLOCK_ROWS) {
+            b = b0 + j;
+            if (a < A && b < B) {
+                d_out[((o*B + b)*mid + m)*A + a] = tile[threadIdx.x][j];
+            }
+        }
+        __syncthreads();
+    }
+}
+
+
+/*
+ * Swap axes a and b of an array viewed as (outer, A, mid, B, inner),
+ * writing (outer, B, mid, A, inner). Used when inner > 1, where runs of
+ * inner elements are already contiguous on both sides.
+ */
+template <typename T>
+__global__ void permute_copy(const T* __restrict__ d_in,
+                             T* __restrict__ d_out,
+                             const size_t outer,
+                             const size_t A,
+                             const size_t mid,
+                             const size_t B,
+                             const size_t inner)
+{
+    const size_t n = outer*A*mid*B*inner;
+    for (size_t i = blockIdx.x*blockDim.x + threadIdx.x; i < n; i += (size_t)gridDim.x*blockDim.x) {
+        size_t r = i;
+        const size_t k = r%inner; r /= inner;
+        const size_t a = r%A;     r /= A;
+        const size_t m = r%mid;   r /= mid;
+        const size_t b = r%B;     r /= B;
+        d_out[i] = d_in[(((r*A + a)*mid + m)*B + b)*inner + k];
+    }
+}
+
+
+template <typename T>
+void transpose(const void *d_in, void *d_out,
+               size_t outer, size_t A, size_t mid, size_t B, size_t inner,
+               cudaStream_t stream)
+{
+    if (inner == 1) {
+        size_t n_batch = outer*mid;
+        dim3 grid((unsigned int)((B + TILE_DIM - 1)/TILE_DIM),
+                  (unsigned int)((A + TILE_DIM - 1)/TILE_DIM),
+                  (unsigned int)(n_batch < 65535 ? n_batch : 65535));
+        dim3 block(TILE_DIM, BLOCK_ROWS, 1);
+        transpose_tiled<T><<<grid, block, 0, stream>>>(static_cast<const T*>(d_in),
+                                                       static_cast<T*>(d_out),
+                                                       A, mid, B, n_batch);
+    }
+    else {
+        permute_copy<T><<<grid_size(outer*A*mid*B*inner), BLOCKSIZE, 0, stream>>>(static_cast<const T*>(d_in),
+                                                                                 static_cast<T*>(d_out),
+                                                                                 outer, A, mid, B, inner);
+    }
+    gpuErrchk(cudaPeekAtLastError());
+}
+
+
+extern "C" {
+
+DLL_EXPORT void cu_transpose_batched(const void *d_in, void *d_out,
+                                     size_t outer, size_t A, size_t mid, size_t B, size_t inner,
+                                     int itemsize, cudaStream_t stream=NULL)
+{
+    switch (itemsize) {
+        case 1:  transpose<uint8_t>(d_in, d_out, outer, A, mid, B, inner, stream); break;
+        case 2:  transpose<uint16_t>(d_in, d_out, outer, A, mid, B, inner, stream); break;
+        case 4:  transpose<uint32_t>(d_in, d_out, outer, A, mid, B, inner, stream); break;
+        case 8:  transpose<uint64_t>(d_in, d_out, outer, A, mid, B, inner, stream); break;
+        case 16: transpose<double2>(d_in, d_out, outer, A, mid, B, inner, stream); break;
+    }
+}
+
+}
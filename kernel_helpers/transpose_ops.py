@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "cu_transpose_batched",
+]
+
+from ctypes import c_int, c_size_t, c_void_p
+
+# Local imports
+from kernel_lib import kernel_lib
+
+
+_cu_transpose_batched = kernel_lib.cu_transpose_batched
+_cu_transpose_batched.argtypes = [c_void_p,
+                                  c_void_p,
+                                  c_size_t,
+                                  c_size_t,
+                                  c_size_t,
+                                  c_size_t,
+                                  c_size_t,
+                                  c_int,
+                                  c_void_p]
+_cu_transpose_batched.restype = None
+
+
+def cu_transpose_batched(d_in, d_out, outer, A, mid, B, inner, itemsize, stream=None):
+    """
+    Out-of-place swap of two axes. The input is viewed as 
+    (outer, A, mid, B, inner) and written as (outer, B, mid, A, inner).
+    A batched matrix transpose (batch, m, n) -> (batch, n, m) is 
+    outer=batch, A=m, mid=1, B=n, inner=1.
+
+    Parameters
+    ----------
+    d_in : c_void_p
+        Pointer to the source device memory.
+
+    d_out : c_void_p
+        Pointer to the destination device memory. Must not 
+        overlap d_in.
+
+    outer, A, mid, B, inner : int
+        Dimensions of the input view.
+
+    itemsize : int
+        Size of a single element in bytes (1, 2, 4, 8, or 16).
+
+    stream : c_void_p, optional
+        CUDA stream to launch the kernel on.
+    """
+    _cu_transpose_batched(d_in, d_out, outer, A, mid, B, inner, itemsize, stream)
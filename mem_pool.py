@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Memory_Pool",
+]
+
+from ctypes import cast, c_void_p
+import threading
+
+# Local imports
+from cuda_helpers import (cu_free,
+                          cu_malloc)
+
+
+# Smallest block handed out by the pool, and the granularity used
+# for large blocks. Blocks below _LARGE_BLOCK are rounded up to the
+# next power of two.
+_MIN_BLOCK = 512
+_LARGE_BLOCK = 1 << 20
+_LARGE_ROUND = 2 << 20
+
+
+def stream_key(stream):
+    """
+    Return a hashable key for a CUDA stream handle. The null
+    (default) stream maps to None.
+    """
+    if isinstance(stream, c_void_p):
+        return stream.value
+    if hasattr(stream, "stream"):
+        return stream_key(stream.stream)
+    return stream
+
+
+def round_size(nbytes):
+    """
+    Round a requested size in bytes up to its pool size class.
+
+    Parameters
+    ----------
+    nbytes : int
+        Requested size in bytes.
+
+    Returns
+    -------
+    size : int
+        Size of the block that will be allocated, in bytes.
+    """
+    nbytes = max(int(nbytes), _MIN_BLOCK)
+    if nbytes < _LARGE_BLOCK:
+        return 1 << (nbytes-1).bit_length()
+    return -(-nbytes//_LARGE_ROUND)*_LARGE_ROUND
+
+
+class Memory_Pool(object):
+
+    def __init__(self, max_cached_bytes=None, malloc=cu_malloc, free=cu_free):
+        """
+        Caching, stream-ordered device memory allocator. Freed blocks
+        are kept in size-class bins instead of being returned to the
+        driver, so repeated allocations of similar sizes do not call
+        cudaMalloc/cudaFree.
+
+        Parameters
+        ----------
+        max_cached_bytes : int, optional
+            High-water mark for the number of cached (free, but not
+            released) bytes. When exceeded, cached blocks are released
+            back to the driver. If None, the cache is unbounded.
+
+        malloc : func, optional
+            Function that allocates nbytes of device memory and
+            returns its address.
+
+        free : func, optional
+            Function that frees device memory given its address
+            as a c_void_p.
+
+        Attributes
+        ----------
+        live_bytes : int
+            Bytes currently handed out by the pool.
+
+        cached_bytes : int
+            Bytes held by the pool that are free for reuse.
+
+        n_mallocs : int
+            Number of calls made to malloc.
+
+        n_frees : int
+            Number of calls made to free.
+
+        n_hits : int
+            Number of allocations served from the cache.
+
+        tracker : Alloc_Tracker or None
+            Registry of live allocations, notified of every free.
+
+        Notes
+        -----
+        A block freed on a stream is only reused by allocations on
+        that same stream, where stream ordering guarantees that prior
+        work using the block has completed. Once the stream has been
+        synchronized (see release_stream, release_all and 
+        release_marked) the block
+        becomes available to every stream. The pool can be shared by
+        streams driven from different threads.
+        """
+        self.max_cached_bytes = max_cached_bytes
+        self._malloc = malloc
+        self._free = free
+        self._blocks = {}           # address -> size of live blocks
+        self._stream_bins = {}      # stream key -> {size: [address]}
+        self._ready_bins = {}       # size -> [address]
+        self._free_seq = {}         # address -> count of frees when freed
+        self._n_freed = 0
+        self.live_bytes = 0
+        self.cached_bytes = 0
+        self.n_mallocs = 0
+        self.n_frees = 0
+        self.n_hits = 0
+        self.tracker = None
+        self._lock = threading.RLock()
+
+
+    def malloc(self, nbytes, stream=None):
+        """
+        Allocate a block of device memory from the pool.
+
+        Parameters
+        ----------
+        nbytes : int
+            Size to allocate in bytes.
+
+        stream : c_void_p, optional
+            CUDA stream the memory will be used on.
+
+        Returns
+        -------
+        dev_ptr : c_void_p
+            Pointer to allocated device memory.
+        """
+        with self._lock:
+            size = round_size(nbytes)
+            addr = self._pop(self._stream_bins.get(stream_key(stream)), size)
+            if addr is None:
+                addr = self._pop(self._ready_bins, size)
+
+            if addr is None:
+                addr = self._device_malloc(size)
+                self.n_mallocs += 1
+            else:
+                self.cached_bytes -= size
+                self.n_hits += 1
+
+            self._blocks[addr] = size
+            self.live_bytes += size
+            return c_void_p(addr)
+
+
+    def free(self, dev_ptr, stream=None):
+        """
+        Return a block to the pool. The block is cached for reuse on
+        the stream it was freed on.
+
+        Parameters
+        ----------
+        dev_ptr : c_void_p or int
+            Pointer previously returned by malloc.
+
+        stream : c_void_p, optional
+            CUDA stream the memory was last used on.
+        """
+        addr = dev_ptr.value if isinstance(dev_ptr, c_void_p) else dev_ptr
+        with self._lock:
+            try:
+                size = self._blocks.pop(addr)
+            except KeyError:
+                raise ValueError("Pointer was not allocated by this pool.")
+            if self.tracker is not None:
+                self.tracker.untrack(addr)
+            self.live_bytes -= size
+            self.cached_bytes += size
+            bins = self._stream_bins.setdefault(stream_key(stream), {})
+            bins.setdefault(size, []).append(addr)
+            self._n_freed += 1
+            self._free_seq[addr] = self._n_freed
+            self._trim()
+
+
+    def release_stream(self, stream):
+        """
+        Mark the blocks freed on a stream as reusable by any stream.
+        Only call once the stream has been synchronized.
+
+        Parameters
+        ----------
+        stream : c_void_p
+            The synchronized CUDA stream.
+        """
+        with self._lock:
+            bins = self._stream_bins.pop(stream_key(stream), {})
+            for size, addrs in bins.items():
+                self._ready_bins.setdefault(size, []).extend(addrs)
+
+
+    def mark_stream(self, stream):
+        """
+        Record the blocks freed on a stream so far, to release them 
+        once work queued on the stream now has completed, while 
+        blocks freed by work queued later stay pending.
+
+        Parameters
+        ----------
+        stream : c_void_p
+            The CUDA stream.
+
+        Returns
+        -------
+        marker : list
+            Blocks to pass to release_marked, which also takes the 
+            concatenated markers of several streams.
+        """
+        key = stream_key(stream)
+        with self._lock:
+            bins = self._stream_bins.get(key, {})
+            return [(key, size, addr, self._free_seq[addr])
+                    for size, addrs in bins.items() for addr in addrs]
+
+
+    def release_marked(self, marker):
+        """
+        Mark the blocks recorded by mark_stream as 
+        reusable by any stream. Only call once the work queued on 
+        their streams before the marker was taken has completed. 
+        Blocks reused and freed again since are left pending.
+
+        Parameters
+        ----------
+        marker : list
+            Returned by mark_stream.
+        """
+        with self._lock:
+            for key, size, addr, seq in marker:
+                bins = self._stream_bins.get(key)
+                addrs = bins.get(size) if bins else None
+                if not addrs or addr not in addrs or self._free_seq.get(addr) != seq:
+                    continue
+                addrs.remove(addr)
+                if not addrs:
+                    del bins[size]
+                if not bins:
+                    del self._stream_bins[key]
+                self._ready_bins.setdefault(size, []).append(addr)
+
+
+    def release_all(self):
+        """
+        Mark every cached block as reusable by any stream. Only call
+        once the device has been synchronized.
+        """
+        with self._lock:
+            for key in list(self._stream_bins):
+                self.release_stream(key)
+
+
+    def empty_cache(self):
+        """
+        Release all cached blocks back to the driver. Blocks that are
+        still in use are not affected.
+        """
+        with self._lock:
+            self.release_all()
+            for size in list(self._ready_bins):
+                self._release(self._ready_bins, size, len(self._ready_bins[size]))
+
+
+    def _device_malloc(self, size):
+        """
+        Allocate from the driver. If it is out of memory while blocks 
+        are cached, the cache is released and the allocation retried 
+        once.
+        """
+        try:
+            addr = cast(self._malloc(size), c_void_p).value
+        except Exception:
+            if not self.cached_bytes:
+                raise
+            addr = None
+        if addr is None and self.cached_bytes:
+            self.empty_cache()
+            addr = cast(self._malloc(size), c_void_p).value
+        if addr is None:
+            raise MemoryError("Out of device memory allocating %i bytes."%size)
+        return addr
+
+
+    def _pop(self, bins, size):
+        if not bins:
+            return None
+        addrs = bins.get(size)
+        if not addrs:
+            return None
+        addr = addrs.pop()
+        if not addrs:
+            del bins[size]
+        return addr
+
+
+    def _release(self, bins, size, count):
+        for i in range(count):
+            addr = self._pop(bins, size)
+            if addr is None:
+                return
+            self._free(c_void_p(addr))
+            self._free_seq.pop(addr, None)
+            self.cached_bytes -= size
+            self.n_frees += 1
+
+
+    def _trim(self):
+        """
+        Release cached blocks, largest first, until the cache is at
+        or below the high-water mark. Ready blocks are released before
+        blocks still pending on a stream. cudaFree synchronizes the
+        device, so releasing pending blocks is safe.
+        """
+        if self.max_cached_bytes is None:
+            return
+        for bins in [self._ready_bins] + list(self._stream_bins.values()):
+            for size in sorted(bins, reverse=True):
+                while (self.cached_bytes > self.max_cached_bytes
+                       and size in bins):
+                    self._release(bins, size, 1)
+
+
+    def __repr__(self):
+        return ("Memory_Pool(live_bytes=%i, cached_bytes=%i, n_mallocs=%i, n_hits=%i)"
+                %(self.live_bytes, self.cached_bytes, self.n_mallocs, self.n_hits))
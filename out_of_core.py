@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Out_Of_Core",
+]
+
+from collections import deque
+import threading
+import numpy as np
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from cuda_helpers import cu_get_mem_info
+
+# Local imports
+from dev_ptr import Device_Ptr
+from pinned_pool import Pinned_Pool
+from strides import prod
+
+
+def _rows_of(block, d_arr):
+    """
+    View of a pinned staging block shaped like d_arr.
+    """
+    return block[:d_arr.nbytes].view(d_arr.dtype).reshape(d_arr.shape)
+
+
+class _Reader(object):
+
+    def __init__(self, src, chunk_rows, free, filled):
+        """
+        Sequential reader of src chunks into the pinned input buffers
+        of free slots, handing them on through filled. np.memmap reads
+        release the GIL, so a reader thread overlaps the file access
+        with the device work issued by the calling thread.
+        """
+        self.src = src
+        self.chunk_rows = chunk_rows
+        self.free = free
+        self.filled = filled
+        self.error = None
+        self._next = 0
+        self._stop = False
+        self._thread = None
+
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+
+    def read_one(self):
+        """
+        Read the next chunk into a free slot. Returns False once the
+        input is exhausted.
+        """
+        n_rows = self.src.shape[0]
+        if self._next >= n_rows:
+            return False
+        slot = self.free.get()
+        if slot is None or self._stop:
+            return False
+        try:
+            slot.lo = self._next
+            slot.hi = min(self._next + self.chunk_rows, n_rows)
+            rows = slot.hi - slot.lo
+            nbytes = rows*prod(self.src.shape[1:])*self.src.dtype.itemsize
+            h_in = slot.in_block[:nbytes].view(self.src.dtype).reshape((rows,) + self.src.shape[1:])
+            h_in[...] = self.src[slot.lo:slot.hi]
+        except Exception as e:
+            self.error = e
+            self.filled.put(None)
+            return False
+        self._next = slot.hi
+        self.filled.put(slot)
+        return True
+
+
+    def _loop(self):
+        while self.read_one():
+            pass
+
+
+    def stop(self, free):
+        self._stop = True
+        if self._thread is not None:
+            free.put(None)
+            self._thread.join()
+
+
+class _Slot(object):
+
+    def __init__(self, stream, in_block, out_block, d_in, d_out):
+        """
+        One pipeline stage buffer set: pinned host buffers, device
+        buffers and the stream their copies and compute run on.
+        """
+        self.stream = stream
+        self.in_block = in_block
+        self.out_block = out_block
+        self.d_in = d_in
+        self.d_out = d_out
+        self.lo = 0
+        self.hi = 0
+
+
+class Out_Of_Core(object):
+
+    def __init__(self, device, n_buffers=3, mem_fraction=0.5, read_ahead=True):
+        """
+        Chunked executor for arrays larger than device memory, such
+        as np.memmap views of raw or .npy files. The arrays are split
+        along their first axis, and every chunk goes through a file
+        read, a host to device copy, a user function and a device to
+        host copy. Consecutive chunks run on different streams, so
+        the copies of one chunk overlap the compute of another, while
+        a background thread reads the next chunks from the file.
+
+        Parameters
+        ----------
+        device : Device
+            The device to run on. Streams are added to device.streams
+            if it has fewer than n_buffers.
+
+        n_buffers : int, optional
+            Number of chunks in flight. 2 double buffers, 3 also lets
+            a file read proceed while two chunks are on the device.
+
+        mem_fraction : float, optional
+            Fraction of free device memory the chunk buffers may use,
+            when the chunk size is picked automatically.
+
+        read_ahead : bool, optional
+            Read chunks from the input on a background thread. If
+            False, they are read on the calling thread.
+
+        Attributes
+        ----------
+        chunk_rows : int or None
+            Rows per chunk used by the last run.
+
+        n_chunks : int
+            Chunks processed by the last run.
+        """
+        self.device = device
+        self.n_buffers = n_buffers
+        self.mem_fraction = mem_fraction
+        self.read_ahead = read_ahead
+        self.chunk_rows = None
+        self.n_chunks = 0
+        self._pinned = Pinned_Pool()
+
+
+    def run(self, src, fn, dst=None, chunk_rows=None):
+        """
+        Process src chunk by chunk.
+
+        Parameters
+        ----------
+        src : np.ndarray or str
+            Input array, typically an np.memmap, or the path of a
+            .npy file, which is memory mapped read only.
+
+        fn : func
+            Called as fn(d_in, d_out, stream) for every chunk, with
+            d_in and d_out Device_Ptrs holding the chunk's rows of
+            src and dst, and stream the Stream to issue work on.
+            d_out is None if there is no dst. The last chunk may have
+            fewer rows.
+
+        dst : np.ndarray, optional
+            Output array with as many rows as src, typically a
+            writable np.memmap. Each chunk of d_out is written back
+            to it.
+
+        chunk_rows : int, optional
+            Rows per chunk. If None, it is picked from the free device
+            memory.
+
+        Returns
+        -------
+        dst : np.ndarray or None
+            The output array.
+        """
+        if isinstance(src, str):
+            src = np.load(src, mmap_mode='r')
+        n_rows = src.shape[0]
+        if dst is not None and dst.shape[0] != n_rows:
+            raise ValueError("dst has %i rows, expected %i."%(dst.shape[0], n_rows))
+
+        row_in = prod(src.shape[1:])*src.dtype.itemsize
+        row_out = 0 if dst is None else prod(dst.shape[1:])*dst.dtype.itemsize
+        if chunk_rows is None:
+            chunk_rows = self.pick_chunk_rows(row_in + row_out)
+        chunk_rows = max(1, min(chunk_rows, n_rows))
+        self.chunk_rows = chunk_rows
+        self.n_chunks = 0
+        if n_rows == 0:
+            return dst
+
+        n_slots = min(self.n_buffers, -(-n_rows//chunk_rows))
+        slots = [self._slot(i, src, dst, chunk_rows) for i in range(n_slots)]
+        free = queue.Queue()
+        for slot in slots:
+            free.put(slot)
+        filled = queue.Queue()
+        reader = _Reader(src, chunk_rows, free, filled)
+
+        try:
+            if self.read_ahead:
+                reader.start()
+            in_flight = deque()
+            for i in range(0, n_rows, chunk_rows):
+                if not self.read_ahead:
+                    reader.read_one()
+                slot = filled.get()
+                if slot is None:
+                    raise reader.error
+                self._issue(slot, fn, dst is not None)
+                in_flight.append(slot)
+                self.n_chunks += 1
+                if len(in_flight) == n_slots:
+                    self._retire(in_flight.popleft(), dst, free)
+            while in_flight:
+                self._retire(in_flight.popleft(), dst, free)
+        finally:
+            reader.stop(free)
+            for slot in slots:
+                slot.stream.sync()
+                self._pinned.release(slot.in_block)
+                if slot.out_block is not None:
+                    self._pinned.release(slot.out_block)
+                slot.d_in.__exit__()
+                if slot.d_out is not None:
+                    slot.d_out.__exit__()
+        return dst
+
+
+    def pick_chunk_rows(self, row_nbytes):
+        """
+        Rows per chunk that let n_buffers chunks of input and output
+        fit in mem_fraction of the free device memory.
+
+        Parameters
+        ----------
+        row_nbytes : int
+            Device bytes needed per row, input and output together.
+        """
+        free = np.array([1], dtype=np.uintp)
+        total = np.array([1], dtype=np.uintp)
+        cu_get_mem_info(free, total)
+        budget = int(free[0]*self.mem_fraction) + self.device.pool.cached_bytes
+        return max(1, budget//(self.n_buffers*max(1, row_nbytes)))
+
+
+    def _slot(self, i, src, dst, chunk_rows):
+        while len(self.device.streams) <= i:
+            self.device.add_stream()
+        stream = self.device.streams[i]
+
+        in_shape = (chunk_rows,) + src.shape[1:]
+        in_block = self._pinned.acquire(prod(in_shape)*src.dtype.itemsize)
+        d_in = Device_Ptr(in_shape, src.dtype, stream=stream.stream,
+                          pool=self.device.pool)
+        out_block = d_out = None
+        if dst is not None:
+            out_shape = (chunk_rows,) + dst.shape[1:]
+            out_block = self._pinned.acquire(prod(out_shape)*dst.dtype.itemsize)
+            d_out = Device_Ptr(out_shape, dst.dtype, stream=stream.stream,
+                               pool=self.device.pool)
+        return _Slot(stream, in_block, out_block, d_in, d_out)
+
+
+    def _issue(self, slot, fn, has_out):
+        rows = slot.hi - slot.lo
+        d_in = slot.d_in[:rows]
+        d_in.to_device_async(_rows_of(slot.in_block, d_in), slot.stream.stream)
+        d_out = slot.d_out[:rows] if has_out else None
+        fn(d_in, d_out, slot.stream)
+        if has_out:
+            d_out.to_host_async(_rows_of(slot.out_block, d_out), slot.stream.stream)
+
+
+    def _retire(self, slot, dst, free):
+        slot.stream.sync()
+        if dst is not None:
+            rows = slot.hi - slot.lo
+            dst[slot.lo:slot.hi] = _rows_of(slot.out_block, slot.d_out[:rows])
+        free.put(slot)
+
+
+    def close(self):
+        """
+        Unpin the staging buffers kept between runs.
+        """
+        self._pinned.clear()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Peer_Link",
+    "peer_matrix",
+]
+
+from ctypes import c_void_p
+import time
+import numpy as np
+
+from cuda_helpers import cu_device_count
+
+# Local imports
+from kernel_helpers import (cu_device_can_access_peer,
+                            cu_event_create,
+                            cu_event_destroy,
+                            cu_event_record,
+                            cu_host_alloc_portable,
+                            cu_host_free,
+                            cu_memcpy_default_async,
+                            cu_memcpy_peer_async,
+                            cu_stream_wait_event,
+                            EVENT_DISABLE_TIMING)
+
+
+def peer_matrix(device_ids=None):
+    """
+    Which devices can directly access each other's memory.
+
+    Parameters
+    ----------
+    device_ids : list of ints, optional
+        CUDA device IDs. If None, every device.
+
+    Returns
+    -------
+    can_access : np.ndarray
+        Boolean matrix, can_access[i, j] is True if device_ids[i] can
+        access memory on device_ids[j]. The diagonal is True.
+    """
+    if device_ids is None:
+        device_ids = range(cu_device_count())
+    device_ids = list(device_ids)
+    n = len(device_ids)
+    can_access = np.eye(n, dtype=bool)
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                can_access[i, j] = cu_device_can_access_peer(device_ids[i], device_ids[j])
+    return can_access
+
+
+def _offset(ptr, nbytes):
+    return c_void_p((ptr.value or 0) + nbytes)
+
+
+class Peer_Link(object):
+
+    def __init__(self, src, dst, chunk_bytes=1 << 22):
+        """
+        Copies device memory from one device to another. Copies go
+        directly over the peer link (NVLink or PCIe) when the pair
+        supports peer access, and are staged through pinned host
+        memory otherwise. Peer access is enabled in both directions: 
+        dst, which queues the copy, reads src's memory, and src may 
+        write to dst's.
+
+        Parameters
+        ----------
+        src : Device
+            The device copied from.
+
+        dst : Device
+            The device copied to.
+
+        chunk_bytes : int, optional
+            Size of each of the two pinned staging buffers. While one
+            chunk is copied to the host, the previous one is copied
+            on to dst.
+
+        Attributes
+        ----------
+        p2p : bool
+            True if copies go directly between the devices, that is 
+            if peer access could be enabled both ways.
+
+        n_bytes : int
+            Bytes copied by timed copies, see copy.
+
+        seconds : float
+            Time taken by timed copies.
+
+        n_copies : int
+            Number of copies queued.
+        """
+        self.src = src
+        self.dst = dst
+        self.chunk_bytes = chunk_bytes
+        self.p2p = bool(dst.enable_peer_access(src) and src.enable_peer_access(dst))
+        self.n_bytes = 0
+        self.seconds = 0.
+        self.n_copies = 0
+        self.closed = False
+        self._buffers = []
+        self._d2h_done = []         # Recorded on src streams
+        self._h2d_done = []         # Recorded on dst streams
+        self._h2d_recorded = [False, False]
+        self._src_ready = None      # Recorded on the src stream before a peer copy
+        self._copied = None         # Recorded on the dst stream after it
+
+
+    @property
+    def bandwidth(self):
+        """
+        Measured bytes/s of timed copies, or None.
+        """
+        return self.n_bytes/self.seconds if self.seconds > 0 else None
+
+
+    def copy_async(self, d_dst, d_src, stream=None, nbytes=None):
+        """
+        Copy a Device_Ptr on src to a Device_Ptr on dst, without
+        blocking the host.
+
+        Parameters
+        ----------
+        d_dst : Device_Ptr
+            Destination, on dst.
+
+        d_src : Device_Ptr
+            Source, on src.
+
+        stream : c_void_p, optional
+            Stream of dst the copy is ordered on. Work queued on it
+            afterwards sees the copied data. If None, d_dst.stream.
+
+        nbytes : int, optional
+            Size to copy in bytes.
+
+        Notes
+        -----
+        The copy starts once the work already queued on d_src.stream 
+        has completed, and work queued on d_src.stream afterwards 
+        waits for the copy, so d_src is not overwritten while it is 
+        being read. Staged copies also queue their device to host 
+        halves on d_src.stream, so both streams must be left to run.
+        """
+        if not (d_src.contiguous and d_dst.contiguous):
+            raise ValueError("Peer copies need contiguous arrays.")
+        nbytes = min([d_src.nbytes, nbytes or d_src.nbytes])
+        if nbytes > d_dst.nbytes:
+            raise ValueError('Attempted to copy a src with size greater than dst.')
+        stream = stream or d_dst.stream
+        self.n_copies += 1
+        if self.p2p:
+            self._peer_copy(d_dst.ptr, d_src.ptr, nbytes, d_src.stream, stream)
+        else:
+            self._staged_copy(d_dst.ptr, d_src.ptr, nbytes, d_src.stream, stream)
+
+
+    def _peer_copy(self, dst, src, nbytes, src_stream, dst_stream):
+        """
+        Copy over the peer link, queued on dst_stream. Events order 
+        the copy after the work pending on src_stream, and later work 
+        on src_stream after the copy.
+        """
+        if self._src_ready is None:
+            with self.src.active():
+                self._src_ready = cu_event_create(EVENT_DISABLE_TIMING)
+            with self.dst.active():
+                self._copied = cu_event_create(EVENT_DISABLE_TIMING)
+        with self.src.active():
+            cu_event_record(self._src_ready, src_stream)
+        with self.dst.active():
+            cu_stream_wait_event(dst_stream, self._src_ready)
+            cu_memcpy_peer_async(dst, self.dst.id, src, self.src.id, nbytes, dst_stream)
+            cu_event_record(self._copied, dst_stream)
+        with self.src.active():
+            cu_stream_wait_event(src_stream, self._copied)
+
+
+    def _staged_copy(self, dst, src, nbytes, src_stream, dst_stream):
+        """
+        Copy chunk by chunk through two pinned host buffers. Events
+        order each chunk's host to device copy after its device to
+        host copy, and the reuse of a buffer after its previous chunk
+        has left it, so neither stream blocks the host.
+        """
+        self._allocate()
+        for k, lo in enumerate(range(0, nbytes, self.chunk_bytes)):
+            n = min(self.chunk_bytes, nbytes - lo)
+            b = k % 2
+            with self.src.active():
+                if self._h2d_recorded[b]:
+                    cu_stream_wait_event(src_stream, self._h2d_done[b])
+                cu_memcpy_default_async(self._buffers[b], _offset(src, lo), n, src_stream)
+                cu_event_record(self._d2h_done[b], src_stream)
+            with self.dst.active():
+                cu_stream_wait_event(dst_stream, self._d2h_done[b])
+                cu_memcpy_default_async(_offset(dst, lo), self._buffers[b], n, dst_stream)
+                cu_event_record(self._h2d_done[b], dst_stream)
+            self._h2d_recorded[b] = True
+
+
+    def _allocate(self):
+        if self._buffers:
+            return
+        with self.src.active():
+            self._buffers = [cu_host_alloc_portable(self.chunk_bytes) for i in range(2)]
+            self._d2h_done = [cu_event_create(EVENT_DISABLE_TIMING) for i in range(2)]
+        with self.dst.active():
+            self._h2d_done = [cu_event_create(EVENT_DISABLE_TIMING) for i in range(2)]
+
+
+    def copy(self, d_dst, d_src, nbytes=None):
+        """
+        Copy, and block until the copy has completed. The copy is
+        timed, and counted in bandwidth.
+        """
+        self.sync()
+        t0 = time.time()
+        self.copy_async(d_dst, d_src, None, nbytes)
+        self.sync()
+        self.seconds += time.time() - t0
+        self.n_bytes += min([d_src.nbytes, nbytes or d_src.nbytes])
+
+
+    def sync(self):
+        """
+        Block until both devices have completed their work.
+        """
+        for device in [self.src, self.dst]:
+            with device.active():
+                device.sync()
+
+
+    def measure(self, nbytes=1 << 26):
+        """
+        Time a copy of nbytes from src to dst.
+
+        Returns
+        -------
+        bandwidth : float
+            Bytes/s of the copy.
+        """
+        with self.src.active():
+            d_src = self.src.malloc((nbytes,), 'u1')
+        with self.dst.active():
+            d_dst = self.dst.malloc((nbytes,), 'u1')
+        n_bytes, seconds = self.n_bytes, self.seconds
+        try:
+            self.copy(d_dst, d_src)
+        finally:
+            with self.src.active():
+                d_src.__exit__()
+            with self.dst.active():
+                d_dst.__exit__()
+        return (self.n_bytes - n_bytes)/max(self.seconds - seconds, 1e-9)
+
+
+    def close(self):
+        """
+        Free the staging buffers and events. Called by whichever of
+        the two devices exits first.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self._src_ready is not None:
+            with self.src.active():
+                cu_event_destroy(self._src_ready)
+            with self.dst.active():
+                cu_event_destroy(self._copied)
+            self._src_ready = self._copied = None
+        if self._buffers:
+            self.sync()
+            with self.src.active():
+                for event in self._d2h_done:
+                    cu_event_destroy(event)
+                for ptr in self._buffers:
+                    cu_host_free(ptr)
+            with self.dst.active():
+                for event in self._h2d_done:
+                    cu_event_destroy(event)
+            self._buffers = []
+
+
+    def __repr__(self):
+        bandwidth = self.bandwidth
+        return ("Peer_Link(src=%i, dst=%i, p2p=%s, n_copies=%i, bandwidth=%s)"
+                %(self.src.id, self.dst.id, self.p2p, self.n_copies,
+                  "%.2f GB/s"%(bandwidth/1e9) if bandwidth else None))
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Host_Future",
+    "Pinned_Pool",
+    "clear_staging_pool",
+    "get_staging_pool",
+]
+
+from ctypes import c_void_p
+import threading
+import numpy as np
+
+# Local imports
+from cuda_helpers import (cu_mempin,
+                          cu_memunpin,
+                          cu_sync_stream)
+from cuctx import current_context
+from mem_pool import round_size
+
+
+class Pinned_Pool(object):
+
+    def __init__(self, max_cached_bytes=None):
+        """
+        Pool of reusable page-locked host buffers, used to stage
+        asynchronous device to host copies.
+
+        Parameters
+        ----------
+        max_cached_bytes : int, optional
+            High-water mark of idle pinned bytes kept by the pool.
+            If None, idle buffers are kept until clear is called.
+
+        Attributes
+        ----------
+        pinned_bytes : int
+            Total bytes currently page-locked by the pool.
+
+        cached_bytes : int
+            Bytes held by idle buffers, ready for reuse.
+
+        Notes
+        -----
+        Every buffer stays referenced by the pool until clear, so
+        memory is never released while still page-locked, even if
+        a buffer is never returned. The pool can be shared by
+        threads.
+        """
+        self.max_cached_bytes = max_cached_bytes
+        self._free = {}         # size -> [np.ndarray]
+        self._pinned = {}       # id -> np.ndarray
+        self.pinned_bytes = 0
+        self.cached_bytes = 0
+        # Reentrant, as Host_Future.__del__ may release a block from 
+        # a garbage collection triggered under the lock
+        self._lock = threading.RLock()
+
+
+    def acquire(self, nbytes):
+        """
+        Take a pinned buffer of at least nbytes from the pool.
+
+        Parameters
+        ----------
+        nbytes : int
+            Size needed in bytes.
+
+        Returns
+        -------
+        block : np.ndarray
+            1d uint8 array of page-locked host memory.
+        """
+        size = round_size(nbytes)
+        with self._lock:
+            blocks = self._free.get(size)
+            if blocks:
+                self.cached_bytes -= size
+                return blocks.pop()
+
+            block = np.empty(size, dtype='u1')
+            cu_mempin(block.ctypes.data_as(c_void_p), size)
+            self._pinned[id(block)] = block
+            self.pinned_bytes += size
+            return block
+
+
+    def release(self, block):
+        """
+        Return a buffer to the pool. The caller must ensure that no
+        copy into or out of it is still pending.
+
+        Parameters
+        ----------
+        block : np.ndarray
+            Buffer previously returned by acquire. Buffers unpinned
+            by clear meanwhile are dropped.
+        """
+        with self._lock:
+            if self._pinned.get(id(block)) is not block:
+                return
+            self._free.setdefault(block.nbytes, []).append(block)
+            self.cached_bytes += block.nbytes
+            if self.max_cached_bytes is not None:
+                for size in sorted(self._free, reverse=True):
+                    while self.cached_bytes > self.max_cached_bytes and self._free[size]:
+                        self._unpin(self._free[size].pop())
+                        self.cached_bytes -= size
+
+
+    def clear(self):
+        """
+        Unpin and drop every buffer, including any still handed out.
+        Only call once all pending copies have completed.
+        """
+        with self._lock:
+            for block in list(self._pinned.values()):
+                self._unpin(block)
+            self._free = {}
+            self.cached_bytes = 0
+
+
+    def _unpin(self, block):
+        cu_memunpin(block)
+        del self._pinned[id(block)]
+        self.pinned_bytes -= block.nbytes
+
+
+class Host_Future(object):
+
+    def __init__(self, stream, arr, block=None, pool=None):
+        """
+        Handle to a pending asynchronous device to host copy.
+
+        Parameters
+        ----------
+        stream : c_void_p
+            CUDA stream the copy was issued on.
+
+        arr : np.ndarray
+            Host array the copy writes to.
+
+        block : np.ndarray, optional
+            Pinned staging buffer backing arr, returned to pool
+            once the result has been taken.
+
+        pool : Pinned_Pool, optional
+            Pool that block belongs to.
+
+        Notes
+        -----
+        A future dropped before its result is taken waits for the 
+        copy and returns its block to the pool as it is garbage 
+        collected.
+        """
+        self.stream = stream
+        self._arr = arr
+        self._block = block
+        self._pool = pool
+        self._result = None
+
+
+    def result(self, out=None):
+        """
+        Wait for the copy on its stream and return the host array.
+
+        Parameters
+        ----------
+        out : np.ndarray, optional
+            Array to copy a staged result into. If None, a new
+            array is allocated.
+
+        Returns
+        -------
+        arr : np.ndarray
+            The copied data. Staged results are copied out of the
+            pinned buffer, which is then returned to its pool.
+        """
+        if self._result is None:
+            self.wait()
+            if self._block is None:
+                self._result = self._arr
+            else:
+                if out is None:
+                    out = np.empty(self._arr.shape, self._arr.dtype)
+                np.copyto(out, self._arr)
+                self._pool.release(self._block)
+                self._block = None
+                self._arr = None
+                self._result = out
+        return self._result
+
+
+    def wait(self):
+        """
+        Block the host thread until the copy has completed.
+        """
+        if self._result is None:
+            cu_sync_stream(self.stream)
+
+
+    def done(self):
+        """
+        True if result() has already been taken.
+        """
+        return self._result is not None
+
+
+    def as_future(self, loop=None):
+        """
+        asyncio future that resolves to result() once the copy has
+        completed, signalled by a host callback on the stream rather
+        than by blocking the event loop. Awaiting the Host_Future
+        itself does the same.
+
+        Parameters
+        ----------
+        loop : asyncio event loop, optional
+            Loop the future belongs to. If None, the current loop.
+        """
+        from aio import stream_result     # asyncio is only needed when awaiting
+        return stream_result(self.stream, self.result, loop)
+
+
+    def __await__(self):
+        return self.as_future().__await__()
+
+
+    def __del__(self):
+        if getattr(self, '_block', None) is None:
+            return
+        try:
+            cu_sync_stream(self.stream)
+            self._pool.release(self._block)
+        except Exception:
+            pass
+
+
+# context -> Pinned_Pool of staging buffers for Device_Ptr.to_host_async
+_staging_pools = {}
+
+
+def get_staging_pool():
+    """
+    Pool of staging buffers of the calling thread's current context. 
+    Each context has its own, as pinned memory is registered with 
+    the context that pinned it, and it is cleared as its device 
+    exits.
+    """
+    context = current_context()
+    if context is None:
+        raise RuntimeError("Staging buffers need a current context, e.g. within d.active().")
+    pool = _staging_pools.get(context)
+    if pool is None:
+        pool = _staging_pools.setdefault(context, Pinned_Pool())
+    return pool
+
+
+def clear_staging_pool(context):
+    """
+    Unpin and drop the staging buffers of a context, see 
+    Pinned_Pool.clear.
+
+    Parameters
+    ----------
+    context : cuCtx
+        The context whose pool is cleared, current on the calling 
+        thread.
+    """
+    pool = _staging_pools.pop(context, None)
+    if pool is not None:
+        pool.clear()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Pipeline",
+]
+
+import numpy as np
+
+# Local imports
+from dev_ptr import Device_Ptr
+
+
+def _as_list(arrs):
+    if arrs is None:
+        return []
+    return list(arrs) if isinstance(arrs, (list, tuple)) else [arrs]
+
+
+class Pipeline(object):
+
+    def __init__(self, device, n_streams=2):
+        """
+        Splits host arrays into chunks along their first axis, and
+        rotates the chunks across the device streams. Each chunk is
+        copied to the device, processed, and copied back on its
+        stream, so the transfers of one chunk overlap the compute and
+        transfers of the others. The host only blocks once, at the
+        end of a run.
+
+        Parameters
+        ----------
+        device : Device
+            The device to run on. Streams are added to device.streams
+            if it has fewer than n_streams.
+
+        n_streams : int, optional
+            Number of streams, each with its own device buffers. 2
+            double buffers, 3 triple buffers, so a chunk's H2D, another
+            chunk's compute and a third chunk's D2H can all overlap.
+
+        Attributes
+        ----------
+        chunk : int or None
+            Rows per chunk used by the last run.
+
+        n_chunks : int
+            Number of chunks processed by the last run.
+        """
+        self.device = device
+        self.n_streams = n_streams
+        self.chunk = None
+        self.n_chunks = 0
+        while len(device.streams) < n_streams:
+            device.add_stream()
+        self.streams = device.streams[:n_streams]
+
+
+    def run(self, inputs, outputs, fn, chunk=None):
+        """
+        Run fn over every chunk of the inputs.
+
+        Parameters
+        ----------
+        inputs : np.ndarray or list of np.ndarray
+            Host arrays with the same number of rows. Pinned,
+            C-contiguous arrays (see Device.require_streamable) are
+            copied asynchronously. Others are pinned for the run.
+
+        outputs : np.ndarray, list of np.ndarray, or None
+            Host arrays, with as many rows as the inputs, that the
+            chunk results are copied back to.
+
+        fn : func
+            Called as fn(d_in, d_out, stream) for every chunk. d_in
+            and d_out are Device_Ptrs, or lists of them when inputs
+            or outputs are lists, holding the chunk's rows, and stream
+            is the Stream to issue work on. Work must be queued on
+            that stream, without synchronizing. The last chunk may
+            have fewer rows.
+
+        chunk : int, optional
+            Rows per chunk. If None, the rows are split into 4 chunks
+            per stream.
+
+        Returns
+        -------
+        outputs : np.ndarray, list of np.ndarray, or None
+            The outputs, once every chunk has completed.
+        """
+        ins, outs = _as_list(inputs), _as_list(outputs)
+        if not ins:
+            raise ValueError("Pipeline.run needs at least one input.")
+        n_rows = ins[0].shape[0]
+        for arr in ins + outs:
+            if arr.shape[0] != n_rows:
+                raise ValueError("Array with %i rows, expected %i."%(arr.shape[0], n_rows))
+            if not arr.flags['C_CONTIGUOUS']:
+                raise ValueError("Pipelined host arrays must be C-contiguous.")
+        if chunk is None:
+            chunk = -(-n_rows//(4*self.n_streams))
+        chunk = max(1, min(chunk, n_rows))
+        self.chunk = chunk
+        self.n_chunks = 0
+
+        pinned = [arr for arr in ins + outs if not self._is_pinned(arr)]
+        for arr in pinned:
+            self.device.host_pin(arr)
+        n_used = min(self.n_streams, -(-n_rows//chunk))
+        buffers = [([self._buffer(arr, chunk, s) for arr in ins],
+                    [self._buffer(arr, chunk, s) for arr in outs])
+                   for s in self.streams[:n_used]]
+        try:
+            for k, lo in enumerate(range(0, n_rows, chunk)):
+                hi = min(lo + chunk, n_rows)
+                s = self.streams[k % n_used]
+                d_ins, d_outs = buffers[k % n_used]
+                d_ins = [d_arr[:hi-lo] for d_arr in d_ins]
+                d_outs = [d_arr[:hi-lo] for d_arr in d_outs]
+                for d_arr, arr in zip(d_ins, ins):
+                    d_arr.to_device_async(arr[lo:hi], s.stream)
+                fn(d_ins if isinstance(inputs, (list, tuple)) else d_ins[0],
+                   d_outs if isinstance(outputs, (list, tuple)) else (d_outs or [None])[0],
+                   s)
+                for d_arr, arr in zip(d_outs, outs):
+                    d_arr.to_host_async(arr[lo:hi], s.stream)
+                self.n_chunks += 1
+        finally:
+            for s in self.streams[:n_used]:
+                s.sync()
+            for d_ins, d_outs in buffers:
+                for d_arr in d_ins + d_outs:
+                    d_arr.__exit__()
+            for arr in pinned:
+                self.device.host_unpin(arr)
+        return outputs
+
+
+    def _is_pinned(self, arr):
+        """
+        True if arr lies within an array pinned by the device, so
+        slices of pinned arrays are not pinned again.
+        """
+        lo = arr.ctypes.data
+        for p in self.device._pinned_arrs:
+            if isinstance(p, np.ndarray):
+                if p.ctypes.data <= lo and lo + arr.nbytes <= p.ctypes.data + p.nbytes:
+                    return True
+        return False
+
+
+    def _buffer(self, arr, chunk, s):
+        return Device_Ptr((chunk,) + arr.shape[1:], arr.dtype, stream=s.stream,
+                          pool=self.device.pool)
+
+
+    def __repr__(self):
+        return ("Pipeline(n_streams=%i, chunk=%s, n_chunks=%i)"
+                %(self.n_streams, self.chunk, self.n_chunks))
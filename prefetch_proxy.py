@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Prefetch_Proxy",
+]
+
+# Local imports
+from uni_ptr import Unified_Ptr
+
+
+class Prefetch_Proxy(object):
+
+    def __init__(self, lib, stream=None):
+        """
+        Wraps a cuBLAS or cuFFT object so that Unified_Ptr arguments 
+        with auto_prefetch set are prefetched to their device, on 
+        the library's stream, before each call. Every other 
+        attribute is passed through unchanged.
+
+        Parameters
+        ----------
+        lib : object
+            The cuBLAS or cuFFT object.
+
+        stream : c_void_p, optional
+            CUDA stream the library calls are issued on.
+        """
+        self._lib = lib
+        self._stream = stream
+
+
+    def __getattr__(self, name):
+        attr = getattr(self._lib, name)
+        if not callable(attr):
+            return attr
+
+        stream = self._stream
+        def call(*args, **kwargs):
+            for arg in args + tuple(kwargs.values()):
+                if isinstance(arg, Unified_Ptr) and arg.auto_prefetch:
+                    arg.prefetch(stream=stream)
+            return attr(*args, **kwargs)
+
+        # Cache the wrapper, later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Checks the caching of Memory_Pool against a counting stand-in for
+cu_malloc/cu_free, without a GPU.
+
+cuda_helpers is replaced by a module whose calls are no-ops. The pool
+is given a malloc that hands out fake addresses from a fixed budget,
+failing once it is spent, and a free that returns them, and every
+call to either is counted.
+"""
+
+import os
+import sys
+import types
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+upone_path = os.path.dirname(dir_path)
+sys.path.append(upone_path)
+
+module = types.ModuleType('cuda_helpers')
+module.__getattr__ = lambda name: (lambda *args, **kwargs: None)
+sys.modules['cuda_helpers'] = module
+
+from ctypes import c_void_p
+
+from mem_pool import (Memory_Pool,
+                      round_size)
+
+
+class Fake_Driver(object):
+
+    def __init__(self, budget):
+        """
+        Counting malloc/free over a budget of device bytes.
+        """
+        self.budget = budget
+        self.used = 0
+        self.n_mallocs = 0
+        self.n_frees = 0
+        self._next = 1 << 20
+        self._sizes = {}
+
+
+    def malloc(self, nbytes):
+        self.n_mallocs += 1
+        if self.used + nbytes > self.budget:
+            raise RuntimeError("cudaErrorMemoryAllocation")
+        self._next += 1 << 30
+        self._sizes[self._next] = nbytes
+        self.used += nbytes
+        return self._next
+
+
+    def free(self, ptr):
+        self.n_frees += 1
+        self.used -= self._sizes.pop(ptr.value)
+
+
+def fresh_pool(budget=1 << 30, max_cached_bytes=None):
+    driver = Fake_Driver(budget)
+    return driver, Memory_Pool(max_cached_bytes, malloc=driver.malloc, free=driver.free)
+
+
+s1, s2, s3 = c_void_p(1), c_void_p(2), c_void_p(3)
+
+
+# Blocks are reused within their size class
+driver, pool = fresh_pool()
+a = pool.malloc(1000, s1)
+pool.free(a, s1)
+b = pool.malloc(700, s1)
+assert b.value == a.value and round_size(700) == round_size(1000)
+assert driver.n_mallocs == 1 and pool.n_hits == 1
+c = pool.malloc(3000, s1)
+assert c.value != a.value and driver.n_mallocs == 2
+pool.free(b, s1)
+pool.free(c, s1)
+
+
+# A block freed on one stream is not reused by another until released
+driver, pool = fresh_pool()
+a = pool.malloc(1000, s1)
+pool.free(a, s1)
+marker = pool.mark_stream(s1)
+b = pool.malloc(1000, s2)
+assert b.value != a.value and driver.n_mallocs == 2
+pool.release_marked(marker)
+c = pool.malloc(1000, s2)
+assert c.value == a.value and driver.n_mallocs == 2
+pool.free(b, s2)
+pool.free(c, s2)
+
+# Blocks freed after the marker was taken stay pending
+d = pool.malloc(1000, s1)
+assert driver.n_mallocs == 3
+marker = pool.mark_stream(s1)
+pool.free(d, s1)
+pool.release_marked(marker)
+e = pool.malloc(1000, s3)
+assert e.value != d.value and driver.n_mallocs == 4
+pool.free(e, s3)
+
+
+# The cache is trimmed to the high-water mark
+driver, pool = fresh_pool(max_cached_bytes=2*round_size(1000))
+ptrs = [pool.malloc(1000, s1) for i in range(5)]
+for ptr in ptrs:
+    pool.free(ptr, s1)
+assert pool.cached_bytes == 2*round_size(1000), pool
+assert driver.n_frees == 3 and driver.used == pool.cached_bytes
+
+
+# empty_cache returns every cached block, and leaves live ones
+driver, pool = fresh_pool()
+live = pool.malloc(1000, s1)
+for ptr in [pool.malloc(1 << 21, s2) for i in range(3)]:
+    pool.free(ptr, s2)
+pool.empty_cache()
+assert pool.cached_bytes == 0 and driver.used == round_size(1000)
+assert driver.n_frees == 3 and pool.live_bytes == round_size(1000)
+pool.free(live, s1)
+
+
+# An allocation that fails while blocks are cached empties the cache,
+# and is retried once
+driver, pool = fresh_pool(budget=4 << 20)
+for ptr in [pool.malloc(1 << 21, s1) for i in range(2)]:
+    pool.free(ptr, s1)
+big = pool.malloc(4 << 20, s2)
+assert driver.n_mallocs == 4 and driver.n_frees == 2
+assert pool.cached_bytes == 0 and driver.used == 4 << 20
+try:
+    pool.malloc(1 << 21, s2)
+    raise AssertionError("Allocation beyond the budget succeeded.")
+except RuntimeError:
+    pass
+pool.free(big, s2)
+
+print("Memory_Pool checks passed")
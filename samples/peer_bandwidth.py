@@ -0,0 +1,26 @@
+"""
+Prints which GPUs can access each other's memory directly, and the 
+measured copy bandwidth of every device pair. Pairs without peer 
+access are copied through pinned host memory.
+"""
+
+import os
+import sys
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+upone_path = os.path.dirname(dir_path)
+sys.path.append(upone_path)
+
+from device_pool import Device_Pool
+
+nbytes = 1 << 28       # 256 MB per copy
+
+with Device_Pool() as pool:
+    print("Peer access:\n%s"%pool.peer_matrix().astype(int))
+    for src in pool.devices:
+        for dst in pool.devices:
+            if src is not dst:
+                link = src.peer_link(dst)
+                link.measure(nbytes)           # Warm up
+                bandwidth = link.measure(nbytes)
+                print("%i -> %i  %-6s %8.2f GB/s"%(src.id, dst.id, "p2p" if link.p2p else "staged", bandwidth/1e9))
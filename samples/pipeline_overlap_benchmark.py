@@ -0,0 +1,83 @@
+"""
+Measures how much of the transfer and compute time Device.pipeline
+hides by overlapping chunks across streams.
+
+The input is copied to the device, scaled a few times with cuBLAS, and
+copied back. The stage times are measured on their own first, then the
+whole job is run through a pipeline with 1 stream (every stage of every
+chunk in sequence) and with 2 and 3 streams. The best achievable time
+is the slowest stage, as the other two stages can hide behind it.
+
+overlap = (serial - pipelined) / (serial - slowest stage)
+
+is the fraction of the hideable time that was actually hidden.
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+upone_path = os.path.dirname(dir_path)
+sys.path.append(upone_path)
+
+from device import Device
+from event import Timer
+
+rows, cols = 1<<14, 1<<12     # 256 MB of f4
+chunk = 1<<10
+n_scal = 20
+
+
+def compute(d_in, d_out, s):
+    d_in.astype(d_out.dtype, out=d_out, stream=s.stream)
+    for i in range(n_scal):
+        s.cublas.scal(1.0001, d_out)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+with Device(n_streams=3) as d:
+    a = np.random.rand(rows, cols).astype('f4')
+    out = np.empty_like(a)
+    d.require_streamable(a, out)
+    s = d.streams[0]
+
+    # Stage times, each stage over the whole array on one stream
+    d_in = s.malloc((chunk, cols), 'f4')
+    d_out = s.malloc((chunk, cols), 'f4')
+    with Timer(s.stream) as t_h2d:
+        for lo in range(0, rows, chunk):
+            d_in.to_device_async(a[lo:lo+chunk], s.stream)
+    with Timer(s.stream) as t_comp:
+        for lo in range(0, rows, chunk):
+            compute(d_in, d_out, s)
+    with Timer(s.stream) as t_d2h:
+        for lo in range(0, rows, chunk):
+            d_out.to_host_async(out[lo:lo+chunk], s.stream)
+    stages = [1e-3*t.elapsed_time() for t in [t_h2d, t_comp, t_d2h]]
+    d_in.__exit__()
+    d_out.__exit__()
+    ideal = max(stages)
+    print("H2D %.1f ms, compute %.1f ms, D2H %.1f ms"%tuple(1e3*t for t in stages))
+
+    # Warm up the pool and the cuBLAS handles of every stream
+    d.pipeline(a[:3*chunk], out[:3*chunk], compute, 3, chunk)
+
+    serial = timed(lambda: d.pipeline(a, out, compute, 1, chunk))
+    print("%-10s %8.1f ms"%("1 stream", 1e3*serial))
+    for n_streams in [2, 3]:
+        t = timed(lambda: d.pipeline(a, out, compute, n_streams, chunk))
+        overlap = (serial - t)/max(serial - ideal, 1e-9)
+        print("%-10s %8.1f ms  speedup %.2fx  overlap %5.1f%%  (bound %.1f ms)"
+              %("%i streams"%n_streams, 1e3*t, serial/t, 100*overlap, 1e3*ideal))
+
+    expected = a.copy()
+    for i in range(n_scal):
+        expected *= np.float32(1.0001)
+    print("max error: %g"%np.abs(out - expected).max())
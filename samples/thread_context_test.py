@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Checks that executor worker threads only ever run with their own
+device's context current, without a GPU.
+
+cuda_helpers, kernel_helpers and the cuBLAS/cuFFT wrappers are replaced
+by stand-ins whose context calls keep a per-thread stack, as the
+driver does. Two devices are driven by executors at once, and every
+job records the stack of the thread it runs on. The main thread's
+stack must be left as it was.
+"""
+
+import os
+import sys
+import threading
+import time
+import types
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+upone_path = os.path.dirname(dir_path)
+sys.path.append(upone_path)
+
+
+# Stand-in driver: every call is a no-op, except the context stack
+_tls = threading.local()
+_handles = iter(range(100, 1 << 20))
+
+
+def driver_stack():
+    if not hasattr(_tls, 'stack'):
+        _tls.stack = []
+    return _tls.stack
+
+
+def _no_op(name):
+    return lambda *args, **kwargs: None
+
+
+def _context_create(device_id):
+    # cuCtxCreate makes the new context current
+    context = next(_handles)
+    driver_stack().append(context)
+    return context
+
+
+def _context_pop(context):
+    assert driver_stack()[-1] == context, "Popped %s off %s"%(context, driver_stack())
+    driver_stack().pop()
+
+
+def _stream_create(*args):
+    stream = next(_handles)
+    stream_contexts[stream] = driver_stack()[-1] if driver_stack() else None
+    return stream
+
+
+stream_contexts = {}        # stream -> context current when created
+
+
+def _context_destroy(context):
+    # A context current on the calling thread is popped as it is 
+    # destroyed
+    if driver_stack() and driver_stack()[-1] == context:
+        driver_stack().pop()
+
+
+for name in ['cuda_helpers', 'kernel_helpers', 'cublas_helpers',
+             'cufft_helpers', 'cufft_helpers.cufft']:
+    module = types.ModuleType(name)
+    module.__getattr__ = _no_op
+    module.CPU_DEVICE_ID = -1
+    module.cu_context_create = _context_create
+    module.cu_context_push = lambda context: driver_stack().append(context)
+    module.cu_context_pop = _context_pop
+    module.cu_context_destroy = _context_destroy
+    module.cu_malloc = lambda nbytes: next(_handles) << 20
+    module.cu_stream_create = _stream_create
+    module.cublas = lambda *args: object()
+    module.cufft = lambda *args: object()
+    sys.modules[name] = module
+
+from cuctx import current_context
+from device import Device
+
+
+mixups = []
+
+def job(s, x):
+    stack = list(driver_stack())
+    if stack != [s.device.context.context]:
+        mixups.append((threading.current_thread().name, stack))
+    time.sleep(0.001)
+    # A call through the bound context must leave the stack unchanged
+    s.device.context(lambda: None)
+    if driver_stack() != stack:
+        mixups.append((threading.current_thread().name, list(driver_stack())))
+    return threading.current_thread().name, id(s), x
+
+
+main_stack = list(driver_stack())
+with Device(n_streams=1) as d1, Device(n_streams=1) as d2:
+    created = list(driver_stack())
+    # Creating a context makes it current
+    assert current_context() is d2.context, current_context()
+    with d1.executor(3) as e1, d2.executor(2) as e2:
+        r1 = [e1.submit(job, i) for i in range(30)]
+        r2 = e2.map(job, range(20))
+        r1 = [r.get() for r in r1]
+
+    # Each worker thread drives a single stream
+    streams = {}
+    for name, stream_id, x in r1 + list(r2):
+        streams.setdefault(name, set()).add(stream_id)
+    assert all(len(s) == 1 for s in streams.values()), streams
+
+    # Streams are created under their device's context
+    for d in [d1, d2]:
+        for s in d.streams:
+            key = getattr(s.stream, 'value', s.stream)
+            assert stream_contexts[key] == d.context.context, (s, stream_contexts)
+
+    d1.context(lambda: None)
+    assert driver_stack() == created, (driver_stack(), created)
+
+assert not mixups, mixups
+assert driver_stack() == main_stack, (driver_stack(), main_stack)
+print("%i worker threads, no context mix-ups"%len(streams))
@@ -0,0 +1,56 @@
+"""
+Throughput benchmark of the in-place transpose (Device_Ptr.T) against
+the out-of-place tiled transpose (Device_Ptr.transpose).
+
+Throughput is reported as effective bandwidth, counting one read and
+one write of the matrix. The in-place path only supports square
+matrices, so rectangular and batched shapes are timed with the
+tiled kernel alone.
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+upone_path = os.path.dirname(dir_path)
+sys.path.append(upone_path)
+
+from device import Device
+
+n_iter = 20
+shapes = [(1024,1024),
+          (4096,4096),
+          (4096,1024),
+          (64,512,512)]
+
+
+def bench(d, fn):
+    fn()
+    d.sync()
+    t0 = time.perf_counter()
+    for i in range(n_iter):
+        fn()
+    d.sync()
+    return (time.perf_counter()-t0)/n_iter
+
+
+with Device() as d:
+    for dtype in ['f4', 'c8']:
+        for shape in shapes:
+            d_a = d.arange(np.prod(shape), dtype=dtype).reshape(shape)
+            d_out = d.malloc(shape[:-2] + shape[:-3:-1], dtype)
+            gbytes = 2.*d_a.nbytes/1e9
+
+            t_tiled = bench(d, lambda: d_a.transpose(out=d_out))
+            line = "%-4s %-16s tiled: %8.2f GB/s"%(dtype, shape, gbytes/t_tiled)
+
+            # Check the result against numpy
+            ok = np.array_equal(d_out.to_host(), np.swapaxes(d_a.to_host(), -1, -2))
+
+            if len(shape) == 2 and shape[0] == shape[1]:
+                t_inplace = bench(d, lambda: d_a.T())
+                line += "   in-place: %8.2f GB/s"%(gbytes/t_inplace)
+
+            print(line + "   correct: %s"%ok)
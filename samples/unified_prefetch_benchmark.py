@@ -0,0 +1,59 @@
+"""
+Compares fault-driven and prefetched page migration of unified memory.
+
+Each iteration writes the array on the host through .h, scales it on 
+the device with cuBLAS, and reads it back on the host. Without 
+prefetching, the first device touch migrates the pages one fault at a 
+time, and so does the first host touch afterwards. With prefetching, 
+the whole range is migrated in bulk before each side uses it.
+
+Requires a GPU and OS with concurrent managed access (Pascal or newer 
+on Linux).
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+upone_path = os.path.dirname(dir_path)
+sys.path.append(upone_path)
+
+from device import Device
+
+n_iter = 10
+sizes = [1<<20, 1<<24, 1<<26]
+
+
+def bench(d, u, prefetch):
+    t_dev = t_host = 0.
+    for i in range(n_iter):
+        u.h[:] = i
+        t0 = time.perf_counter()
+        if prefetch:
+            u.prefetch()
+        d.cublas.scal(2., u)
+        d.sync()
+        t1 = time.perf_counter()
+        if prefetch:
+            u.prefetch('host')
+            d.sync()
+        total = u.h.sum()
+        t2 = time.perf_counter()
+        t_dev += t1 - t0
+        t_host += t2 - t1
+    return t_dev/n_iter, t_host/n_iter
+
+
+with Device() as d:
+    for size in sizes:
+        u = d.malloc_unified(size, 'f4')
+        mbytes = u.nbytes/1e6
+        for prefetch in [False, True]:
+            t_dev, t_host = bench(d, u, prefetch)
+            print("%9.1f MB  %-10s  host->device + scal: %8.3f ms (%7.2f GB/s)"
+                  "   device->host + sum: %8.3f ms"
+                  %(mbytes, "prefetch" if prefetch else "faults",
+                    1e3*t_dev, mbytes/1e3/t_dev, 1e3*t_host))
+        u.__exit__()
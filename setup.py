@@ -7,7 +7,8 @@ from shared_utils.build import build
 
 __compile_dirs = {"cuda_helpers"   : "cuda",
                   "cublas_helpers" : "cublas",
-                  "cufft_helpers"  : "cufft"}
+                  "cufft_helpers"  : "cufft",
+                  "kernel_helpers" : "kernels"}
 
 
 
@@ -17,7 +17,10 @@ from cuda_helpers import (cu_create_channel_char,
                           cu_malloc,
                           cu_malloc_3d,
                           cu_malloc_managed)
-from dev_ptr import Device_Ptr
+from dev_ptr import (dtype_map,
+                     Device_Ptr)
+from kernel_helpers import (cu_arange,
+                            cu_fill)
 from uni_ptr import Unified_Ptr
 from shared_utils import Mapping
 
@@ -107,4 +110,198 @@ class Shared(Mapping, object):
             extent = np.array(extent, dtype='i4')
         dev_ptr = cu_malloc_3d(channel, extent, layered)
         dev_ptr = cast(dev_ptr, c_void_p)
-        return dev_ptr
\ No newline at end of file
+        return dev_ptr
+
+
+    def zeros(self, shape, dtype=None, stream=None):
+        """
+        Allocates device memory set to zero with an asynchronous 
+        memset.
+
+        Parameters
+        ----------
+        shape : tuple
+            The shape of the array to allocate.
+            
+        dtype : np.dtype, optional
+            That data type of the array.
+            
+        stream : c_void_p, optional
+            CUDA stream to associate the returned object with.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            The object that holds the pointer to the memory.
+        """
+        return self.full(shape, 0, dtype, stream)
+
+
+    def ones(self, shape, dtype=None, stream=None):
+        """
+        Allocates device memory set to one on the device.
+
+        Parameters
+        ----------
+        shape : tuple
+            The shape of the array to allocate.
+            
+        dtype : np.dtype, optional
+            That data type of the array.
+            
+        stream : c_void_p, optional
+            CUDA stream to associate the returned object with.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            The object that holds the pointer to the memory.
+        """
+        return self.full(shape, 1, dtype, stream)
+
+
+    def full(self, shape, fill_value, dtype=None, stream=None):
+        """
+        Allocates device memory set to a scalar value. The value is 
+        set by a kernel launch (or memset for zero) on the stream, 
+        so no host memory is used and the call does not block.
+
+        Parameters
+        ----------
+        shape : tuple
+            The shape of the array to allocate.
+
+        fill_value : scalar
+            Value to set every element to.
+            
+        dtype : np.dtype, optional
+            That data type of the array.
+            
+        stream : c_void_p, optional
+            CUDA stream to associate the returned object with.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            The object that holds the pointer to the memory.
+        """
+        d_arr = self.malloc(shape, dtype=dtype, stream=stream)
+        return d_arr.fill(fill_value)
+
+
+    def arange(self, start, stop=None, step=1, dtype=None, stream=None):
+        """
+        Allocates a 1d device array of evenly spaced values within 
+        [start, stop), computed on the device.
+
+        Parameters
+        ----------
+        start : scalar
+            Start of the interval. If stop is None, the interval 
+            is [0, start).
+
+        stop : scalar, optional
+            End of the interval, not included.
+
+        step : scalar, optional
+            Spacing between values.
+            
+        dtype : np.dtype, optional
+            That data type of the array.
+            
+        stream : c_void_p, optional
+            CUDA stream to associate the returned object with.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            The object that holds the pointer to the memory.
+        """
+        if stop is None:
+            start, stop = 0, start
+        n = max(int(np.ceil((stop-start)/float(step))), 0)
+        d_arr = self.malloc((n,), dtype=dtype, stream=stream)
+        cu_arange(d_arr.ptr, start, step, n, dtype_map[d_arr.dtype], d_arr.stream)
+        return d_arr
+
+
+    def linspace(self, start, stop, num=50, endpoint=True, dtype=None, stream=None):
+        """
+        Allocates a 1d device array of num evenly spaced values 
+        over [start, stop], computed on the device.
+
+        Parameters
+        ----------
+        start : scalar
+            Start of the interval.
+
+        stop : scalar
+            End of the interval.
+
+        num : int, optional
+            Number of values.
+
+        endpoint : bool, optional
+            If True, stop is the last value. Otherwise it is 
+            not included.
+            
+        dtype : np.dtype, optional
+            That data type of the array.
+            
+        stream : c_void_p, optional
+            CUDA stream to associate the returned object with.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            The object that holds the pointer to the memory.
+        """
+        div = (num-1) if endpoint else num
+        step = (stop-start)/float(div) if div > 0 else 0.
+        d_arr = self.malloc((num,), dtype=dtype, stream=stream)
+        cu_arange(d_arr.ptr, start, step, num, dtype_map[d_arr.dtype], d_arr.stream)
+        return d_arr
+
+
+    def eye(self, n, m=None, k=0, dtype=None, stream=None):
+        """
+        Allocates a 2d device array with ones on a diagonal and 
+        zeros elsewhere, set on the device.
+
+        Parameters
+        ----------
+        n : int
+            Number of rows.
+
+        m : int, optional
+            Number of columns. If None, defaults to n.
+
+        k : int, optional
+            Index of the diagonal. 0 is the main diagonal, a 
+            positive value an upper diagonal, and a negative value 
+            a lower diagonal.
+            
+        dtype : np.dtype, optional
+            That data type of the array.
+            
+        stream : c_void_p, optional
+            CUDA stream to associate the returned object with.
+
+        Returns
+        -------
+        Device_Ptr : Device_Ptr
+            The object that holds the pointer to the memory.
+        """
+        m = n if m is None else m
+        d_arr = self.zeros((n, m), dtype=dtype, stream=stream)
+        first = k if k >= 0 else -k*m
+        count = max(min(n, m-k) if k >= 0 else min(n+k, m), 0)
+        if count > 0:
+            itemsize = d_arr.dtype.itemsize
+            cu_fill(c_void_p(d_arr.ptr.value + first*itemsize),
+                    np.array([1], dtype=d_arr.dtype),
+                    count,
+                    m+1,
+                    dtype_map[d_arr.dtype],
+                    d_arr.stream)
+        return d_arr
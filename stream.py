@@ -7,6 +7,10 @@ import numpy as np
 
 
 # Local imports
+from dev_ptr import Device_Ptr
+from event import Event
+from graph import Graph
+from prefetch_proxy import Prefetch_Proxy
 from shared import (get_nbytes,
                     Shared)            #Shared calls between Device and Stream
 from cublas_helpers import cublas
@@ -50,8 +54,8 @@ class Stream(Shared, object):
         self._device = device
         self._stream = cu_stream_create()
         self._id = stream_id
-        self._cublas = cublas(self.stream)
-        self._cufft = cufft(self.stream)
+        self._cublas = Prefetch_Proxy(cublas(self.stream), self.stream)
+        self._cufft = Prefetch_Proxy(cufft(self.stream), self.stream)
 
 
     def malloc(self, shape, dtype=None, stream=None, fill=None):
@@ -82,11 +86,113 @@ class Stream(Shared, object):
         return self.device.malloc(shape, dtype, fill, stream)
 
 
+    def from_cuda_array(self, obj, stream=None):
+        """
+        Wrap device memory exported through __cuda_array_interface__
+        without copying. See Device.from_cuda_array.
+        """
+        return Device_Ptr.from_cuda_array(obj, stream or self.stream)
+
+
+    def from_dlpack(self, obj, stream=None):
+        """
+        Wrap device memory exported through DLPack without copying. 
+        See Device.from_dlpack.
+        """
+        return Device_Ptr.from_dlpack(obj, stream or self.stream)
+
+
+    def capture(self, mode='global'):
+        """
+        Record the work queued on the stream in a with block into a 
+        CUDA graph, to be replayed with one launch.
+
+        Parameters
+        ----------
+        mode : str, optional
+            'global', 'thread_local' or 'relaxed' capture mode.
+
+        Returns
+        -------
+        graph : Graph
+            The graph, e.g.
+
+            >>> with s.capture() as g:
+            ...     d_a.to_device_async(h_a)
+            ...     s.cublas.scal(2., d_a)
+            ...     d_a.to_host_async(h_b)
+            >>> g.launch()
+        """
+        return Graph(self.stream, mode)
+
+
+    def record(self, event=None, timing=True):
+        """
+        Record an event on the stream.
+
+        Parameters
+        ----------
+        event : Event, optional
+            The event to record. If None, a new one is created.
+
+        timing : bool, optional
+            Whether a new event records timestamps.
+
+        Returns
+        -------
+        event : Event
+            The recorded event.
+        """
+        event = event or Event(timing)
+        return event.record(self.stream)
+
+
+    def wait(self, event):
+        """
+        Make future work on the stream wait on work recorded by an 
+        event, or on the data of a Device_Ptr marked with 
+        record_ready, without blocking the host thread.
+
+        Parameters
+        ----------
+        event : Event or Device_Ptr
+            What to wait on.
+        """
+        if isinstance(event, Device_Ptr):
+            event.wait_ready(self.stream)
+        else:
+            event.wait(self.stream)
+
+
     def sync(self):
         """
         Block the host thread until the stream has completed its task.
+        Memory freed on the stream becomes reusable by all streams.
         """
         cu_sync_stream(self.stream)
+        self.device.pool.release_stream(self.stream)
+
+
+    def synchronize_async(self, loop=None):
+        """
+        Wait for the stream without blocking the asyncio event loop.
+
+        Parameters
+        ----------
+        loop : asyncio event loop, optional
+            Loop the future belongs to. If None, the current loop.
+
+        Returns
+        -------
+        future : asyncio.Future
+            Resolves once all work queued so far on the stream has 
+            completed, and memory freed on the stream by then has 
+            become reusable, e.g. ``await s.synchronize_async()``.
+        """
+        from aio import stream_result     # asyncio is only needed when awaiting
+        pool = self.device.pool
+        freed = pool.mark_stream(self.stream)
+        return stream_result(self.stream, lambda: pool.release_marked(freed), loop)
 
 
     @property
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "as_shape",
+    "copy_layout",
+    "c_strides",
+    "is_c_contiguous",
+    "prod",
+]
+
+from functools import reduce
+from operator import mul
+
+
+def as_shape(shape):
+    """
+    Return shape as a tuple of ints.
+    """
+    try:
+        return tuple(int(n) for n in shape)
+    except TypeError:
+        return (int(shape),)
+
+
+def prod(shape):
+    """
+    Number of elements in an array of the given shape.
+    """
+    return reduce(mul, as_shape(shape), 1)
+
+
+def c_strides(shape, itemsize):
+    """
+    Byte strides of a C-contiguous array.
+
+    Parameters
+    ----------
+    shape : tuple
+        The shape of the array.
+
+    itemsize : int
+        Size of a single element in bytes.
+
+    Returns
+    -------
+    strides : tuple
+        Byte step of each dimension.
+    """
+    strides = []
+    step = itemsize
+    for n in reversed(as_shape(shape)):
+        strides.append(step)
+        step *= n
+    return tuple(strides[::-1])
+
+
+def is_c_contiguous(shape, strides, itemsize):
+    """
+    Check whether an array with the given strides is laid out
+    C-contiguously. Dimensions of length one are ignored, as
+    their stride is never used.
+    """
+    for n, stride, expected in zip(as_shape(shape),
+                                   strides,
+                                   c_strides(shape, itemsize)):
+        if n != 1 and stride != expected:
+            return False
+    return True
+
+
+def copy_layout(shape, itemsize, *strides):
+    """
+    Describe a copy between arrays of the same shape but different 
+    strides as a set of pitched 3D copies. Adjacent dimensions that 
+    are contiguous in every array are merged first.
+
+    Parameters
+    ----------
+    shape : tuple
+        The shape shared by the arrays.
+
+    itemsize : int
+        Size of a single element in bytes.
+
+    *strides : tuples
+        Byte strides of each array.
+
+    Returns
+    -------
+    layout : tuple or None
+        (width, height, depth, pitches, slices, offsets) where width 
+        is the contiguous bytes per row, pitches and slices hold the 
+        row and slice pitch of each array, and offsets is a list 
+        holding the byte offsets of each array for every 3D copy. 
+        None if the strides cannot be expressed as pitched copies 
+        (negative or overlapping strides).
+    """
+    dims = [[n] + list(s) for n, s in zip(as_shape(shape), zip(*strides)) if n != 1]
+    if any(st < 0 for d in dims for st in d[1:]):
+        return None
+
+    merged = []
+    for d in dims:
+        if merged and all(merged[-1][i] == d[i]*d[0] for i in range(1, len(d))):
+            merged[-1] = [merged[-1][0]*d[0]] + d[1:]
+        else:
+            merged.append(d)
+
+    n_arrs = len(strides)
+    width = itemsize
+    if merged and all(st == itemsize for st in merged[-1][1:]):
+        width *= merged.pop()[0]
+
+    rows = merged.pop() if merged else [1] + [width]*n_arrs
+    slices = merged.pop() if merged else [1] + [rows[0]*p for p in rows[1:]]
+    if rows[0] > 1 and any(p < width for p in rows[1:]):
+        return None
+    if slices[0] > 1 and any(p == 0 for p in slices[1:]):
+        return None
+
+    offsets = [[0]*n_arrs]
+    for d in reversed(merged):
+        offsets = [[o[i] + k*d[i+1] for i in range(n_arrs)]
+                   for k in range(d[0]) for o in offsets]
+
+    return (width, rows[0], slices[0],
+            tuple(rows[1:]), tuple(slices[1:]), offsets)
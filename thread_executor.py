@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    "Thread_Executor",
+]
+
+from multiprocessing.pool import ThreadPool
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+import threading
+
+
+class Thread_Executor(object):
+
+    def __init__(self, device, streams):
+        """
+        Runs jobs on worker threads, each owning one stream of a 
+        device. Every worker binds the device context once when it 
+        starts, so jobs issue CUDA calls without pushing and popping 
+        it. The ctypes libraries release the GIL during each call, so 
+        the host-side work of one job (slicing, packing, cuBLAS and 
+        cuFFT setup) overlaps the CUDA calls of the others.
+
+        Parameters
+        ----------
+        device : Device
+            The device the streams belong to.
+
+        streams : list of Stream
+            One stream per worker thread.
+
+        Attributes
+        ----------
+        n_jobs : list of int
+            Jobs run by each stream's thread.
+
+        Notes
+        -----
+        A stream is only ever driven by its own thread, so jobs must 
+        only use the stream they are given, and arrays they allocate 
+        on it.
+        """
+        self.device = device
+        self.streams = list(streams)
+        self.n_jobs = [0]*len(self.streams)
+        self._local = threading.local()
+        self._free = Queue()
+        for i in range(len(self.streams)):
+            self._free.put(i)
+        self._pool = ThreadPool(len(self.streams), self._init_worker)
+
+
+    def _init_worker(self):
+        self._local.index = self._free.get()
+        self.device.context.bind()
+
+
+    def _run(self, fn, args):
+        i = self._local.index
+        self.n_jobs[i] += 1
+        return fn(self.streams[i], *args)
+
+
+    def submit(self, fn, *args):
+        """
+        Run fn(stream, *args) on the next free worker.
+
+        Parameters
+        ----------
+        fn : func
+            Queues work on the Stream it is given.
+
+        Returns
+        -------
+        result : multiprocessing.pool.AsyncResult
+            result.get() returns fn's return value, or raises its 
+            exception.
+        """
+        return self._pool.apply_async(self._run, (fn, args))
+
+
+    def map(self, fn, iterable):
+        """
+        Run fn(stream, item) for every item, and wait for all of them.
+
+        Returns
+        -------
+        results : list
+            fn's return values, in the order of iterable.
+        """
+        return self._pool.map(lambda item: self._run(fn, (item,)), iterable)
+
+
+    def sync(self):
+        """
+        Block until every stream has completed the work queued on it.
+        """
+        for s in self.streams:
+            s.sync()
+
+
+    def close(self):
+        """
+        Wait for the submitted jobs and their streams, and stop the 
+        worker threads.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            self.sync()
+
+
+    def __repr__(self):
+        return ("Thread_Executor(n_threads=%i, n_jobs=%s)"
+                %(len(self.streams), self.n_jobs))
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
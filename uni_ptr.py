@@ -28,18 +28,45 @@ from cuda_helpers import (cu_conj,
                           cu_memcpy_d2h_async,
                           cu_memcpy_h2d_async,
                           cu_memset_async,
+                          cu_sync_stream,
                           cu_transpose)
 
+# Local imports
+from dispatch import default_dispatcher
+from kernel_helpers import (ADVISE_SET_ACCESSED_BY,
+                            ADVISE_SET_PREFERRED_LOCATION,
+                            ADVISE_SET_READ_MOSTLY,
+                            ADVISE_UNSET_ACCESSED_BY,
+                            ADVISE_UNSET_PREFERRED_LOCATION,
+                            ADVISE_UNSET_READ_MOSTLY,
+                            CPU_DEVICE_ID,
+                            cu_mem_advise,
+                            cu_mem_prefetch_async)
+from interop import (dlpack_device,
+                     export_cuda_array,
+                     export_dlpack,
+                     sync_streams)
+
 dtype_map={np.dtype('f4') :0,
            np.dtype('f8') :1,
            np.dtype('c8') :2,
            np.dtype('c16'):3}
 
+advise_map={'read_mostly'        : (ADVISE_SET_READ_MOSTLY, ADVISE_UNSET_READ_MOSTLY),
+            'preferred_location' : (ADVISE_SET_PREFERRED_LOCATION, ADVISE_UNSET_PREFERRED_LOCATION),
+            'accessed_by'        : (ADVISE_SET_ACCESSED_BY, ADVISE_UNSET_ACCESSED_BY)}
+
 c2f_map={np.dtype('f4') : 0,
          np.dtype('f8') : 1,
          np.dtype('c8') : 0,
          np.dtype('c16'): 1}
 
+# In-place operation -> (host ufunc, device vector kernel, device scalar kernel)
+op_map={'add': (np.add,         cu_iadd_vec, cu_iadd_val),
+        'mul': (np.multiply,    cu_imul_vec, cu_imul_val),
+        'sub': (np.subtract,    cu_isub_vec, cu_isub_val),
+        'div': (np.true_divide, cu_idiv_vec, cu_idiv_val)}
+
 
 def check_contiguous(arr):
     if not arr.flags['C_CONTIGUOUS'] and not arr.flags['F_CONTIGUOUS']:
@@ -48,7 +75,8 @@ def check_contiguous(arr):
 
 class Unified_Ptr(object):
     
-    def __init__(self, shape, dtype, stream=None, fill=None):
+    def __init__(self, shape, dtype, stream=None, fill=None, device_id=0,
+                 auto_prefetch=False, dispatcher=None):
         """
         Allocates device memory, holds important information, 
         and provides useful operations.
@@ -67,11 +95,42 @@ class Unified_Ptr(object):
         fill : scalar, np.ndarray, or Device_Ptr, optional
             Default value to fill in allocated memory space. If 
             None, then the memory is allocated with zeros.
+
+        device_id : int, optional
+            The device the memory is used on, the default target of 
+            prefetch and advise.
+
+        auto_prefetch : bool, optional
+            If True, the memory is prefetched to the device on the 
+            call's stream before it is handed to a cuBLAS or cuFFT 
+            routine of a Device or Stream.
+
+        dispatcher : Dispatcher, optional
+            Chooses whether in-place arithmetic runs on the host or
+            on the device. If None, the module default_dispatcher
+            is used.
+
+        Attributes
+        ----------
+        location : int or None
+            Where the memory was last used or prefetched to: a
+            device ordinal, CPU_DEVICE_ID for the host, or None if
+            it was never touched.
+
+        h : np.ndarray
+            Host view of the memory. Accessing it waits for pending
+            device work on the stream, and marks the memory as
+            resident on the host.
         """
         
         self.shape = shape
         self.dtype = np.dtype(dtype)
         self.stream = stream
+        self.device_id = device_id
+        self.auto_prefetch = auto_prefetch
+        self.dispatcher = dispatcher or default_dispatcher
+        self.location = None
+        self._pending = False
         
         try:
             self.size = reduce(mul,shape)
@@ -81,10 +140,10 @@ class Unified_Ptr(object):
         self.nbytes = self.size*self.dtype.itemsize
         dev_ptr = cu_malloc_managed(self.nbytes)
         self.ptr = cast(dev_ptr, c_void_p)
-        self.h = np.ctypeslib.as_array(cast(dev_ptr,
-                                            np.ctypeslib.ndpointer(dtype,
-                                                                   shape=shape,
-                                                                   flags='C')))
+        self._h = np.ctypeslib.as_array(cast(dev_ptr,
+                                             np.ctypeslib.ndpointer(dtype,
+                                                                    shape=shape,
+                                                                    flags='C')))
         
         if fill is not None:
             if isinstance(fill, (int, float, complex)):
@@ -110,7 +169,21 @@ class Unified_Ptr(object):
     def __repr__(self):
         return repr(self.__dict__)
 
-    
+
+    @property
+    def h(self):
+        if self._pending:
+            cu_sync_stream(self.stream)
+            self._pending = False
+        self.location = CPU_DEVICE_ID
+        return self._h
+
+
+    @h.setter
+    def h(self, arr):
+        self._h = arr
+
+
     def __getitem__(self, slice):
         return self.h[slice]
         
@@ -125,7 +198,7 @@ class Unified_Ptr(object):
         
         Parameters
         ----------
-        b : np.ndarray or scalar
+        b : Unified_Ptr, np.ndarray or scalar
             Value(s) to add by
         
         Returns
@@ -133,7 +206,7 @@ class Unified_Ptr(object):
         self : Device_Ptr
             Returns self with updated values in self.ptr
         """
-        self.h += b
+        self._dispatch('add', b)
         return self
 
 
@@ -143,7 +216,7 @@ class Unified_Ptr(object):
         
         Parameters
         ----------
-        b : np.ndarray or scalar
+        b : Unified_Ptr, np.ndarray or scalar
             Value(s) to multiply by
         
         Returns
@@ -151,7 +224,7 @@ class Unified_Ptr(object):
         self : Device_Ptr
             Returns self with updated values in self.ptr
         """
-        self.h *= b
+        self._dispatch('mul', b)
         return self
 
     
@@ -161,7 +234,7 @@ class Unified_Ptr(object):
         
         Parameters
         ----------
-        b : np.ndarray or scalar
+        b : Unified_Ptr, np.ndarray or scalar
             Value(s) to subtract by
         
         Returns
@@ -169,7 +242,7 @@ class Unified_Ptr(object):
         self : Device_Ptr
             Returns self with updated values in self.ptr
         """
-        self.h -= b
+        self._dispatch('sub', b)
         return self
 
 
@@ -179,7 +252,7 @@ class Unified_Ptr(object):
         
         Parameters
         ----------
-        b : np.ndarray or scalar
+        b : Unified_Ptr, np.ndarray or scalar
             Value(s) to divide by
         
         Returns
@@ -187,10 +260,120 @@ class Unified_Ptr(object):
         self : Device_Ptr
             Returns self with updated values in self.ptr
         """
-        self.h /= b
+        self._dispatch('div', b)
         return self
 
 
+    def _dispatch(self, op, b):
+        """
+        Run an in-place operation on the side the dispatcher picks.
+        The decision is kept in self.dispatcher.last.
+        """
+        if type(b) == type(self):
+            operands = [(self.nbytes, self.location), (b.nbytes, b.location)]
+            device_ok = b.dtype == self.dtype and b.size == self.size
+        elif isinstance(b, np.ndarray):
+            operands = [(self.nbytes, self.location), (b.nbytes, CPU_DEVICE_ID)]
+            device_ok = False
+        else:
+            operands = [(self.nbytes, self.location)]
+            device_ok = isinstance(b, (int, float, complex, np.number))
+        device_ok = device_ok and self.dtype in c2f_map
+
+        decision = self.dispatcher.choose(operands, self.device_id, device_ok)
+        if decision.side == 'device':
+            self._device_op(op, b)
+        else:
+            self.dispatcher.host_apply(op_map[op][0], self.h,
+                                       b.h if type(b) == type(self) else b)
+
+
+    def _device_op(self, op, b):
+        """
+        Launch an in-place operation on self.stream, prefetching
+        operands that are not resident on device_id first.
+        """
+        _, vec_fn, val_fn = op_map[op]
+        if self.location != self.device_id:
+            self.prefetch()
+        if type(b) == type(self):
+            if b._pending and b.stream != self.stream:
+                cu_sync_stream(b.stream)
+                b._pending = False
+            if b.location != self.device_id:
+                b.prefetch(self.device_id, self.stream)
+            vec_fn(self.ptr,
+                   b.ptr,
+                   self.size,
+                   c2f_map[self.dtype],
+                   self.dtype_depth,
+                   self.stream)
+        else:
+            val_fn(self.ptr,
+                   np.array([b], dtype=self.dtype),
+                   self.size,
+                   c2f_map[self.dtype],
+                   self.dtype_depth,
+                   self.stream)
+        self._pending = True
+
+
+    def prefetch(self, device=None, stream=None):
+        """
+        Migrate the memory ahead of its use, instead of page by page 
+        on first touch.
+
+        Parameters
+        ----------
+        device : int or str, optional
+            Destination device ordinal, or 'host' to migrate the 
+            memory back to the host. If None, the memory goes to 
+            device_id.
+
+        stream : c_void_p, optional
+            CUDA stream to order the migration on. Prefetch to the 
+            host before reading self.h, which synchronizes the stream.
+        """
+        device = self._location(device)
+        cu_mem_prefetch_async(self.ptr, self.nbytes, device, stream or self.stream)
+        self.location = device
+        self._pending = True
+
+
+    def advise(self, advice, device=None, unset=False):
+        """
+        Give the driver a usage hint for the memory.
+
+        Parameters
+        ----------
+        advice : str
+            'read_mostly' to keep read-only copies wherever the 
+            memory is read, 'preferred_location' to keep the pages 
+            on device, or 'accessed_by' to keep device mapped to 
+            the pages wherever they are.
+
+        device : int or str, optional
+            Device ordinal or 'host' the advice refers to. If None, 
+            device_id is used.
+
+        unset : bool, optional
+            Remove the advice instead of setting it.
+        """
+        try:
+            advice_id = advise_map[advice][1 if unset else 0]
+        except KeyError:
+            raise ValueError("Unknown advice '%s', expected one of %s."%(advice, sorted(advise_map)))
+        cu_mem_advise(self.ptr, self.nbytes, advice_id, self._location(device))
+
+
+    def _location(self, device):
+        if device is None:
+            return self.device_id
+        if device in ['host', 'cpu']:
+            return CPU_DEVICE_ID
+        return int(device)
+
+
     def T(self, stream=None):
         """
         Transpose the matrix on the device. This currently only works 
@@ -208,6 +391,30 @@ class Unified_Ptr(object):
         """
         self.h = self.h.conj
         return self
+
+
+    @property
+    def __cuda_array_interface__(self):
+        """
+        Version 3 CUDA Array Interface, exporting the memory to 
+        CuPy, Numba, PyTorch, and other consumers without copying.
+        """
+        return export_cuda_array(self.ptr, self._h.shape, self.dtype,
+                                 self._h.strides, self.stream)
+
+
+    def __dlpack__(self, stream=None, **kwargs):
+        """
+        Export the memory as a DLPack capsule, without copying. 
+        See Device_Ptr.__dlpack__.
+        """
+        sync_streams(self.stream, stream)
+        return export_dlpack(self.ptr, self._h.shape, self.dtype, self._h.strides,
+                             self.__dlpack_device__(), self)
+
+
+    def __dlpack_device__(self):
+        return dlpack_device(self.ptr)
     
 
     @classmethod